@@ -0,0 +1,111 @@
+"""Binary snapshots of the attendance data, loaded with `mmap`.
+
+Parsing a JSON snapshot builds every record before anything can be asked
+of it. A binary snapshot stores the records as fixed-width columns that
+map directly onto a `RecordStore`, so loading one only reads a small
+header and queries such as `RecordStore.count_by_subject` run over the
+mapped file. The records are copied into memory the first time they are
+changed.
+
+Layout (all integers in the byte order named in the header):
+
+    MAGIC                       8 bytes
+    header length               4 bytes, little-endian
+    header                      JSON: record count, byte order, the subject
+                                and status tables and every other key of
+                                the attendance data (holidays, settings,
+                                counters, journal_seq)
+    padding                     to a multiple of 8 bytes
+    dates                       4 bytes per record, day ordinals
+    subject ids                 2 bytes per record, into the subject table
+    status ids                  1 byte per record, into the status table
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from . import codec
+from .records import RecordStore
+
+MAGIC = b"ATTSNAP1"
+
+_LENGTH = struct.Struct("<I")
+
+# (typecode, item size) of the date, subject id and status id columns.
+COLUMNS = (("i", 4), ("H", 2), ("B", 1))
+
+
+def _columns_offset(header_length):
+    end = len(MAGIC) + _LENGTH.size + header_length
+    return -(-end // 8) * 8
+
+
+def dumps(data):
+    """Encodes attendance data (records as a RecordStore or list) as bytes."""
+    records = data["records"]
+    if not isinstance(records, RecordStore):
+        records = RecordStore(records)
+    header = {key: value for key, value in data.items() if key != "records"}
+    header["_records"] = {
+        "count": len(records),
+        "byteorder": sys.byteorder,
+        "subjects": list(records.subjects),
+        "statuses": list(records.statuses),
+    }
+    header_bytes = codec.dumps(header)
+    padding = _columns_offset(len(header_bytes)) - (
+        len(MAGIC) + _LENGTH.size + len(header_bytes)
+    )
+    parts = [MAGIC, _LENGTH.pack(len(header_bytes)), header_bytes, b"\0" * padding]
+    for column, (typecode, _) in zip(
+        (records.dates, records.subject_ids, records.status_ids), COLUMNS
+    ):
+        parts.append(array(typecode, column).tobytes())
+    return b"".join(parts)
+
+
+def loads(buffer):
+    """Decodes a binary snapshot from a buffer without copying the columns.
+
+    The returned records are a `RecordStore` over memoryviews of buffer
+    (copies if the snapshot was written with the other byte order). Raises
+    ValueError if buffer is not a complete snapshot.
+    """
+    view = memoryview(buffer)
+    prefix = len(MAGIC) + _LENGTH.size
+    if len(view) < prefix or bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not an attendance snapshot.")
+    (header_length,) = _LENGTH.unpack(view[len(MAGIC):prefix])
+    header = codec.loads(bytes(view[prefix:prefix + header_length]))
+    layout = header.pop("_records")
+    count = layout["count"]
+
+    offset = _columns_offset(header_length)
+    columns = []
+    for typecode, size in COLUMNS:
+        end = offset + count * size
+        if end > len(view):
+            raise ValueError("The attendance snapshot is truncated.")
+        column = view[offset:end].cast(typecode)
+        if layout["byteorder"] != sys.byteorder:
+            column = array(typecode, column)
+            column.byteswap()
+        columns.append(column)
+        offset = end
+
+    header["records"] = RecordStore.from_columns(
+        *columns, layout["subjects"], layout["statuses"]
+    )
+    return header
+
+
+def load_file(path):
+    """Maps the snapshot at path and decodes it (see `loads`).
+
+    The mapping stays open for as long as the records refer to it; a file
+    replaced in the meantime keeps its old contents visible to them.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads(mapped)
@@ -0,0 +1,90 @@
+"""A tiny client for the `attendance serve` query server.
+
+Only the standard library's socket and json are needed, so asking the
+server is cheap even from a fresh Python process. `ask` falls back to
+answering in this process when no server is running, and `apply_ops` to
+writing the files directly.
+"""
+import json
+import os
+import socket
+
+# Seconds to wait for the server before answering directly.
+TIMEOUT = 0.5
+
+# Seconds to wait for the server to commit a write.
+WRITE_TIMEOUT = 10.0
+
+
+class QueryError(ValueError):
+    """The server understood the request but could not answer it."""
+
+
+def request(query, path, timeout=TIMEOUT):
+    """Sends one query to the server at path and returns its result.
+
+    Raises OSError if no server answers and QueryError if it rejects the
+    query.
+    """
+    with _connect(path, timeout) as sock:
+        return _exchange(sock, query)
+
+
+def _connect(path, timeout):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _exchange(sock, query):
+    sock.sendall(json.dumps(query).encode() + b"\n")
+    with sock.makefile("rb") as f:
+        line = f.readline()
+    if not line:
+        raise ConnectionError("The server closed the connection.")
+    response = json.loads(line)
+    if not response["ok"]:
+        raise QueryError(response["error"])
+    return response["result"]
+
+
+def ask(query, path=None):
+    """Answers a query through the server, or directly if none is running.
+
+    Raises ValueError (QueryError from the server) for queries that can't be
+    answered.
+    """
+    from . import daemon
+
+    path = path or daemon.socket_path()
+    try:
+        return request(query, path)
+    except OSError:
+        return daemon.answer(query)
+
+
+def apply_ops(ops, path=None):
+    """Sends ops to the server's writer and waits until they are saved.
+
+    Returns False, without sending anything, if no server is running, so
+    the caller can apply the ops itself. Once connected, errors are raised
+    rather than retried locally, since the server may already have applied
+    the ops.
+    """
+    from . import daemon
+
+    path = path or daemon.socket_path()
+    if not os.path.exists(path):
+        return False
+    try:
+        sock = _connect(path, WRITE_TIMEOUT)
+    except OSError:
+        return False
+    with sock:
+        _exchange(sock, {"query": "apply", "ops": list(ops)})
+    return True
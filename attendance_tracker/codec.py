@@ -0,0 +1,62 @@
+"""Encoding and decoding of the JSON data files.
+
+Uses orjson when it is installed and the standard library's json module
+otherwise; both read each other's output. Data files are written compactly,
+without indentation, since nobody reads them by hand; `dumps(pretty=True)`
+gives the indented form for exports.
+"""
+import json
+from collections.abc import Mapping, Sequence
+
+_orjson = None
+
+
+def _import_orjson():
+    """Returns the orjson module, or None if it isn't installed."""
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson
+        except ImportError:
+            orjson = False
+        _orjson = orjson
+    return _orjson or None
+
+
+def _default(obj):
+    """Encodes the mapping and sequence types json doesn't know, e.g. RecordStore."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, Sequence) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data):
+    """Parses a JSON document from bytes or str."""
+    orjson = _import_orjson()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, pretty=False):
+    """Encodes obj as UTF-8 JSON bytes, compact unless pretty (2-space indent)."""
+    orjson = _import_orjson()
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_default, option=orjson.OPT_INDENT_2 if pretty else 0
+        )
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=_default)
+    else:
+        text = json.dumps(
+            obj, separators=(",", ":"), ensure_ascii=False, default=_default
+        )
+    return text.encode()
+
+
+def load_file(path):
+    """Reads and parses the JSON file at path."""
+    with open(path, "rb") as f:
+        return loads(f.read())
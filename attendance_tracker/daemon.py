@@ -0,0 +1,315 @@
+"""``attendance serve``: a long-lived query server on a Unix domain socket.
+
+Shell prompts and status bars ask the same few questions many times a day.
+The server keeps an immutable snapshot of the statistics loaded, watches the
+data files for changes and answers each question without starting Python
+again. While it runs, the CLI also sends its writes to the server, whose
+single writer batches them (see `QueryServer`). `client` talks to it and
+falls back to working in the calling process when no server is running.
+
+The protocol is one JSON object per line in each direction. A request names
+a query (see `answer`) and gets back ``{"ok": true, "result": ...}`` or
+``{"ok": false, "error": "..."}``. asyncio is only imported by the server
+itself, so the client fallback stays cheap.
+"""
+import json
+import os
+import signal
+from datetime import date
+
+from . import data_manager, output, storage
+
+SOCKET_NAME = "attendance.sock"
+
+# Seconds between checks of the data files for changes.
+WATCH_INTERVAL = 1.0
+
+
+def socket_path():
+    """Returns the socket path: ATTENDANCE_SOCKET, or one in the data directory."""
+    path = os.environ.get("ATTENDANCE_SOCKET")
+    if path:
+        return path
+    return str(data_manager.current_tenant().data_dir / SOCKET_NAME)
+
+
+def data_version():
+    """Identifies the current on-disk version of the data and timetable."""
+    backend = data_manager.get_backend()
+    timetable_file = data_manager.current_tenant().timetable_file
+    return (backend.name, backend.stamp(), storage.file_stamp(timetable_file))
+
+
+def _today_status(today, timetable, calendar, recorded):
+    """The answer to a "today" query."""
+    return {
+        "date": today.isoformat(),
+        "class_day": timetable.has_classes(today) and calendar.is_class_day(today),
+        "recorded": recorded,
+    }
+
+
+class Snapshot:
+    """An immutable view of the data that the server answers reads from.
+
+    A snapshot is built in one go after each batch of writes (or change on
+    disk) and then swapped in whole, so a reader sees either all of a batch
+    or none of it and never touches the files itself.
+    """
+
+    __slots__ = ("version", "rows", "timetable", "calendar", "recorded_dates")
+
+    def __init__(self, version, rows, timetable, calendar, recorded_dates):
+        self.version = version
+        self.rows = tuple(rows)
+        self.timetable = timetable
+        self.calendar = calendar
+        self.recorded_dates = frozenset(recorded_dates)
+
+    @classmethod
+    def load(cls):
+        """Reads a snapshot of the current data."""
+        version = data_version()
+        return cls(
+            version,
+            output.summary_rows(data_manager.get_subject_stats()),
+            data_manager.get_timetable_index(),
+            data_manager.get_calendar(),
+            {date_str for date_str, _ in data_manager.get_recorded_classes()},
+        )
+
+    def today(self, today):
+        return _today_status(
+            today, self.timetable, self.calendar, today.isoformat() in self.recorded_dates
+        )
+
+
+def answer(request, snapshot=None):
+    """Answers one query against a snapshot, or the current data if None.
+
+    Queries:
+      {"query": "ping"}                       -> "pong"
+      {"query": "summary"}                    -> the `view summary` rows
+      {"query": "subject", "subject": name}   -> the summary row for one subject
+      {"query": "today"}                      -> {"date", "class_day", "recorded"}
+
+    Writes ({"query": "apply"}) are only taken by the server; see
+    `QueryServer.submit`. Raises ValueError for unknown or malformed queries.
+    """
+    query = request.get("query") if isinstance(request, dict) else None
+    if query == "ping":
+        return "pong"
+
+    if query in ("summary", "subject"):
+        if snapshot is not None:
+            rows = list(snapshot.rows)
+        else:
+            rows = output.summary_rows(data_manager.get_subject_stats())
+        if query == "summary":
+            return rows
+        for row in rows:
+            if row["subject"] == request.get("subject"):
+                return row
+        raise ValueError(f"Unknown subject: {request.get('subject')}")
+
+    if query == "today":
+        today = date.today()
+        if snapshot is not None:
+            return snapshot.today(today)
+        return _today_status(
+            today,
+            data_manager.get_timetable_index(),
+            data_manager.get_calendar(),
+            data_manager.has_records_on(today.isoformat()),
+        )
+
+    raise ValueError(f"Unknown query: {query}")
+
+
+def parse_ops(request):
+    """Returns the validated ops of an "apply" request (see `storage.validate_op`)."""
+    ops = request.get("ops")
+    if not isinstance(ops, list):
+        raise ValueError("An apply request needs a list of ops.")
+    for op in ops:
+        storage.validate_op(op)
+    return ops
+
+
+class QueryServer:
+    """Serves `answer` over a Unix socket from an in-memory `Snapshot`.
+
+    Any number of connections read concurrently from the current snapshot.
+    Every change to the data - writes sent by clients and reloads after
+    another process changed the files - goes through one queue drained by a
+    single writer task. The writer applies everything queued so far as one
+    batch (one journal append and fsync), off the event loop thread, then
+    swaps in a fresh snapshot before acknowledging the writes. A request
+    that fails is answered with its error without failing the others.
+    """
+
+    def __init__(self, path, watch_interval=WATCH_INTERVAL):
+        self.path = path
+        self.watch_interval = watch_interval
+        self.snapshot = None
+        # Batches committed so far, for monitoring and tests.
+        self.commits = 0
+        self._queue = None
+        self._busy = False
+
+    async def submit(self, ops):
+        """Queues ops for the writer and waits until they are on disk."""
+        import asyncio
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((ops, future))
+        return await future
+
+    def _commit(self, requests):
+        """Writer thread: applies the queued requests and reads the new snapshot.
+
+        requests is a list of op lists, one per client. They are applied as
+        one batch; if that fails, each is applied on its own, so a bad
+        request only fails itself. Returns (snapshot, errors), with the
+        exception (or None) for each request.
+        """
+        errors = [None] * len(requests)
+        ops = [op for request_ops in requests for op in request_ops]
+        if ops:
+            try:
+                data_manager.apply_ops(ops, remote=False)
+            except Exception:
+                # A failed batch changes nothing (see `storage`), so retrying
+                # the requests one by one can't apply anything twice.
+                for i, request_ops in enumerate(requests):
+                    if not request_ops:
+                        continue
+                    try:
+                        data_manager.apply_ops(request_ops, remote=False)
+                    except Exception as e:
+                        errors[i] = e
+        return Snapshot.load(), errors
+
+    async def write_loop(self):
+        """The single writer: drains the queue in batches."""
+        import asyncio
+
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self._busy = True
+            try:
+                snapshot, errors = await asyncio.to_thread(
+                    self._commit, [batch_ops for batch_ops, _ in batch]
+                )
+            except Exception as e:
+                # Keep the writer alive: only this batch fails.
+                errors = [e] * len(batch)
+            else:
+                self.snapshot = snapshot
+                if any(batch_ops for batch_ops, _ in batch):
+                    self.commits += 1
+            finally:
+                self._busy = False
+            for (batch_ops, future), error in zip(batch, errors):
+                if future is None or future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(ValueError(str(error) or type(error).__name__))
+                else:
+                    future.set_result({"applied": len(batch_ops)})
+
+    async def respond(self, line):
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict) and request.get("query") == "apply":
+                result = await self.submit(parse_ops(request))
+            else:
+                result = answer(request, self.snapshot)
+            return {"ok": True, "result": result}
+        except (ValueError, KeyError, OSError) as e:
+            return {"ok": False, "error": str(e)}
+
+    async def handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                response = await self.respond(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def watch(self):
+        """Queues a reload whenever another process changes the files."""
+        import asyncio
+
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if self._busy or not self._queue.empty():
+                continue
+            try:
+                changed = data_version() != self.snapshot.version
+            except Exception:
+                # E.g. a half-written or missing file; try again next time
+                # rather than let the watcher die and the snapshot go stale.
+                continue
+            if changed:
+                self._queue.put_nowait(([], None))
+
+    async def run(self, ready=None):
+        """Serves until cancelled. Sets the `ready` event once listening."""
+        import asyncio
+
+        self._queue = asyncio.Queue()
+        self.snapshot = await asyncio.to_thread(Snapshot.load)
+        server = await asyncio.start_unix_server(self.handle, path=self.path)
+        os.chmod(self.path, 0o600)
+        # Stop cleanly, removing the socket, when the process is terminated.
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, asyncio.current_task().cancel
+            )
+        except (ValueError, RuntimeError):
+            pass  # Not the main thread; signals are not ours to handle.
+        tasks = [asyncio.create_task(self.write_loop()), asyncio.create_task(self.watch())]
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def claim_socket(path):
+    """Removes a stale socket file at path.
+
+    Raises RuntimeError if another server is answering on it.
+    """
+    from . import client
+
+    if not os.path.exists(path):
+        return
+    try:
+        client.request({"query": "ping"}, path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A server is already running on {path}.")
+
+
+def serve(path=None):
+    """Runs the query server in the foreground until interrupted."""
+    import asyncio
+
+    path = path or socket_path()
+    data_manager.ensure_data_dir_exists()
+    claim_socket(path)
+    try:
+        asyncio.run(QueryServer(path).run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -1,134 +1,592 @@
-import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
 from pathlib import Path
 import shutil
 
+from . import codec, logic, profiling, semesters, storage, timetable, workdays
+
 # The root directory of the project installation
 PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = Path.home() / '.attendance-tracker'
+# The data directory, chosen with `--data-dir` or the ATTENDANCE_DATA_DIR
+# environment variable.
+DATA_DIR = Path(
+    os.environ.get('ATTENDANCE_DATA_DIR') or Path.home() / '.attendance-tracker'
+).expanduser()
 TIMETABLE_FILE = DATA_DIR / 'timetable.json'
 ATTENDANCE_FILE = DATA_DIR / 'attendance.json'
+DATABASE_FILE = DATA_DIR / 'attendance.db'
+STATE_FILE = DATA_DIR / 'state.json'
+
+# The storage backend, chosen with `--backend` or the ATTENDANCE_BACKEND
+# environment variable. None means "use the environment or the default".
+BACKEND = None
+DEFAULT_BACKEND = 'json'
+
+# The `--semester` names of the active semester and of every semester.
+CURRENT_SEMESTER = 'current'
+ALL_SEMESTERS = 'all'
+
+_repository = storage.Repository()
+_backends = {}
+_remote_writer = None
+
+class Tenant:
+    """One data directory (a student) with its own file caches and backends.
+
+    Use it as a context manager to point every function in this module at
+    it; outside any tenant they use the module-level paths above. Keeping a
+    tenant around keeps its parsed files cached, so one process can serve
+    many data directories (see `tenants.TenantPool`).
+    """
+
+    def __init__(self, data_dir, timetable_file=None, attendance_file=None,
+                 database_file=None, state_file=None, repository=None, backends=None):
+        self.data_dir = Path(data_dir)
+        self.timetable_file = timetable_file or self.data_dir / 'timetable.json'
+        self.attendance_file = attendance_file or self.data_dir / 'attendance.json'
+        self.database_file = database_file or self.data_dir / 'attendance.db'
+        self.state_file = state_file or self.data_dir / 'state.json'
+        self.archive_dir = self.data_dir / semesters.ARCHIVE_DIR_NAME
+        self.repository = storage.Repository() if repository is None else repository
+        self.backends = {} if backends is None else backends
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_active_tenant.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_tenant.reset(self._tokens.pop())
+
+    def close(self):
+        """Closes open database connections and drops the cached files."""
+        for backend in self.backends.values():
+            if hasattr(backend, 'close'):
+                backend.close()
+        self.backends.clear()
+        self.repository.clear()
+
+_active_tenant = ContextVar('attendance_tenant', default=None)
+
+def current_tenant():
+    """Returns the active `Tenant`, or one for the module-level paths."""
+    tenant = _active_tenant.get()
+    if tenant is None:
+        tenant = Tenant(
+            DATA_DIR, TIMETABLE_FILE, ATTENDANCE_FILE, DATABASE_FILE, STATE_FILE,
+            _repository, _backends,
+        )
+    return tenant
+
+def set_data_dir(data_dir):
+    """Points the module-level paths at data_dir for the rest of the session."""
+    global DATA_DIR, TIMETABLE_FILE, ATTENDANCE_FILE, DATABASE_FILE, STATE_FILE
+    DATA_DIR = Path(data_dir).expanduser()
+    TIMETABLE_FILE = DATA_DIR / 'timetable.json'
+    ATTENDANCE_FILE = DATA_DIR / 'attendance.json'
+    DATABASE_FILE = DATA_DIR / 'attendance.db'
+    STATE_FILE = DATA_DIR / 'state.json'
 
 def ensure_data_dir_exists():
     """Creates the data directory if it doesn't exist."""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    current_tenant().data_dir.mkdir(parents=True, exist_ok=True)
+
+def set_backend(name):
+    """Selects the storage backend for the rest of the session."""
+    global BACKEND
+    if name not in storage.BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    BACKEND = name
+
+def get_backend_name():
+    """Returns the name of the selected storage backend."""
+    return BACKEND or os.environ.get('ATTENDANCE_BACKEND') or DEFAULT_BACKEND
+
+def get_backend(name=None):
+    """Returns the storage backend instance for the current data directory."""
+    name = name or get_backend_name()
+    tenant = current_tenant()
+    backends = tenant.backends
+    if name == 'json':
+        key = (name, tenant.attendance_file)
+        if key not in backends:
+            backends[key] = storage.JsonBackend(tenant.attendance_file, tenant.repository)
+    elif name == 'sqlite':
+        key = (name, tenant.database_file)
+        if key not in backends:
+            backends[key] = storage.SqliteBackend(tenant.database_file)
+    else:
+        raise ValueError(f"Unknown storage backend: {name}")
+    return backends[key]
+
+def _timetable_file():
+    """Returns the timetable file in the data directory, or None if there is none.
 
-def get_timetable():
-    """Reads the timetable from the JSON file in the data directory.
-    
     If the file doesn't exist in the data directory, it copies it from the project root.
     """
     ensure_data_dir_exists()
-    if not TIMETABLE_FILE.exists():
+    tenant = current_tenant()
+    if not tenant.timetable_file.exists():
         source_file = PROJECT_ROOT / 'timetable.json'
-        if source_file.exists():
-            shutil.copy(source_file, TIMETABLE_FILE)
-        else:
-            return {}
-            
-    with open(TIMETABLE_FILE, 'r') as f:
-        return json.load(f)
+        if not source_file.exists():
+            return None
+        shutil.copy(source_file, tenant.timetable_file)
+    return tenant.timetable_file
 
+@profiling.timed('data_manager.get_timetable')
+def get_timetable():
+    """Reads the timetable from the JSON file in the data directory."""
+    path = _timetable_file()
+    if path is None:
+        return {}
+    timetable = current_tenant().repository.load(path)
+    return {day: list(subjects) for day, subjects in timetable.items()}
+
+@profiling.timed('data_manager.get_timetable_index')
+def get_timetable_index():
+    """Returns the timetable compiled into a `timetable.Timetable`.
+
+    It is compiled once and reused until the timetable file changes.
+    Alternate weeks are counted from the week of the semester start.
+    """
+    path = _timetable_file()
+    if path is None:
+        return timetable.Timetable()
+    index = current_tenant().repository.load_compiled(path, timetable.compile_timetable)
+    if index.alternating:
+        index = index.counting_weeks_from(get_semester_start_date())
+    return index
+
+@profiling.timed('data_manager.save_timetable')
 def save_timetable(timetable):
     """Saves the timetable to the JSON file."""
     ensure_data_dir_exists()
-    with open(TIMETABLE_FILE, 'w') as f:
-        json.dump(timetable, f, indent=2)
+    tenant = current_tenant()
+    # The timetable is edited by hand, so it stays indented.
+    storage.write_atomic(tenant.timetable_file, codec.dumps(timetable, pretty=True))
+    tenant.repository.store(
+        tenant.timetable_file, {day: list(subjects) for day, subjects in timetable.items()}
+    )
 
-def get_attendance_data():
-    """Reads the attendance data from the JSON file in the data directory.
-    
-    If the file doesn't exist in the data directory, it copies it from the project root.
+def _ready_backend():
+    """Returns the selected backend, ready for queries but not loaded.
+
+    A new JSON backend starts from the project root's `attendance.json`, if
+    there is one. Backend queries go through this rather than `_load`, so
+    SQLite answers them from its indexes without reading every record.
     """
     ensure_data_dir_exists()
-    if not ATTENDANCE_FILE.exists():
+    backend = get_backend()
+    if backend.name == 'json' and not backend.exists():
         source_file = PROJECT_ROOT / 'attendance.json'
         if source_file.exists():
-            shutil.copy(source_file, ATTENDANCE_FILE)
-            with open(ATTENDANCE_FILE, 'r') as f:
-                data = json.load(f)
-        else:
-            data = {'records': [], 'holidays': [], 'semester_start_date': None, 'semester_end_date': None}
-    else:
-        with open(ATTENDANCE_FILE, 'r') as f:
-            data = json.load(f)
+            shutil.copy(source_file, current_tenant().attendance_file)
+    return backend
+
+@profiling.timed('data_manager.load')
+def _load():
+    """Returns the backend's cached attendance data without copying it."""
+    return _ready_backend().load()
+
+def get_attendance_data():
+    """Reads the attendance data from the selected storage backend.
+
+    If the JSON file doesn't exist in the data directory, it copies it from the project root.
+    """
+    return storage.copy_attendance_data(_load())
 
-    if 'semester_start_date' not in data:
-        data['semester_start_date'] = None
-    if 'semester_end_date' not in data:
-        data['semester_end_date'] = None
-    if 'holidays' not in data:
-        data['holidays'] = []
-    if 'records' not in data:
-        data['records'] = []
+def export_attendance_data(pretty=False, semester=None):
+    """Returns the attendance data as JSON bytes, indented if pretty.
 
-    return data
+    The export has the layout of `attendance.json` without the derived
+    counters, so it can be copied back in as an `attendance.json`. With
+    semester, the start date of a closed semester, that semester's
+    archive is exported instead.
+    """
+    if semester is None or semester == CURRENT_SEMESTER:
+        data = get_attendance_data()
+        del data['counters']
+    else:
+        archive = get_archive()
+        data = archive.load(archive.find(semester))
+        del data['subjects']
+    return codec.dumps(data, pretty=pretty)
+
+def set_snapshot_format(fmt):
+    """Rewrites the JSON backend's snapshot as "json" or "binary" (see `binsnap`)."""
+    backend = get_backend()
+    if backend.name != 'json':
+        raise ValueError("Only the JSON backend keeps a snapshot.")
+    ensure_data_dir_exists()
+    _load()
+    backend.set_snapshot_format(fmt)
+    _save_state()
 
+@profiling.timed('data_manager.save_attendance_data')
 def save_attendance_data(data):
-    """Saves the attendance data to the JSON file."""
+    """Saves the attendance data to the selected storage backend."""
     ensure_data_dir_exists()
-    with open(ATTENDANCE_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    get_backend().save(data)
+    _save_state()
+
+def set_remote_writer(writer):
+    """Routes `apply_ops` through writer(ops) first, e.g. `client.apply_ops`.
+
+    The writer returns True if it applied the ops (a running `attendance
+    serve` did) or False to have them applied here. None turns it off.
+    """
+    global _remote_writer
+    _remote_writer = writer
+
+@profiling.timed('data_manager.apply_ops')
+def apply_ops(ops, remote=True):
+    """Applies incremental changes (see `storage`) and saves them.
+
+    With remote=False the ops are always applied in this process, even if
+    a remote writer is set.
+    """
+    ops = list(ops)
+    if not ops:
+        return
+    if remote and _remote_writer is not None and _remote_writer(ops):
+        return
+    _ready_backend().apply(ops)
+    _save_state()
+
+@contextmanager
+def group_commit():
+    """Makes the saves inside the block share one fsync at its end.
+
+    Each save is still written atomically and visible to other processes
+    straight away; only forcing it to disk is deferred, so a crash inside
+    the block can lose its saves but never corrupt the data.
+    """
+    backend = get_backend()
+    if not backend.sync:
+        yield  # Already inside a group commit.
+        return
+    backend.sync = False
+    try:
+        yield
+    finally:
+        backend.sync = True
+        backend.flush()
+
+def _write_state(state):
+    """Atomically writes the sidecar state file."""
+    tenant = current_tenant()
+    # The state is a cache that `get_state` can rebuild, so it only needs
+    # to be synced when the data itself is.
+    storage.write_atomic(tenant.state_file, codec.dumps(state), sync=get_backend().sync)
+    tenant.repository.store(tenant.state_file, dict(state))
+
+@profiling.timed('data_manager.save_state')
+def _save_state(last_checked=None):
+    """Writes the sidecar state describing the data just saved."""
+    backend = get_backend()
+    state = backend.describe()
+    state.update({
+        'last_checked': last_checked,
+        'backend': backend.name,
+        'stamp': backend.stamp(),
+        'content_hash': backend.content_hash(),
+        'timetable_stamp': storage.file_stamp(current_tenant().timetable_file),
+    })
+    _write_state(state)
+    return state
+
+@profiling.timed('data_manager.get_state')
+def get_state():
+    """Reads the sidecar state file.
+
+    The state caches the last run date and semester bounds so they can be
+    answered without loading the attendance data. Returns None if there is
+    no state or it no longer matches the stored data and timetable.
+    """
+    tenant = current_tenant()
+    try:
+        state = dict(tenant.repository.load(tenant.state_file))
+    except (FileNotFoundError, ValueError):
+        return None
+
+    backend = get_backend()
+    if state.get('backend') != backend.name:
+        return None
+    if state.get('timetable_stamp') != storage.file_stamp(tenant.timetable_file):
+        return None
+
+    if not backend.exists():
+        return None
+    stamp = backend.stamp()
+    if state.get('stamp') != stamp:
+        # The data was touched; it is still ours if the content is unchanged.
+        content_hash = state.get('content_hash')
+        if content_hash is None or content_hash != backend.content_hash():
+            return None
+        state['stamp'] = stamp
+        _write_state(state)
+
+    return state
+
+def mark_checked(date_str):
+    """Records that `record check` has nothing left to ask for on date_str."""
+    state = get_state()
+    if state is None:
+        if not get_backend().exists():
+            return
+        state = _save_state()
+    elif state.get('last_checked') == date_str:
+        return  # Already recorded; spare the shell start a write.
+    state['last_checked'] = date_str
+    _write_state(state)
+
+def _describe(key):
+    """Reads a value of `backend.describe()`, from the sidecar state if it is current."""
+    state = get_state()
+    if state is not None and key in state:
+        return state[key]
+    return _ready_backend().describe()[key]
 
 def get_last_run_date():
     """Gets the last date attendance was recorded."""
-    data = get_attendance_data()
-    if not data['records']:
-        return get_semester_start_date()
-    return max(record['date'] for record in data['records'])
+    return _describe('last_run_date')
+
+def get_check_cursor():
+    """Returns the last day `record check` got an answer for, or None."""
+    return _describe('check_cursor')
+
+def get_resume_date():
+    """Returns the last day `record check` is done with.
+
+    That is the last date attendance was recorded or the check cursor
+    (see `record_checked_days`), whichever is later, so days answered
+    without a record, e.g. with every class cancelled, aren't asked again.
+    """
+    return max(
+        filter(None, (get_last_run_date(), get_check_cursor())), default=None
+    )
 
 def get_semester_start_date():
     """Gets the semester start date."""
-    data = get_attendance_data()
-    return data.get('semester_start_date')
+    return _describe('semester_start_date')
 
 def set_semester_start_date(start_date):
     """Sets the semester start date."""
-    data = get_attendance_data()
-    data['semester_start_date'] = start_date
-    save_attendance_data(data)
+    apply_ops([{'op': 'set', 'key': 'semester_start_date', 'value': start_date}])
 
 def get_semester_end_date():
     """Gets the semester end date."""
-    data = get_attendance_data()
-    return data.get('semester_end_date')
+    return _describe('semester_end_date')
 
 def set_semester_end_date(end_date):
     """Sets the semester end date."""
-    data = get_attendance_data()
-    data['semester_end_date'] = end_date
-    save_attendance_data(data)
+    apply_ops([{'op': 'set', 'key': 'semester_end_date', 'value': end_date}])
+
+def get_holidays():
+    """Gets the list of holidays."""
+    return _ready_backend().holidays()
+
+def get_working_days():
+    """Gets the working weekdays (Monday is 0)."""
+    return list(_describe('working_days'))
+
+def set_working_days(weekdays):
+    """Sets the working weekdays (Monday is 0)."""
+    apply_ops([{'op': 'set', 'key': 'working_days', 'value': sorted(set(weekdays))}])
+
+def get_holiday_ranges():
+    """Gets the holiday ranges as inclusive [start, end] date pairs."""
+    return [list(pair) for pair in _describe('holiday_ranges')]
+
+def get_calendar(holidays=None):
+    """Returns the `workdays.WorkCalendar` for the working week and holidays."""
+    if holidays is None:
+        holidays = get_holidays()
+    return workdays.WorkCalendar(get_working_days(), holidays, get_holiday_ranges())
+
+def has_records_on(date_str):
+    """Returns True if any attendance was recorded for date_str."""
+    return _ready_backend().has_records_on(date_str)
+
+def get_recorded_classes():
+    """Returns the set of (date, subject) pairs that have at least one record."""
+    return {(record['date'], record['subject']) for record in _load()['records']}
+
+def find_records(subject=None, start_date=None, end_date=None, status=None, offset=0, limit=None):
+    """Finds records by subject, inclusive date range and status, in key order.
+
+    Returns up to `limit` (date, subject, seq, status) tuples after skipping
+    `offset` matches, using the backend's index rather than a full scan.
+    """
+    return _ready_backend().find_records(subject, start_date, end_date, status, offset, limit)
+
+def get_counters():
+    """Gets the stored per-subject present/absent/cancelled counters."""
+    return _ready_backend().counters()
+
+@profiling.timed('data_manager.get_subject_stats')
+def get_subject_stats(semester=None):
+    """Calculates the statistics of every subject in the timetable.
+
+    Returns {subject: stats} (see `logic.stats_from_counts`), sorted by
+    subject. semester selects a closed semester by its start date, or
+    ALL_SEMESTERS for the totals of every semester; the closed ones are
+    read from the archive index without loading their records.
+    """
+    if semester is None or semester == CURRENT_SEMESTER:
+        subjects = get_timetable_index().subjects
+        counters = get_counters()
+    elif semester == ALL_SEMESTERS:
+        entries = get_archive().entries()
+        subjects = sorted(set(get_timetable_index().subjects).union(
+            *(entry['subjects'] for entry in entries)
+        ))
+        counters = {}
+        for subject_counters in [get_counters()] + [entry['counters'] for entry in entries]:
+            for subject, counts in subject_counters.items():
+                totals = counters.setdefault(subject, dict.fromkeys(counts, 0))
+                for key, value in counts.items():
+                    totals[key] += value
+    else:
+        entry = get_archive().find(semester)
+        subjects = entry['subjects']
+        counters = entry['counters']
+    stats = logic.aggregate_counters(counters, subjects)
+    return {subject: stats[subject] for subject in subjects}
+
+def verify_counters(repair=False):
+    """Recounts the counters from the records and compares them to the stored ones.
+
+    Returns a list of (subject, stored, actual) for every subject whose
+    stored counters have drifted. With repair=True the stored counters are
+    rebuilt afterwards.
+    """
+    data = _load()
+    stored = get_backend().counters()
+    actual = logic.count_by_subject(data['records'])
+    drift = [
+        (subject, stored.get(subject), actual.get(subject))
+        for subject in sorted(set(stored) | set(actual))
+        if stored.get(subject) != actual.get(subject)
+    ]
+    if drift and repair:
+        get_backend().rebuild_counters()
+        _save_state()
+    return drift
 
 def add_holiday(holiday_date):
     """Adds a holiday to the list of holidays."""
-    data = get_attendance_data()
-    if holiday_date not in data['holidays']:
-        data['holidays'].append(holiday_date)
-        save_attendance_data(data)
+    apply_ops([{'op': 'add_holiday', 'date': holiday_date}])
 
 def remove_holiday(holiday_date):
     """Removes a holiday from the list of holidays."""
-    data = get_attendance_data()
-    if holiday_date in data['holidays']:
-        data['holidays'].remove(holiday_date)
-        save_attendance_data(data)
+    apply_ops([{'op': 'remove_holiday', 'date': holiday_date}])
+
+def add_holiday_range(start_date, end_date):
+    """Adds the holidays from start_date to end_date (inclusive) as one range."""
+    apply_ops([{'op': 'add_holiday_range', 'start': start_date, 'end': end_date}])
+
+def remove_holiday_range(start_date, end_date):
+    """Removes a holiday range added with `add_holiday_range`."""
+    apply_ops([{'op': 'remove_holiday_range', 'start': start_date, 'end': end_date}])
+
+def add_record(record):
+    """Adds a single attendance record."""
+    apply_ops([{'op': 'add_record', 'record': record}])
+
+def record_attendance(records, holidays=()):
+    """Adds new attendance records and holidays in one write."""
+    ops = [{'op': 'add_record', 'record': record} for record in records]
+    ops.extend({'op': 'add_holiday', 'date': holiday} for holiday in holidays)
+    apply_ops(ops)
+
+def record_checked_days(days):
+    """Saves the answers `record check` got for some days in one write.
+
+    days is a list of (date_str, records, holidays) in date order. Each
+    becomes a `check_day` op, which moves the check cursor to the day, so a
+    check interrupted later resumes after it.
+
+    Checks started at the same time ask about the same days. Whoever
+    applies the write, here or a running server, drops the days another
+    check has already saved, so each day is recorded once.
+    """
+    apply_ops([
+        {'op': 'check_day', 'date': date_str, 'records': records, 'holidays': holidays}
+        for date_str, records, holidays in days
+    ])
+
+def set_record_status(date_str, subject, seq, status):
+    """Changes the status of the record with key (date_str, subject, seq)."""
+    apply_ops([{
+        'op': 'set_status', 'date': date_str, 'subject': subject, 'seq': seq, 'status': status,
+    }])
+
+def delete_record(date_str, subject, seq):
+    """Deletes the record with key (date_str, subject, seq)."""
+    apply_ops([{'op': 'delete_record', 'date': date_str, 'subject': subject, 'seq': seq}])
 
 def cancel_class(date_str, subject):
-    """Cancels a class for a given date and subject."""
+    """Cancels a class for a given date and subject.
+
+    Marks the first record of that class as cancelled, or records a
+    cancelled class if there is none.
+    """
+    apply_ops([{'op': 'cancel', 'date': date_str, 'subject': subject}])
+
+def get_archive():
+    """Returns the `semesters.SemesterArchive` of the current data directory."""
+    tenant = current_tenant()
+    return semesters.SemesterArchive(tenant.archive_dir, tenant.repository)
+
+def list_semesters():
+    """Lists the closed semesters, then the current one, as index entries.
+
+    The current semester's entry has no 'file' and its 'end' may be None.
+    """
+    entries = get_archive().entries()
+    start = get_semester_start_date()
+    if start:
+        entries.append({'start': start, 'end': get_semester_end_date(), 'file': None})
+    return entries
+
+def close_semester(next_start, next_end=None, compress=True):
+    """Archives the current semester and starts the next one on next_start.
+
+    Every record and holiday before next_start moves to a new archive under
+    `semesters/` (see `semesters`), so the active data only holds the new
+    semester. Returns the archive's index entry.
+
+    The archive is written first, so a crash can leave the closed records
+    in both places but never in neither; closing again cleans that up.
+    """
+    start = get_semester_start_date()
+    if start and next_start <= start:
+        raise ValueError(
+            f"The next semester must start after the current one ({start})."
+        )
     data = get_attendance_data()
-    records = data['records']
-    
-    # Check if a record for this class already exists
-    for record in records:
-        if record['date'] == date_str and record['subject'] == subject:
-            record['status'] = 'cancelled'
-            break
-    else:
-        # If no record exists, create one
-        records.append({
-            "date": date_str,
-            "subject": subject,
-            "status": "cancelled"
-        })
-        
-    save_attendance_data(data)
+    closed, remaining = semesters.split_semester(data, next_start)
+    if not closed['records']:
+        raise ValueError(f"There are no records before {next_start} to archive.")
+
+    entry = get_archive().add(closed, get_timetable_index().subjects, compress)
+    remaining['semester_start_date'] = next_start
+    remaining['semester_end_date'] = next_end
+    save_attendance_data(remaining)
+    return entry
 
+def migrate_json_to_sqlite():
+    """Copies the JSON attendance data into a new SQLite database.
+
+    Returns the number of records migrated. Refuses to overwrite a database
+    that already holds records.
+    """
+    ensure_data_dir_exists()
+    sqlite_backend = get_backend('sqlite')
+    if sqlite_backend.load()['records']:
+        raise ValueError(f"{sqlite_backend.path} already contains attendance records.")
+    data = get_backend('json').load()
+    sqlite_backend.save(data)
+    return len(data['records'])
@@ -0,0 +1,181 @@
+"""Lightweight entry point for the ``attendance`` console script.
+
+``attendance record check --quiet`` runs at the end of every interactive shell
+start. Most of the time there is nothing to ask, so this module answers that
+question using only the standard library and exits before click, rich and the
+command tree in :mod:`attendance_tracker.main` are imported.
+
+``attendance view summary --format json|csv|tsv`` and ``attendance query ...``
+are polled by status bars and dashboards, so they are answered here the same
+way, through the `attendance serve` daemon when it is running.
+"""
+from . import profiling
+
+import sys
+from datetime import date
+
+from . import data_manager, logic
+
+QUIET_CHECK_ARGS = ["record", "check", "--quiet"]
+# Options the quiet check may be given as well, in any order.
+QUIET_CHECK_OPTIONS = {"--compact"}
+SUMMARY_ARGS = ["view", "summary"]
+# Options of `main.cli` that take a value, to tell where its options end.
+CLI_VALUE_OPTIONS = {"--backend", "--data-dir", "--profile-output"}
+
+
+def check_has_work(today=None):
+    """Returns True if `record check --quiet` would prompt for anything.
+
+    Mirrors the decisions made by `main.check`: an unset start date or an
+    ended semester means there is nothing to do, otherwise any missed day or
+    an unrecorded today that has classes in the timetable needs the full CLI.
+    The sidecar state answers the common cases without parsing the records.
+    """
+    today = today or date.today()
+    today_str = today.isoformat()
+
+    state = data_manager.get_state()
+    if state is not None and state["last_checked"] == today_str:
+        return False
+
+    semester_start_date = data_manager.get_semester_start_date()
+    semester_end_date = data_manager.get_semester_end_date()
+    if not semester_start_date:
+        return False
+
+    end_date = date.fromisoformat(semester_end_date) if semester_end_date else None
+    if end_date and today > end_date:
+        return False
+
+    timetable = data_manager.get_timetable_index()
+    holidays = data_manager.get_holidays()
+    calendar = data_manager.get_calendar(holidays)
+    last_run_date_str = data_manager.get_resume_date()
+
+    missed_days = logic.get_missed_days(
+        last_run_date_str, holidays, semester_start_date, calendar=calendar
+    )
+    for day in missed_days:
+        if end_date and day > end_date:
+            continue
+        if timetable.has_classes(day):
+            return True
+
+    if (
+        not calendar.is_class_day(today)
+        or today_str < semester_start_date
+        or not timetable.has_classes(today)
+    ):
+        return False
+
+    if (data_manager.get_check_cursor() or "") >= today_str:
+        return False
+    return not data_manager.has_records_on(today_str)
+
+
+def profile_options(args):
+    """Returns (profile, output path) as given by `cli`'s options in args."""
+    profile = False
+    profile_output = None
+    i = 0
+    while i < len(args) and args[i].startswith("-"):
+        arg = args[i]
+        if arg == "--profile":
+            profile = True
+        elif arg.startswith("--profile-output="):
+            profile_output = arg[len("--profile-output="):]
+        elif arg == "--profile-output" and i + 1 < len(args):
+            profile_output = args[i + 1]
+        i += 2 if arg in CLI_VALUE_OPTIONS else 1
+    return profile or bool(profile_output), profile_output
+
+
+def is_quiet_check(args):
+    """Returns True for `record check --quiet`, with any QUIET_CHECK_OPTIONS."""
+    if args[:2] != QUIET_CHECK_ARGS[:2] or QUIET_CHECK_ARGS[2] not in args[2:]:
+        return False
+    options = list(args[2:])
+    options.remove(QUIET_CHECK_ARGS[2])
+    return len(set(options)) == len(options) and set(options) <= QUIET_CHECK_OPTIONS
+
+
+def summary_format(args):
+    """Returns the format of a plain `view summary --format <fmt>`, else None."""
+    from .output import SUMMARY_FORMATS
+
+    if args[:2] != SUMMARY_ARGS:
+        return None
+    options = args[2:]
+    if len(options) == 1 and options[0].startswith("--format="):
+        fmt = options[0][len("--format="):]
+    elif len(options) == 2 and options[0] == "--format":
+        fmt = options[1]
+    else:
+        return None
+    return fmt if fmt in SUMMARY_FORMATS else None
+
+
+def print_summary(fmt):
+    """Writes the summary in a machine-readable format with a single write."""
+    from . import client, output
+
+    rows = client.ask({"query": "summary"})
+    sys.stdout.write(output.render(fmt, output.SUMMARY_FIELDS, rows))
+    sys.stdout.flush()
+
+
+def run_query(args):
+    """Answers a plain `query today` / `query subject NAME [--field F]`.
+
+    Returns False for anything else, which is left to the full CLI.
+    """
+    from . import client, output
+
+    if args == ["query", "today"]:
+        print(output.format_today(client.ask({"query": "today"})))
+        return True
+
+    if len(args) not in (3, 5) or args[:2] != ["query", "subject"]:
+        return False
+    field = None
+    if len(args) == 5:
+        if args[3] != "--field" or args[4] not in output.SUMMARY_FIELDS:
+            return False
+        field = args[4]
+    if args[2].startswith("-"):
+        return False
+    try:
+        row = client.ask({"query": "subject", "subject": args[2]})
+    except ValueError as e:
+        print(f"Error: {e}")
+        return True
+    print(output.format_subject(row, field))
+    return True
+
+
+def main(argv=None):
+    """Runs the CLI, short-circuiting the no-op quiet check and data-only summaries."""
+    args = sys.argv[1:] if argv is None else list(argv)
+    # Enabled before the command tree is imported, so its imports are timed.
+    profile, profile_output = profile_options(args)
+    if profile:
+        profiling.enable(profile_output)
+    else:
+        profiling.enable_from_env()
+    if profiling.enabled:
+        profiling.record("import", profiling.since_start())
+    if is_quiet_check(args) and not check_has_work():
+        data_manager.mark_checked(date.today().isoformat())
+        return 0
+    fmt = summary_format(args)
+    if fmt is not None:
+        print_summary(fmt)
+        return 0
+    if args[:1] == ["query"] and run_query(args):
+        return 0
+
+    with profiling.phase("import.cli"):
+        from .main import cli
+
+    return cli.main(args=args, prog_name="attendance")
@@ -0,0 +1,138 @@
+"""Bulk import of attendance records from CSV or JSONL files.
+
+Rows are (date, subject, status) triples: a CSV file with a header naming
+those columns, or one JSON object per line. Rows are streamed, validated
+against the timetable and semester bounds, deduplicated against the stored
+records by (date, subject) and written in batches through
+`data_manager.record_attendance`.
+"""
+import csv
+import json
+from datetime import date
+
+from . import data_manager
+
+FORMATS = ("csv", "jsonl")
+IMPORT_BATCH_SIZE = 500
+
+STATUSES = {
+    "p": "present",
+    "present": "present",
+    "a": "absent",
+    "absent": "absent",
+    "c": "cancelled",
+    "cancelled": "cancelled",
+}
+
+
+def format_for(filename):
+    """Guesses the import format from a file name, or returns None."""
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def read_rows(f, fmt):
+    """Yields (line number, row dict) for each row of an open CSV or JSONL file."""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_num, row
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+class ImportResult:
+    """What an import did: rows imported, duplicates skipped and row errors."""
+
+    def __init__(self):
+        self.imported = 0
+        self.duplicates = 0
+        self.errors = []
+
+
+class RowValidator:
+    """Turns raw rows into records, rejecting rows the timetable doesn't allow."""
+
+    def __init__(self, timetable, semester_start_date, semester_end_date):
+        self.timetable = timetable
+        self.start = semester_start_date
+        self.end = semester_end_date
+
+    def record(self, row):
+        """Returns the record for row, or raises ValueError explaining why not."""
+        if not isinstance(row, dict):
+            raise ValueError("Not a (date, subject, status) row.")
+        date_str = str(row.get("date") or "").strip()
+        subject = str(row.get("subject") or "").strip()
+        status = STATUSES.get(str(row.get("status") or "").strip().lower())
+
+        try:
+            day = date.fromisoformat(date_str)
+        except ValueError:
+            raise ValueError(f"Invalid date: {date_str!r}")
+        if status is None:
+            raise ValueError(f"Invalid status: {row.get('status')!r}")
+        if self.start and date_str < self.start:
+            raise ValueError(f"{date_str} is before the semester start.")
+        if self.end and date_str > self.end:
+            raise ValueError(f"{date_str} is after the semester end.")
+
+        if subject not in self.timetable.subjects_on(day):
+            raise ValueError(f"{subject or 'No subject'} is not scheduled on {day.isoformat()}.")
+
+        return {"date": day.isoformat(), "subject": subject, "status": status}
+
+
+def import_rows(rows, batch_size=IMPORT_BATCH_SIZE):
+    """Imports (line number, row) pairs from `read_rows`.
+
+    Rows for a (date, subject) that already has a record, in the stored data
+    or earlier in the file, are skipped as duplicates. Invalid rows are
+    skipped and reported in the result's `errors` as (line number, message).
+    Valid records are saved every `batch_size` rows, so an interrupted
+    import keeps what it had already written.
+    """
+    validator = RowValidator(
+        data_manager.get_timetable_index(),
+        data_manager.get_semester_start_date(),
+        data_manager.get_semester_end_date(),
+    )
+    seen = data_manager.get_recorded_classes()
+    result = ImportResult()
+    batch = []
+
+    for line_num, row in rows:
+        try:
+            record = validator.record(row)
+        except ValueError as e:
+            result.errors.append((line_num, str(e)))
+            continue
+
+        key = (record["date"], record["subject"])
+        if key in seen:
+            result.duplicates += 1
+            continue
+        seen.add(key)
+
+        batch.append(record)
+        if len(batch) >= batch_size:
+            data_manager.record_attendance(batch)
+            result.imported += len(batch)
+            batch = []
+
+    if batch:
+        data_manager.record_attendance(batch)
+        result.imported += len(batch)
+    return result
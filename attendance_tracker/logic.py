@@ -1,22 +1,131 @@
 from datetime import date, timedelta
 
+from . import profiling, workdays
+from .records import RecordStore
 
+
+ATTENDANCE_THRESHOLD = 75
+
+
+def stats_from_counts(present, absent, cancelled):
+    """Computes the attendance statistics for one subject from its counts.
+
+    Every non-cancelled class counts towards the total. Returns a dict with
+    the counts plus "total", "percentage", "needed" (classes to attend to
+    reach 75%) and "missable" (classes that can be missed staying >= 75%).
+    """
+    total = present + absent
+    stats = {
+        "present": present,
+        "absent": absent,
+        "cancelled": cancelled,
+        "total": total,
+        "percentage": 100.0,
+        "needed": 0,
+        "missable": 0,
+    }
+    if total == 0:
+        return stats
+
+    percentage = (present / total) * 100
+    stats["percentage"] = percentage
+    ratio = ATTENDANCE_THRESHOLD / 100
+
+    if percentage < ATTENDANCE_THRESHOLD:
+        # Let 'x' be the number of additional classes to attend.
+        # (present + x) / (total + x) = 0.75
+        # present + x = 0.75 * total + 0.75 * x
+        # 0.25 * x = 0.75 * total - present
+        # x = (0.75 * total - present) / 0.25
+        needed = (ratio * total - present) / (1 - ratio)
+        # Return the ceiling of the needed value
+        stats["needed"] = int(-(-needed // 1)) if needed > 0 else 0
+    else:
+        # Let 'x' be the number of additional classes to miss.
+        # present / (total + x) = 0.75
+        # present = 0.75 * total + 0.75 * x
+        # present - 0.75 * total = 0.75 * x
+        # x = (present - 0.75 * total) / 0.75
+        stats["missable"] = int((present - ratio * total) / ratio)
+
+    return stats
+
+
+def counter_key(status):
+    """Returns the counter ("present", "absent" or "cancelled") a status counts towards."""
+    if status == "present" or status == "cancelled":
+        return status
+    return "absent"
+
+
+@profiling.timed("logic.count_by_subject")
+def count_by_subject(records):
+    """Counts present, absent and cancelled classes per subject in one pass.
+
+    Returns {subject: {"present": n, "absent": n, "cancelled": n}}. A
+    `RecordStore` is counted over its columns instead.
+    """
+    if isinstance(records, RecordStore):
+        return records.count_by_subject()
+    counters = {}
+    for r in records:
+        subject_counters = counters.get(r["subject"])
+        if subject_counters is None:
+            subject_counters = counters[r["subject"]] = {
+                "present": 0,
+                "absent": 0,
+                "cancelled": 0,
+            }
+        subject_counters[counter_key(r["status"])] += 1
+    return counters
+
+
+@profiling.timed("logic.aggregate_counters")
+def aggregate_counters(counters, subjects=()):
+    """Calculates the statistics for every subject from its counters.
+
+    Takes counters as returned by `count_by_subject` and returns
+    {subject: stats} (see `stats_from_counts`) for each subject in counters,
+    plus every subject in `subjects` even if it has none. This is
+    O(subjects), independent of the number of records.
+    """
+    stats = {
+        subject: stats_from_counts(
+            subject_counters["present"],
+            subject_counters["absent"],
+            subject_counters["cancelled"],
+        )
+        for subject, subject_counters in counters.items()
+    }
+    for subject in subjects:
+        if subject not in stats:
+            stats[subject] = stats_from_counts(0, 0, 0)
+    return stats
+
+
+@profiling.timed("logic.aggregate_attendance")
+def aggregate_attendance(records, subjects=()):
+    """Calculates the statistics for every subject in a single pass.
+
+    Returns {subject: stats} (see `stats_from_counts`) for each subject that
+    has records, plus every subject in `subjects` even if it has none.
+    """
+    return aggregate_counters(count_by_subject(records), subjects)
+
+
+@profiling.timed("logic.calculate_attendance_percentage")
 def calculate_attendance_percentage(records, subject):
     """Calculates the attendance percentage for a given subject."""
-    subject_records = [
-        r for r in records if r["subject"] == subject and r["status"] != "cancelled"
-    ]
-    if not subject_records:
-        return 100.0
-
-    present_count = sum(1 for r in subject_records if r["status"] == "present")
-    total_count = len(subject_records)
+    return aggregate_attendance(records, [subject])[subject]["percentage"]
 
-    return (present_count / total_count) * 100
 
+@profiling.timed("logic.get_missed_days")
+def get_missed_days(last_run_date_str, holidays, semester_start_date_str, calendar=None):
+    """Gets a list of dates that were missed since the last run.
 
-def get_missed_days(last_run_date_str, holidays, semester_start_date_str):
-    """Gets a list of dates that were missed since the last run."""
+    `calendar` is a `workdays.WorkCalendar`; without one, the class days are
+    Monday to Friday except `holidays`.
+    """
     start_date = date.fromisoformat(semester_start_date_str)
 
     if not last_run_date_str:
@@ -28,71 +137,25 @@ def get_missed_days(last_run_date_str, holidays, semester_start_date_str):
         else:
             current_date = last_run_date + timedelta(days=1)
 
+    if calendar is None:
+        calendar = workdays.WorkCalendar(holidays=holidays)
     today = date.today()
-    missed_days = []
-
-    while current_date < today:
-        if current_date.weekday() < 5 and current_date.isoformat() not in holidays:
-            missed_days.append(current_date)
-        current_date += timedelta(days=1)
-
-    return missed_days
+    return calendar.class_days(current_date, today)
 
 
+@profiling.timed("logic.calculate_classes_needed")
 def calculate_classes_needed(records, subject):
     """
     Calculates how many more classes need to be attended to reach 75%.
     Returns 0 if the percentage is already >= 75%.
     """
-    subject_records = [
-        r for r in records if r["subject"] == subject and r["status"] != "cancelled"
-    ]
-    total_classes = len(subject_records)
-    present_classes = sum(1 for r in subject_records if r["status"] == "present")
-
-    if total_classes == 0:
-        return 0
-
-    percentage = (present_classes / total_classes) * 100 if total_classes > 0 else 100.0
-    if percentage >= 75:
-        return 0
-
-    # Let 'x' be the number of additional classes to attend.
-    # (present_classes + x) / (total_classes + x) = 0.75
-    # present_classes + x = 0.75 * total_classes + 0.75 * x
-    # 0.25 * x = 0.75 * total_classes - present_classes
-    # x = (0.75 * total_classes - present_classes) / 0.25
-
-    needed = (0.75 * total_classes - present_classes) / 0.25
-
-    # Return the ceiling of the needed value
-    return int(-(-needed // 1)) if needed > 0 else 0
+    return aggregate_attendance(records, [subject])[subject]["needed"]
 
 
+@profiling.timed("logic.calculate_classes_to_miss")
 def calculate_classes_to_miss(records, subject):
     """
     Calculates how many classes can be missed while maintaining 75% attendance.
     Returns 0 if the percentage is already < 75%.
     """
-    subject_records = [
-        r for r in records if r["subject"] == subject and r["status"] != "cancelled"
-    ]
-    total_classes = len(subject_records)
-    present_classes = sum(1 for r in subject_records if r["status"] == "present")
-
-    if total_classes == 0:
-        return 0
-
-    percentage = (present_classes / total_classes) * 100 if total_classes > 0 else 100.0
-    if percentage < 75:
-        return 0
-
-    # Let 'x' be the number of additional classes to miss.
-    # present_classes / (total_classes + x) = 0.75
-    # present_classes = 0.75 * total_classes + 0.75 * x
-    # present_classes - 0.75 * total_classes = 0.75 * x
-    # x = (present_classes - 0.75 * total_classes) / 0.75
-
-    missable = (present_classes - 0.75 * total_classes) / 0.75
-
-    return int(missable)
+    return aggregate_attendance(records, [subject])[subject]["missable"]
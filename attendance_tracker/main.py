@@ -1,14 +1,49 @@
+from . import profiling
+
 import click
-from datetime import date
-from rich.console import Console
-from rich.table import Table
-from . import data_manager, logic
+from datetime import date, timedelta
+from . import client, daemon, data_manager, importer, logic, output, storage
+from . import tenants, workdays
 
 
 @click.group()
-def cli():
+@click.option(
+    "--backend",
+    type=click.Choice(storage.BACKENDS),
+    envvar="ATTENDANCE_BACKEND",
+    help="Storage backend for attendance data (default: json).",
+)
+@click.option(
+    "--data-dir",
+    type=click.Path(file_okay=False),
+    envvar="ATTENDANCE_DATA_DIR",
+    help="Data directory to use (default: ~/.attendance-tracker).",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Print how long each phase of the command took to stderr.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    help="Record the command with cProfile and write the stats to this file.",
+)
+def cli(backend, data_dir, profile, profile_output):
     """A CLI tool to track attendance."""
-    pass
+    if profile or profile_output:
+        if not profiling.enabled:
+            # Run without the fast path, which would have timed the imports.
+            profiling.enable(profile_output)
+            profiling.record("import", profiling.since_start())
+    else:
+        profiling.enable_from_env()
+    if backend:
+        data_manager.set_backend(backend)
+    if data_dir:
+        data_manager.set_data_dir(data_dir)
+    # Hand writes to `attendance serve` while it runs, so it stays the only writer.
+    data_manager.set_remote_writer(client.apply_ops)
 
 
 # --- Record Group ---
@@ -22,8 +57,20 @@ def record_group():
 @click.option(
     "--quiet", is_flag=True, help="Only show output when user input is required."
 )
-def check(quiet):
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Answer all pending days on one line, e.g. \"p p h pa\".",
+)
+def check(quiet, compact):
     """Check for missed days and prompt for today's attendance."""
+    # Each day is saved as soon as it is answered, so an interrupted check
+    # keeps its answers; the writes share a single fsync at the end.
+    with data_manager.group_commit():
+        _check(quiet, compact)
+
+
+def _check(quiet, compact=False):
     semester_start_date = data_manager.get_semester_start_date()
     semester_end_date = data_manager.get_semester_end_date()
 
@@ -35,61 +82,88 @@ def check(quiet):
         return
 
     today = date.today()
-    if semester_end_date and today > date.fromisoformat(semester_end_date):
+    end_date = date.fromisoformat(semester_end_date) if semester_end_date else None
+    if end_date and today > end_date:
         if not quiet:
             click.echo("Semester has ended. No more attendance tracking.")
         return
 
-    timetable = data_manager.get_timetable()
-    attendance_data = data_manager.get_attendance_data()
-    records = attendance_data["records"]
-    holidays = attendance_data["holidays"]
+    timetable = data_manager.get_timetable_index()
+    holidays = data_manager.get_holidays()
+    calendar = data_manager.get_calendar(holidays)
 
-    last_run_date_str = data_manager.get_last_run_date()
+    # Resume after the last day an earlier check recorded or dealt with.
     missed_days = logic.get_missed_days(
-        last_run_date_str, holidays, semester_start_date
+        data_manager.get_resume_date(), holidays, semester_start_date, calendar=calendar
     )
+    if missed_days and not quiet:
+        click.echo("You have some missed days to account for.")
+    pending = [
+        (day, timetable.subjects_on(day))
+        for day in missed_days
+        if not (end_date and day > end_date)
+    ]
+
+    # Handle today; an answer without records (all cancelled) moved the cursor.
+    today_recorded = False
+    if calendar.is_class_day(today) and today.isoformat() >= semester_start_date:
+        subjects_today = timetable.subjects_on(today)
+        if subjects_today:
+            today_str = today.isoformat()
+            today_recorded = (
+                data_manager.get_check_cursor() or ""
+            ) >= today_str or data_manager.has_records_on(today_str)
+            if not today_recorded:
+                pending.append((today, subjects_today))
+
+    pending = [(day, subjects) for day, subjects in pending if subjects]
+    if compact and pending:
+        completed = _check_compact(pending)
+    else:
+        completed = all(_check_day(day, subjects) for day, subjects in pending)
+    if not completed:
+        click.echo("Attendance checking postponed.")
+        return
+    if today_recorded and not quiet:
+        click.echo("Attendance for today has already been recorded.")
 
-    if missed_days:
-        if not quiet:
-            click.echo("You have some missed days to account for.")
-        for day in missed_days:
-            if semester_end_date and day > date.fromisoformat(semester_end_date):
-                continue
-            day_name = day.strftime("%A")
-            subjects = timetable.get(day_name, [])
-            if subjects:
-                if not prompt_for_attendance(day, subjects, records, holidays):
-                    click.echo("Attendance checking postponed.")
-                    data_manager.save_attendance_data(attendance_data)
-                    return
-
-    # Handle today
-    if (
-        today.isoformat() not in holidays
-        and today.weekday() < 5
-        and today.isoformat() >= semester_start_date
-    ):
-        if not semester_end_date or today <= date.fromisoformat(semester_end_date):
-            day_name = today.strftime("%A")
-            subjects_today = timetable.get(day_name, [])
-            if subjects_today:
-                todays_records = [r for r in records if r["date"] == today.isoformat()]
-                if not todays_records:
-                    if not prompt_for_attendance(
-                        today, subjects_today, records, holidays
-                    ):
-                        click.echo("Attendance checking postponed.")
-                        data_manager.save_attendance_data(attendance_data)
-                        return
-                elif not quiet:
-                    click.echo("Attendance for today has already been recorded.")
-
-    data_manager.save_attendance_data(attendance_data)
+    data_manager.mark_checked(today.isoformat())
     if not quiet:
         click.echo("Attendance data saved.")
 
 
+def _check_day(day, subjects):
+    """Prompts for one day and saves the answer; returns False to postpone."""
+    records = []
+    holidays = []
+    if not prompt_for_attendance(day, subjects, records, holidays):
+        return False
+    data_manager.record_checked_days([(day.isoformat(), records, holidays)])
+    return True
+
+
+def _check_compact(pending):
+    """Asks for every pending day on one line and saves the answers in one write.
+
+    Returns False if days were left unanswered (postponed).
+    """
+    click.echo(
+        "Answer each day with p (all present), a (all absent), h (holiday) or one"
+        " of p/a/c per class, separated by spaces. Leave days off the end to postpone them."
+    )
+    for i, (day, subjects) in enumerate(pending, 1):
+        click.echo(f"  {i:>2}. {day.strftime('%a %Y-%m-%d')}: {', '.join(subjects)}")
+    while True:
+        line = click.prompt("  Answers", default="", show_default=False)
+        try:
+            answers = parse_compact_answers(line, pending)
+            break
+        except ValueError as e:
+            click.echo(f"  Error: {e}")
+    data_manager.record_checked_days(answers)
+    return len(answers) == len(pending)
+
+
 @record_group.command(name="add-class")
 @click.option("--subject", prompt="Subject name")
 @click.option("--date", "date_str", prompt="Date (YYYY-MM-DD)")
@@ -101,9 +175,6 @@ def add_class(subject, date_str):
         click.echo("Error: Date must be in YYYY-MM-DD format.")
         return
 
-    attendance_data = data_manager.get_attendance_data()
-    records = attendance_data["records"]
-
     status = click.prompt(
         f"Status for {subject} on {date_str}",
         type=click.Choice(["p", "a", "c"]),
@@ -111,7 +182,7 @@ def add_class(subject, date_str):
     )
 
     if status != "c":
-        records.append(
+        data_manager.add_record(
             {
                 "date": date_str,
                 "subject": subject,
@@ -119,7 +190,6 @@ def add_class(subject, date_str):
             }
         )
 
-    data_manager.save_attendance_data(attendance_data)
     click.echo(f"Added extra class for {subject} on {date_str}")
 
 
@@ -138,6 +208,33 @@ def cancel_class(subject, date_str):
     click.echo(f"Cancelled {subject} on {date_str}")
 
 
+@record_group.command(name="import")
+@click.argument("file", type=click.File("r"))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(importer.FORMATS),
+    help="File format (default: guessed from the file extension).",
+)
+def import_records(file, fmt):
+    """Imports attendance from a CSV or JSONL file of date, subject, status rows."""
+    fmt = fmt or importer.format_for(file.name)
+    if fmt is None:
+        click.echo("Error: Cannot tell the file format; use --format csv or jsonl.")
+        return
+
+    result = importer.import_rows(importer.read_rows(file, fmt))
+
+    for line_num, message in result.errors[:20]:
+        click.echo(f"Line {line_num}: {message}")
+    if len(result.errors) > 20:
+        click.echo(f"... and {len(result.errors) - 20} more invalid rows.")
+    click.echo(
+        f"Imported {result.imported} records, skipped {result.duplicates} duplicates"
+        f" and {len(result.errors)} invalid rows."
+    )
+
+
 # --- Config Group ---
 @click.group(name="config")
 def config_group():
@@ -173,6 +270,126 @@ def set_end_date(date_str):
     click.echo(f"Semester end date set to {date_str}")
 
 
+@config_group.command(name="set-working-days")
+@click.argument("days")
+def set_working_days(days):
+    """Sets the days classes are held on, e.g. "mon,tue,wed,thu,fri,sat"."""
+    try:
+        weekdays = workdays.parse_weekdays(days)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+    if not weekdays:
+        click.echo("Error: At least one working day is required.")
+        return
+
+    data_manager.set_working_days(weekdays)
+    names = ", ".join(workdays.WEEKDAY_NAMES[weekday] for weekday in weekdays)
+    click.echo(f"Working days set to {names}")
+
+
+@config_group.command(name="new-semester")
+@click.argument("start_str", metavar="START")
+@click.option("--end", "end_str", help="End date of the new semester (YYYY-MM-DD).")
+@click.option(
+    "--no-compress", is_flag=True, help="Store the closed semester uncompressed."
+)
+def new_semester(start_str, end_str, no_compress):
+    """Archives the current semester and starts a new one on START.
+
+    Records and holidays before START move to an archive under
+    "semesters/" in the data directory, so everyday commands only load the
+    new semester. "view summary --semester" still reports on closed ones.
+    """
+    try:
+        for date_str in filter(None, (start_str, end_str)):
+            date.fromisoformat(date_str)
+    except ValueError:
+        click.echo("Error: Date must be in YYYY-MM-DD format.")
+        return
+
+    try:
+        entry = data_manager.close_semester(start_str, end_str, compress=not no_compress)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+    click.echo(
+        f"Archived {entry['records']} records from {entry['start']} to {entry['end']}"
+        f" in {entry['file']}."
+    )
+    click.echo(f"Semester start date set to {start_str}")
+
+
+@config_group.command(name="migrate-sqlite")
+def migrate_sqlite():
+    """Copies the JSON attendance data into the SQLite backend."""
+    try:
+        count = data_manager.migrate_json_to_sqlite()
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+
+    click.echo(f"Migrated {count} records to {data_manager.current_tenant().database_file}")
+    click.echo("Use '--backend sqlite' or ATTENDANCE_BACKEND=sqlite to use it.")
+
+
+@config_group.command(name="export")
+@click.option(
+    "--output",
+    "-o",
+    "out",
+    type=click.File("wb"),
+    default="-",
+    help="File to write to (default: standard output).",
+)
+@click.option("--pretty", is_flag=True, help="Indent the JSON for reading.")
+@click.option(
+    "--semester",
+    help='Export a closed semester, given by its start date (see "view semesters").',
+)
+def export(out, pretty, semester):
+    """Writes all attendance data as JSON."""
+    try:
+        content = data_manager.export_attendance_data(pretty=pretty, semester=semester)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    out.write(content)
+    if pretty:
+        out.write(b"\n")
+
+
+@config_group.command(name="snapshot-format")
+@click.argument("fmt", metavar="FORMAT", type=click.Choice(storage.SNAPSHOT_FORMATS))
+def snapshot_format(fmt):
+    """Stores the attendance snapshot as JSON or in the binary format.
+
+    The binary snapshot is memory-mapped instead of parsed, which keeps
+    loading long histories fast. Only the JSON backend has a snapshot.
+    """
+    try:
+        data_manager.set_snapshot_format(fmt)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+    click.echo(f"Attendance snapshot stored as {fmt}.")
+
+
+@config_group.command(name="verify-counters")
+@click.option("--repair", is_flag=True, help="Rebuild the counters if they drifted.")
+def verify_counters(repair):
+    """Checks the stored per-subject counters against the records."""
+    drift = data_manager.verify_counters(repair=repair)
+    if not drift:
+        click.echo("Counters are consistent with the records.")
+        return
+
+    for subject, stored, actual in drift:
+        click.echo(f"{subject}: stored {stored}, actual {actual}")
+    if repair:
+        click.echo("Counters rebuilt.")
+
+
 # --- Holiday Group ---
 @click.group(name="holiday")
 def holiday_group():
@@ -180,47 +397,84 @@ def holiday_group():
     pass
 
 
+def parse_holiday(date_str):
+    """Parses "YYYY-MM-DD" or "YYYY-MM-DD..YYYY-MM-DD" into (start, end).
+
+    end is None for a single date. Raises ValueError for anything else.
+    """
+    start, sep, end = date_str.partition("..")
+    date.fromisoformat(start)
+    if not sep:
+        return start, None
+    if date.fromisoformat(end) < date.fromisoformat(start):
+        raise ValueError(f"{date_str} ends before it starts.")
+    return start, end
+
+
 @holiday_group.command(name="add")
 @click.argument("date_str")
 def add_holiday(date_str):
-    """Marks a specific date as a holiday. Date format: YYYY-MM-DD"""
+    """Marks a date or a range of dates as a holiday.
+
+    Date format: YYYY-MM-DD, or YYYY-MM-DD..YYYY-MM-DD for a range (inclusive).
+    """
     try:
-        date.fromisoformat(date_str)
+        start, end = parse_holiday(date_str)
     except ValueError:
-        click.echo("Error: Date must be in YYYY-MM-DD format.")
+        click.echo("Error: Date must be in YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD format.")
         return
 
-    attendance_data = data_manager.get_attendance_data()
-    holidays = attendance_data["holidays"]
-
-    if date_str in holidays:
+    if end is not None:
+        if [start, end] in data_manager.get_holiday_ranges():
+            click.echo(f"{date_str} is already a holiday.")
+        else:
+            data_manager.add_holiday_range(start, end)
+            click.echo(f"Added {date_str} as a holiday.")
+    elif date_str in data_manager.get_holidays():
         click.echo(f"{date_str} is already a holiday.")
     else:
-        holidays.append(date_str)
-        data_manager.save_attendance_data(attendance_data)
+        data_manager.add_holiday(date_str)
         click.echo(f"Added {date_str} as a holiday.")
 
 
 @holiday_group.command(name="remove")
 @click.argument("date_str")
 def remove_holiday(date_str):
-    """Removes a holiday. Date format: YYYY-MM-DD"""
+    """Removes a holiday or a holiday range.
+
+    Date format: YYYY-MM-DD, or YYYY-MM-DD..YYYY-MM-DD for a range.
+    """
     try:
-        date.fromisoformat(date_str)
+        start, end = parse_holiday(date_str)
     except ValueError:
-        click.echo("Error: Date must be in YYYY-MM-DD format.")
+        click.echo("Error: Date must be in YYYY-MM-DD or YYYY-MM-DD..YYYY-MM-DD format.")
         return
 
-    attendance_data = data_manager.get_attendance_data()
-    holidays = attendance_data["holidays"]
-
-    if date_str in holidays:
+    if end is not None:
+        if [start, end] in data_manager.get_holiday_ranges():
+            data_manager.remove_holiday_range(start, end)
+            click.echo(f"Removed {date_str} from holidays.")
+        else:
+            click.echo(f"{date_str} was not found in holidays.")
+    elif date_str in data_manager.get_holidays():
         data_manager.remove_holiday(date_str)
         click.echo(f"Removed {date_str} from holidays.")
     else:
         click.echo(f"{date_str} was not found in holidays.")
 
 
+@holiday_group.command(name="list")
+def list_holidays():
+    """Lists the holidays and holiday ranges."""
+    entries = data_manager.get_holidays() + [
+        f"{start}..{end}" for start, end in data_manager.get_holiday_ranges()
+    ]
+    if not entries:
+        click.echo("No holidays.")
+        return
+    click.echo("\n".join(sorted(entries)))
+
+
 # --- View Group ---
 @click.group(name="view")
 def view_group():
@@ -229,24 +483,51 @@ def view_group():
 
 
 @view_group.command(name="summary")
-def summary():
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(("table",) + output.SUMMARY_FORMATS),
+    default="table",
+    show_default=True,
+    help="Output format; json, csv and tsv print plain data for scripts.",
+)
+@click.option(
+    "--semester",
+    default=data_manager.CURRENT_SEMESTER,
+    show_default=True,
+    help='A closed semester\'s start date (see "view semesters"), or "all".',
+)
+def summary(fmt, semester):
     """Display the attendance summary."""
+    current = semester == data_manager.CURRENT_SEMESTER
+    if fmt != "table" and current:
+        rows = client.ask({"query": "summary"})
+        click.echo(output.render(fmt, output.SUMMARY_FIELDS, rows), nl=False)
+        return
+
+    try:
+        stats = data_manager.get_subject_stats(semester)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+    if fmt != "table":
+        rows = output.summary_rows(stats)
+        click.echo(output.render(fmt, output.SUMMARY_FIELDS, rows), nl=False)
+        return
+
+    with profiling.phase("import.rich"):
+        from rich.console import Console
+        from rich.table import Table
+
     console = Console()
-    attendance_data = data_manager.get_attendance_data()
-    records = attendance_data["records"]
-    timetable = data_manager.get_timetable()
-
-    all_subjects = sorted(
-        list(
-            set(
-                subject
-                for day_subjects in timetable.values()
-                for subject in day_subjects
-            )
-        )
-    )
 
-    table = Table(title="Attendance Summary")
+    if current:
+        title = "Attendance Summary"
+    elif semester == data_manager.ALL_SEMESTERS:
+        title = "Attendance Summary (all semesters)"
+    else:
+        title = f"Attendance Summary (semester from {semester})"
+    table = Table(title=title)
     table.add_column("Subject", style="cyan", no_wrap=True)
     table.add_column("Total Classes", style="blue")
     table.add_column("Presents", style="green")
@@ -255,85 +536,271 @@ def summary():
     table.add_column("Bunkable Classes", style="yellow")
     table.add_column("Notes", style="yellow")
 
-    for subject in all_subjects:
-        percentage = logic.calculate_attendance_percentage(records, subject)
-        needed = logic.calculate_classes_needed(records, subject)
-        missable = logic.calculate_classes_to_miss(records, subject)
+    for row in output.summary_rows(stats):
+        table.add_row(
+            row["subject"],
+            str(row["total"]),
+            str(row["present"]),
+            f"{row['percentage']:.2f}%",
+            row["status"],
+            str(row["bunkable"]),
+            row["notes"],
+        )
 
-        # Calculate total classes and presents for this subject
-        subject_records = [
-            r for r in records if r["subject"] == subject and r["status"] != "cancelled"
-        ]
-        total_classes = len(subject_records)
-        presents = sum(1 for r in subject_records if r["status"] == "present")
+    semester_end_date = data_manager.get_semester_end_date()
+    if current and semester_end_date:
+        end = date.fromisoformat(semester_end_date) + timedelta(days=1)
+        days_left = data_manager.get_calendar().count_class_days(date.today(), end)
+        table.caption = f"{days_left} class days left this semester"
+
+    with profiling.phase("render.summary_table"):
+        console.print(table)
 
-        status = ">= 75%" if percentage >= 75 else "< 75%"
 
-        if needed > 0:
-            notes = f"Attend next {needed} classes to reach 75%"
-            bunkable = "0"
+@view_group.command(name="semesters")
+def view_semesters():
+    """Lists the closed semesters and the current one."""
+    entries = data_manager.list_semesters()
+    if not entries:
+        click.echo("No semesters yet. Set the start date with 'config set-start-date'.")
+        return
+    for entry in entries:
+        dates = f"{entry['start']} .. {entry['end'] or ''}"
+        if entry["file"] is None:
+            click.echo(f"{dates:<24}  current")
         else:
-            notes = ""
-            bunkable = str(missable)
+            click.echo(f"{dates:<24}  {entry['records']} records  {entry['file']}")
 
-        table.add_row(
-            subject,
-            str(total_classes),
-            str(presents),
-            f"{percentage:.2f}%",
-            status,
-            bunkable,
-            notes,
-        )
 
-    console.print(table)
+EDIT_PAGE_SIZE = 20
 
 
 @view_group.command(name="edit")
-def edit():
+@click.option("--subject", help="Only show records for this subject.")
+@click.option("--from", "start_date", help="Only show records on or after YYYY-MM-DD.")
+@click.option("--to", "end_date", help="Only show records on or before YYYY-MM-DD.")
+@click.option(
+    "--status",
+    type=click.Choice(["present", "absent", "cancelled"]),
+    help="Only show records with this status.",
+)
+@click.option(
+    "--page-size", default=EDIT_PAGE_SIZE, show_default=True, help="Records per page."
+)
+def edit(subject, start_date, end_date, status, page_size):
     """Edit a past attendance record."""
-    attendance_data = data_manager.get_attendance_data()
-    records = attendance_data["records"]
-
-    if not records:
-        click.echo("No records to edit.")
-        return
-
-    for i, record in enumerate(records):
-        click.echo(
-            f"{i + 1}: {record['date']} - {record['subject']} ({record['status']})"
+    for date_str in (start_date, end_date):
+        if date_str:
+            try:
+                date.fromisoformat(date_str)
+            except ValueError:
+                click.echo("Error: Date must be in YYYY-MM-DD format.")
+                return
+    page_size = max(page_size, 1)
+
+    offset = 0
+    while True:
+        # Fetch one extra row to know whether there is a next page.
+        rows = data_manager.find_records(
+            subject, start_date, end_date, status, offset, page_size + 1
         )
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        if not rows:
+            click.echo("No records to edit.")
+            return
 
-    try:
-        record_num = click.prompt("Enter the number of the record to edit", type=int)
-        if not (1 <= record_num <= len(records)):
+        lines = [
+            f"{offset + i + 1}: {row_date} - {row_subject} ({row_status})"
+            for i, (row_date, row_subject, _, row_status) in enumerate(rows)
+        ]
+        choices = []
+        if offset > 0:
+            choices.append("p: previous page")
+        if has_next:
+            choices.append("n: next page")
+        lines.append(
+            f"Showing {offset + 1}-{offset + len(rows)}"
+            + (f" ({', '.join(choices)})" if choices else "")
+        )
+        click.echo("\n".join(lines))
+
+        try:
+            answer = click.prompt("Enter the number of the record to edit").strip()
+        except click.exceptions.Abort:
+            return  # User pressed Ctrl+C
+
+        if answer == "n" and has_next:
+            offset += page_size
+            continue
+        if answer == "p" and offset > 0:
+            offset = max(offset - page_size, 0)
+            continue
+        try:
+            record_num = int(answer)
+        except ValueError:
+            record_num = 0
+        if not (offset < record_num <= offset + len(rows)):
             click.echo("Invalid number.")
             return
-    except click.exceptions.Abort:
-        return  # User pressed Ctrl+C
-
-    record_to_edit = records[record_num - 1]
-
-    click.echo("Editing record:")
-    click.echo(f"  Date: {record_to_edit['date']}")
-    click.echo(f"  Subject: {record_to_edit['subject']}")
-    click.echo(f"  Status: {record_to_edit['status']}")
+        break
+
+    date_str, record_subject, seq, record_status = rows[record_num - offset - 1]
+
+    click.echo(
+        "\n".join(
+            [
+                "Editing record:",
+                f"  Date: {date_str}",
+                f"  Subject: {record_subject}",
+                f"  Status: {record_status}",
+            ]
+        )
+    )
 
     new_status = click.prompt(
         "New status",
         type=click.Choice(["p", "a", "c"]),
-        default=record_to_edit["status"][0],
+        default=record_status[0],
     )
 
     if new_status == "c":
-        records.pop(record_num - 1)
+        data_manager.delete_record(date_str, record_subject, seq)
     else:
-        record_to_edit["status"] = "present" if new_status == "p" else "absent"
+        data_manager.set_record_status(
+            date_str, record_subject, seq, "present" if new_status == "p" else "absent"
+        )
 
-    data_manager.save_attendance_data(attendance_data)
     click.echo("Record updated.")
 
 
+# --- Report Group ---
+@click.group(name="report")
+def report_group():
+    """Reports across many students' data directories."""
+    pass
+
+
+@report_group.command(name="tenants")
+@click.argument("root", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--pool-size",
+    default=tenants.DEFAULT_POOL_SIZE,
+    show_default=True,
+    help="Number of data directories kept loaded at once.",
+)
+def report_tenants(root, pool_size):
+    """Summarizes every data directory under ROOT (one per student)."""
+    data_dirs = tenants.discover(root)
+    if not data_dirs:
+        click.echo(f"No data directories found under {root}.")
+        return
+
+    pool = tenants.TenantPool(pool_size)
+    try:
+        for data_dir in data_dirs:
+            stats = tenants.summarize(pool.get(data_dir))
+            lines = [data_dir.name]
+            for subject, subject_stats in stats.items():
+                lines.append(
+                    f"  {subject}: {subject_stats['present']}/{subject_stats['total']}"
+                    f" ({subject_stats['percentage']:.2f}%)"
+                )
+            click.echo("\n".join(lines))
+    finally:
+        pool.close()
+
+
+@report_group.command(name="cohort")
+@click.argument("root", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(output.FORMATS),
+    default="csv",
+    show_default=True,
+    help="Output format.",
+)
+@click.option(
+    "--output",
+    "out",
+    type=click.File("w"),
+    default="-",
+    help="File to write the report to (default: standard output).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Worker processes (default: one per CPU).",
+)
+def report_cohort(root, fmt, out, workers):
+    """Writes every student's attendance statistics as CSV or JSONL.
+
+    Each data directory under ROOT is one student. Rows are written as the
+    worker processes finish, so their order varies between runs.
+    """
+    writer = output.RowWriter(out, fmt, tenants.COHORT_FIELDS)
+    for rows in tenants.cohort_report(tenants.discover(root), workers):
+        writer.write_all(rows)
+
+
+# --- Query Group ---
+@click.group(name="query")
+def query_group():
+    """Quick answers for shell prompts and status bars.
+
+    Answered by `attendance serve` when it is running, directly otherwise.
+    """
+    pass
+
+
+@query_group.command(name="today")
+def query_today():
+    """Prints whether today's attendance is recorded."""
+    click.echo(output.format_today(client.ask({"query": "today"})))
+
+
+@query_group.command(name="subject")
+@click.argument("subject")
+@click.option(
+    "--field",
+    type=click.Choice(output.SUMMARY_FIELDS),
+    help="Print only this value (e.g. bunkable).",
+)
+def query_subject(subject, field):
+    """Prints one subject's attendance percentage and bunkable classes."""
+    try:
+        row = client.ask({"query": "subject", "subject": subject})
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+    click.echo(output.format_subject(row, field))
+
+
+@click.command(name="serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Socket to listen on (default: attendance.sock in the data directory).",
+)
+def serve(socket_path):
+    """Runs a query server that keeps the attendance data loaded.
+
+    While it runs, other attendance commands send their changes to it.
+    """
+    path = socket_path or daemon.socket_path()
+    try:
+        daemon.claim_socket(path)
+    except RuntimeError as e:
+        click.echo(f"Error: {e}")
+        return
+
+    click.echo(f"Serving attendance queries on {path} (Ctrl+C to stop)")
+    daemon.serve(path)
+
+
+@profiling.timed("prompt")
 def prompt_for_attendance(day, subjects, records, holidays):
     """
     Prompts the user for attendance for a given day and subjects.
@@ -377,10 +844,49 @@ def prompt_for_attendance(day, subjects, records, holidays):
     return True
 
 
+COMPACT_STATUSES = {"p": "present", "a": "absent", "c": "cancelled"}
+
+
+def parse_compact_answers(line, pending):
+    """Parses a line of `record check --compact` answers for pending days.
+
+    pending is a list of (day, subjects). Each whitespace-separated answer
+    covers the next day: "p" or "a" for every class, "h" for a holiday, or
+    one of p/a/c per class in timetable order. Cancelled classes aren't
+    recorded, as in `prompt_for_attendance`. Returns (date_str, records,
+    holidays) for the answered days; raises ValueError for a bad answer.
+    """
+    answers = line.lower().split()
+    if len(answers) > len(pending):
+        raise ValueError(f"{len(answers)} answers for {len(pending)} days.")
+    days = []
+    for i, (answer, (day, subjects)) in enumerate(zip(answers, pending), 1):
+        date_str = day.isoformat()
+        if answer == "h":
+            days.append((date_str, [], [date_str]))
+            continue
+        if answer in ("p", "a"):
+            answer *= len(subjects)
+        if len(answer) != len(subjects) or not set(answer) <= set(COMPACT_STATUSES):
+            raise ValueError(
+                f"Day {i} ({date_str}): use p, a, h or {len(subjects)} of p/a/c."
+            )
+        records = [
+            {"date": date_str, "subject": subject, "status": COMPACT_STATUSES[status]}
+            for subject, status in zip(subjects, answer)
+            if status != "c"
+        ]
+        days.append((date_str, records, []))
+    return days
+
+
 cli.add_command(record_group)
 cli.add_command(config_group)
 cli.add_command(holiday_group)
 cli.add_command(view_group)
+cli.add_command(report_group)
+cli.add_command(query_group)
+cli.add_command(serve)
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,119 @@
+"""Machine-readable output: rows of statistics as CSV, TSV, JSON or JSON Lines."""
+import csv
+import io
+import json
+
+from . import logic, profiling
+
+# Formats that can be written one row at a time.
+FORMATS = ("csv", "tsv", "jsonl")
+
+# Formats `view summary` can print instead of its table.
+SUMMARY_FORMATS = ("json", "csv", "tsv")
+
+# The columns of the `view summary` table.
+SUMMARY_FIELDS = (
+    "subject",
+    "total",
+    "present",
+    "percentage",
+    "status",
+    "bunkable",
+    "needed",
+    "notes",
+)
+
+
+@profiling.timed("output.summary_rows")
+def summary_rows(stats):
+    """Turns {subject: stats} into `view summary` rows with SUMMARY_FIELDS."""
+    threshold = logic.ATTENDANCE_THRESHOLD
+    rows = []
+    for subject, subject_stats in stats.items():
+        needed = subject_stats["needed"]
+        rows.append(
+            {
+                "subject": subject,
+                "total": subject_stats["total"],
+                "present": subject_stats["present"],
+                "percentage": round(subject_stats["percentage"], 2),
+                "status": (
+                    f">= {threshold}%"
+                    if subject_stats["percentage"] >= threshold
+                    else f"< {threshold}%"
+                ),
+                "bunkable": 0 if needed > 0 else subject_stats["missable"],
+                "needed": needed,
+                "notes": (
+                    f"Attend next {needed} classes to reach {threshold}%"
+                    if needed > 0
+                    else ""
+                ),
+            }
+        )
+    return rows
+
+
+def format_today(today):
+    """Describes the result of a "today" query in a few words."""
+    if today["recorded"]:
+        return "recorded"
+    return "not recorded" if today["class_day"] else "no classes"
+
+
+def format_subject(row, field=None):
+    """Describes a summary row in one line, or just one of its fields."""
+    if field is not None:
+        return str(row[field])
+    if row["needed"] > 0:
+        advice = f"attend next {row['needed']}"
+    else:
+        advice = f"{row['bunkable']} bunkable"
+    return f"{row['subject']}: {row['percentage']:.2f}%, {advice}"
+
+
+@profiling.timed("output.render")
+def render(fmt, fields, rows):
+    """Returns rows as one string in fmt ("json" or one of FORMATS)."""
+    if fmt == "json":
+        return json.dumps([{field: row[field] for field in fields} for row in rows]) + "\n"
+    buffer = io.StringIO()
+    RowWriter(buffer, fmt, fields).write_all(rows)
+    return buffer.getvalue()
+
+
+class RowWriter:
+    """Writes dict rows with the given fields to a text stream, one at a time.
+
+    CSV and TSV output start with a header line; JSONL output is one JSON
+    object per line. Rows are written as they come, so a reader can start consuming
+    them before the producer is done.
+    """
+
+    def __init__(self, stream, fmt, fields):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = tuple(fields)
+        if fmt != "jsonl":
+            self._csv = csv.DictWriter(
+                stream,
+                self.fields,
+                delimiter="\t" if fmt == "tsv" else ",",
+                extrasaction="ignore",
+                lineterminator="\n",
+            )
+            self._csv.writeheader()
+
+    def write(self, row):
+        if self.fmt != "jsonl":
+            self._csv.writerow(row)
+        else:
+            fields = {field: row[field] for field in self.fields}
+            self.stream.write(json.dumps(fields) + "\n")
+
+    def write_all(self, rows):
+        for row in rows:
+            self.write(row)
+        self.stream.flush()
@@ -0,0 +1,169 @@
+"""Timing of the phases of one command: ``--profile`` and ATTENDANCE_PROFILE.
+
+When enabled, the functions decorated with `timed` (and the blocks wrapped
+in `phase`) record how often they ran, their wall time and the bytes the
+storage layer read and wrote inside them. A compact breakdown is printed to
+stderr when the process exits. Alternatively the whole run can be recorded
+with cProfile and written as a pstats dump.
+
+ATTENDANCE_PROFILE=1 (or "stderr") turns on the breakdown and
+ATTENDANCE_PROFILE=<path> the dump, for commands started by a shell hook;
+it also times the imports the fast path does before the command runs.
+
+Disabled, `timed` costs one flag check per call and `phase` returns a
+shared no-op context manager.
+"""
+import functools
+import os
+import sys
+import time
+
+_started = time.perf_counter()
+
+enabled = False
+_profiler = None
+_dump_path = None
+# name -> [calls, seconds, bytes read, bytes written], in first-seen order.
+_phases = {}
+_stack = []
+
+
+class _Phase:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        _stack.append(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.started)
+        _stack.pop()
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def _totals(name):
+    totals = _phases.get(name)
+    if totals is None:
+        totals = _phases[name] = [0, 0.0, 0, 0]
+    return totals
+
+
+def enable(dump_path=None):
+    """Starts recording; reports at exit. With dump_path, runs cProfile too."""
+    global enabled, _profiler, _dump_path
+    if enabled:
+        return
+    enabled = True
+    if dump_path:
+        import cProfile
+
+        _dump_path = dump_path
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    import atexit
+
+    atexit.register(report)
+
+
+def enable_from_env():
+    """Enables profiling as asked by ATTENDANCE_PROFILE, if set."""
+    value = os.environ.get("ATTENDANCE_PROFILE", "")
+    if value in ("", "0"):
+        return
+    if value.lower() in ("1", "true", "yes", "stderr"):
+        enable()
+    else:
+        enable(value)
+
+
+def record(name, seconds):
+    """Adds one run of the phase name that took seconds."""
+    totals = _totals(name)
+    totals[0] += 1
+    totals[1] += seconds
+
+
+def phase(name):
+    """A context manager timing its block as the phase name."""
+    return _Phase(name) if enabled else _NO_PHASE
+
+
+def timed(name):
+    """Decorates a function so each call is timed as the phase name."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def read(nbytes):
+    """Counts bytes read from the data files towards the current phase."""
+    if enabled and _stack:
+        _totals(_stack[-1])[2] += nbytes
+
+
+def wrote(nbytes):
+    """Counts bytes written to the data files towards the current phase."""
+    if enabled and _stack:
+        _totals(_stack[-1])[3] += nbytes
+
+
+def since_start():
+    """Seconds since this module was imported, about when the process started."""
+    return time.perf_counter() - _started
+
+
+def _size(nbytes):
+    if nbytes < 1024:
+        return f"{nbytes} B"
+    return f"{nbytes / 1024:.1f} KiB"
+
+
+def format_report(total=None):
+    """Returns the breakdown of the recorded phases as text."""
+    total = since_start() if total is None else total
+    lines = [f"attendance profile: {total * 1000:.1f} ms total (phases include nested ones)"]
+    width = max((len(name) for name in _phases), default=0)
+    for name, (calls, seconds, nread, nwritten) in _phases.items():
+        line = f"  {name:<{width}}  {seconds * 1000:8.2f} ms"
+        if calls > 1:
+            line += f"  x{calls}"
+        if nread:
+            line += f"  read {_size(nread)}"
+        if nwritten:
+            line += f"  wrote {_size(nwritten)}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def report():
+    """Writes the pstats dump, or the breakdown to stderr."""
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler.dump_stats(_dump_path)
+        return
+    sys.stderr.write(format_report())
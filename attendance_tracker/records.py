@@ -0,0 +1,298 @@
+"""Columnar in-memory storage for attendance records.
+
+A `RecordStore` keeps the records as three parallel `array` columns: dates
+as day ordinals, subjects and statuses as small integers interned in
+per-store tables. It behaves like the list of ``{"date", "subject",
+"status"}`` dicts it replaces: indexing yields a `RecordView` that reads and
+writes the columns, and appending or inserting a dict encodes it.
+
+`RecordStore.count_by_subject` tallies the columns without building a
+dict per record, using NumPy when it is installed.
+
+A store can also be built over read-only column buffers, such as the
+memory-mapped columns of a binary snapshot (see `binsnap`). Such a store
+answers queries straight from the buffers and copies them into arrays the
+first time it is changed.
+"""
+from array import array
+from collections.abc import MutableMapping, MutableSequence
+from datetime import date
+
+# Interned first, so their ids are fixed: present 0, absent 1, cancelled 2.
+STATUSES = ("present", "absent", "cancelled")
+
+RECORD_FIELDS = ("date", "subject", "status")
+
+_numpy = None
+
+
+def _import_numpy():
+    """Returns the numpy module, or None if it isn't installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class RecordView(MutableMapping):
+    """A dict-like view of the record at one position of a `RecordStore`.
+
+    Like a list position, the view refers to whichever record is at that
+    index, so it should not be kept across inserts or deletes.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        store = self._store
+        if key == "date":
+            return store._iso_date(store.dates[self._index])
+        if key == "subject":
+            return store.subjects[store.subject_ids[self._index]]
+        if key == "status":
+            return store.statuses[store.status_ids[self._index]]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        store = self._store
+        store._make_writable()
+        if key == "date":
+            store.dates[self._index] = date.fromisoformat(value).toordinal()
+        elif key == "subject":
+            store.subject_ids[self._index] = store._intern_subject(value)
+        elif key == "status":
+            store.status_ids[self._index] = store._intern_status(value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise TypeError("Record fields cannot be deleted.")
+
+    def __iter__(self):
+        return iter(RECORD_FIELDS)
+
+    def __len__(self):
+        return len(RECORD_FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class RecordStore(MutableSequence):
+    """Attendance records held as interned, columnar arrays."""
+
+    def __init__(self, records=()):
+        self.dates = array("i")
+        self.subject_ids = array("H")
+        self.status_ids = array("B")
+        self.subjects = []
+        self.statuses = []
+        self._subject_ids = {}
+        self._status_ids = {}
+        self._iso_dates = {}
+        for status in STATUSES:
+            self._intern_status(status)
+        self._mapped = False
+        self.extend(records)
+
+    @classmethod
+    def from_columns(cls, dates, subject_ids, status_ids, subjects, statuses):
+        """Returns a store over existing columns without copying them.
+
+        The columns can be any buffers with the item types of the array
+        columns ("i", "H" and "B"), e.g. memoryviews of a mapped file;
+        subjects and statuses are the interning tables the ids refer to.
+        statuses must start with STATUSES.
+        """
+        if tuple(statuses[:len(STATUSES)]) != STATUSES:
+            raise ValueError("The status table must start with present, absent, cancelled.")
+        store = cls()
+        store.dates, store.subject_ids, store.status_ids = dates, subject_ids, status_ids
+        for subject in subjects:
+            store._intern_subject(subject)
+        for status in statuses:
+            store._intern_status(status)
+        store._mapped = not all(
+            isinstance(column, array) for column in (dates, subject_ids, status_ids)
+        )
+        return store
+
+    def _make_writable(self):
+        """Copies buffer-backed columns into arrays before the first change."""
+        if self._mapped:
+            self.dates = array("i", self.dates)
+            self.subject_ids = array("H", self.subject_ids)
+            self.status_ids = array("B", self.status_ids)
+            self._mapped = False
+
+    def _intern_subject(self, subject):
+        subject_id = self._subject_ids.get(subject)
+        if subject_id is None:
+            subject_id = self._subject_ids[subject] = len(self.subjects)
+            self.subjects.append(subject)
+        return subject_id
+
+    def _intern_status(self, status):
+        status_id = self._status_ids.get(status)
+        if status_id is None:
+            status_id = self._status_ids[status] = len(self.statuses)
+            self.statuses.append(status)
+        return status_id
+
+    def _iso_date(self, ordinal):
+        iso = self._iso_dates.get(ordinal)
+        if iso is None:
+            iso = self._iso_dates[ordinal] = date.fromordinal(ordinal).isoformat()
+        return iso
+
+    def _encode(self, record):
+        return (
+            date.fromisoformat(record["date"]).toordinal(),
+            self._intern_subject(record["subject"]),
+            self._intern_status(record["status"]),
+        )
+
+    def copy(self):
+        """Returns a writable store with the same records, copying only the columns."""
+        other = RecordStore.from_columns(
+            array("i", self.dates),
+            array("H", self.subject_ids),
+            array("B", self.status_ids),
+            self.subjects,
+            self.statuses,
+        )
+        other._iso_dates = self._iso_dates
+        return other
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordStore(self.to_list()[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return RecordView(self, index)
+
+    def __setitem__(self, index, record):
+        if isinstance(index, slice):
+            raise TypeError("RecordStore does not support slice assignment.")
+        self._make_writable()
+        self.dates[index], self.subject_ids[index], self.status_ids[index] = (
+            self._encode(record)
+        )
+
+    def __delitem__(self, index):
+        self._make_writable()
+        del self.dates[index]
+        del self.subject_ids[index]
+        del self.status_ids[index]
+
+    def insert(self, index, record):
+        date_ordinal, subject_id, status_id = self._encode(record)
+        self._make_writable()
+        self.dates.insert(index, date_ordinal)
+        self.subject_ids.insert(index, subject_id)
+        self.status_ids.insert(index, status_id)
+
+    def append(self, record):
+        date_ordinal, subject_id, status_id = self._encode(record)
+        self._make_writable()
+        self.dates.append(date_ordinal)
+        self.subject_ids.append(subject_id)
+        self.status_ids.append(status_id)
+
+    def pop(self, index=-1):
+        record = dict(self[index])
+        del self[index]
+        return record
+
+    def __eq__(self, other):
+        if isinstance(other, (RecordStore, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"RecordStore({self.to_list()!r})"
+
+    def to_list(self):
+        """Returns the records as a list of plain dicts."""
+        subjects = self.subjects
+        statuses = self.statuses
+        iso_date = self._iso_date
+        return [
+            {
+                "date": iso_date(date_ordinal),
+                "subject": subjects[subject_id],
+                "status": statuses[status_id],
+            }
+            for date_ordinal, subject_id, status_id in zip(
+                self.dates, self.subject_ids, self.status_ids
+            )
+        ]
+
+    def index_of(self, date_str, subject, seq):
+        """Returns the index of the record with key (date_str, subject, seq), or None."""
+        subject_id = self._subject_ids.get(subject)
+        if subject_id is None:
+            return None
+        date_ordinal = date.fromisoformat(date_str).toordinal()
+        subject_ids = self.subject_ids
+        for i, record_date in enumerate(self.dates):
+            if record_date == date_ordinal and subject_ids[i] == subject_id:
+                if seq == 0:
+                    return i
+                seq -= 1
+        return None
+
+    def max_date(self):
+        """Returns the latest record date as an ISO string, or None if empty."""
+        if not self.dates:
+            return None
+        return self._iso_date(max(self.dates))
+
+    def has_date(self, date_str):
+        """Returns True if any record is on date_str."""
+        return date.fromisoformat(date_str).toordinal() in self.dates
+
+    def count_by_subject(self):
+        """Counts present, absent and cancelled classes per subject.
+
+        Same result as `logic.count_by_subject`: statuses other than present
+        and cancelled count as absent. Runs over the integer columns, as a
+        single `bincount` when NumPy is available.
+        """
+        width = len(self.statuses)
+        numpy = _import_numpy()
+        if numpy is not None and self.dates:
+            subject_ids = numpy.frombuffer(self.subject_ids, dtype=numpy.uint16)
+            status_ids = numpy.frombuffer(self.status_ids, dtype=numpy.uint8)
+            cells = subject_ids.astype(numpy.intp) * width + status_ids
+            tally = numpy.bincount(cells, minlength=len(self.subjects) * width)
+            tally = tally.reshape(len(self.subjects), width).tolist()
+        else:
+            tally = [[0] * width for _ in self.subjects]
+            for subject_id, status_id in zip(self.subject_ids, self.status_ids):
+                tally[subject_id][status_id] += 1
+
+        counters = {}
+        for subject, row in zip(self.subjects, tally):
+            present, cancelled = row[0], row[2]
+            absent = sum(row) - present - cancelled
+            if present or absent or cancelled:
+                counters[subject] = {
+                    "present": present,
+                    "absent": absent,
+                    "cancelled": cancelled,
+                }
+        return counters
@@ -0,0 +1,130 @@
+"""Archives of closed semesters.
+
+The active storage backend only holds the current semester. Closing it
+(`data_manager.close_semester`) moves its records, holidays and settings
+into a file of their own under ``semesters/`` in the data directory:
+
+    semesters/2025-08-04_2025-12-19.json.gz   one closed semester
+    semesters/index.json                      what each archive holds
+
+An archive has the layout of `attendance.json` plus the timetable subjects
+of its semester, and is gzip-compressed unless asked not to be. The index
+keeps each semester's bounds, record count, subjects and per-subject
+counters, so summaries across semesters are answered from the index alone
+and an archive is only decompressed when its records are asked for.
+"""
+from datetime import date, timedelta
+
+from . import codec, logic, storage
+
+ARCHIVE_DIR_NAME = "semesters"
+INDEX_NAME = "index.json"
+
+
+def split_semester(data, next_start):
+    """Splits attendance data at the ISO date next_start.
+
+    Returns (closed, remaining): the records and holidays dated before
+    next_start, with the closed semester's settings, and the rest. A
+    holiday range spanning next_start is kept in both.
+    """
+    closed = storage.empty_attendance_data()
+    remaining = storage.empty_attendance_data()
+    for key in storage.SETTINGS:
+        closed[key] = data[key]
+        remaining[key] = data[key]
+    closed["records"] = [r for r in data["records"] if r["date"] < next_start]
+    remaining["records"] = [r for r in data["records"] if r["date"] >= next_start]
+    closed["holidays"] = [h for h in data["holidays"] if h < next_start]
+    remaining["holidays"] = [h for h in data["holidays"] if h >= next_start]
+    closed["holiday_ranges"] = [
+        pair for pair in data["holiday_ranges"] if pair[0] < next_start
+    ]
+    remaining["holiday_ranges"] = [
+        pair for pair in data["holiday_ranges"] if pair[1] >= next_start
+    ]
+
+    last_day = (date.fromisoformat(next_start) - timedelta(days=1)).isoformat()
+    first_day = min((r["date"] for r in closed["records"]), default=last_day)
+    start = closed["semester_start_date"]
+    if not start or start > first_day:
+        closed["semester_start_date"] = first_day
+    end = closed["semester_end_date"]
+    if not end or end >= next_start:
+        closed["semester_end_date"] = last_day
+    del closed["counters"], remaining["counters"]
+    return closed, remaining
+
+
+class SemesterArchive:
+    """The closed semesters of one data directory.
+
+    Files are read through `repository`, so the index is parsed once per
+    change like the other data files.
+    """
+
+    def __init__(self, directory, repository):
+        self.directory = directory
+        self.index_path = directory / INDEX_NAME
+        self.repository = repository
+
+    def entries(self):
+        """Returns the index entries of the closed semesters, oldest first."""
+        try:
+            return list(self.repository.load(self.index_path))
+        except FileNotFoundError:
+            return []
+
+    def find(self, start):
+        """Returns the entry of the closed semester starting on start."""
+        for entry in self.entries():
+            if entry["start"] == start:
+                return entry
+        raise ValueError(f"No closed semester starts on {start}.")
+
+    def load(self, entry):
+        """Returns the archived attendance data of an index entry."""
+        content = (self.directory / entry["file"]).read_bytes()
+        if entry["file"].endswith(".gz"):
+            import gzip
+
+            content = gzip.decompress(content)
+        return codec.loads(content)
+
+    def add(self, closed, subjects, compress=True):
+        """Archives a closed semester from `split_semester`; returns its entry.
+
+        The archive is written before the index, and an archive for the
+        same dates is replaced, so closing a semester again after a crash
+        leaves a single copy.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        start = closed["semester_start_date"]
+        end = closed["semester_end_date"]
+        name = f"{start}_{end}.json"
+        archived = dict(closed, subjects=list(subjects))
+        content = codec.dumps(archived)
+        if compress:
+            import gzip
+
+            name += ".gz"
+            content = gzip.compress(content, mtime=0)
+        storage.write_atomic(self.directory / name, content)
+
+        entry = {
+            "start": start,
+            "end": end,
+            "file": name,
+            "records": len(closed["records"]),
+            "subjects": list(subjects),
+            "counters": logic.count_by_subject(closed["records"]),
+        }
+        entries = [e for e in self.entries() if e["start"] != start]
+        entries.append(entry)
+        entries.sort(key=lambda e: e["start"])
+        storage.write_atomic(self.index_path, codec.dumps(entries, pretty=True))
+        self.repository.store(self.index_path, entries)
+        for stale in self.directory.glob(f"{start}_*.json*"):
+            if stale.name != name:
+                stale.unlink()
+        return entry
@@ -0,0 +1,1146 @@
+"""Storage backends for the attendance data.
+
+A backend loads and saves the attendance dict (``records``, ``holidays``, the
+settings in ``SETTINGS`` and the per-subject ``counters``) and applies
+incremental mutations to it. Mutations are plain JSON-serializable dicts
+("ops"):
+
+    {"op": "add_record", "record": {"date": ..., "subject": ..., "status": ...}}
+    {"op": "set_status", "date": ..., "subject": ..., "seq": ..., "status": ...}
+    {"op": "delete_record", "date": ..., "subject": ..., "seq": ...}
+    {"op": "cancel", "date": ..., "subject": ...}
+    {"op": "add_holiday", "date": ...}
+    {"op": "remove_holiday", "date": ...}
+    {"op": "add_holiday_range", "start": ..., "end": ...}
+    {"op": "remove_holiday_range", "start": ..., "end": ...}
+    {"op": "set", "key": ..., "value": ...}
+    {"op": "check_day", "date": ..., "records": [...], "holidays": [...]}
+
+``check_day`` saves what `record check` was told about a day, unless the day
+is already done (see `check_day_ops`), and moves the check cursor up to it.
+
+A record is addressed by (date, subject, seq), where seq numbers the records
+for the same subject on the same date (extra classes) in the order they were
+added.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import partial
+from itertools import islice
+
+from . import binsnap, codec, logic, profiling, workdays
+from .records import RecordStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are still atomic, just not locked.
+    fcntl = None
+
+BACKENDS = ("json", "sqlite")
+
+# Formats the JSON backend can keep its snapshot in (see `binsnap`).
+SNAPSHOT_FORMATS = ("json", "binary")
+
+# Scalar (JSON-valued) settings stored alongside the records.
+SETTINGS = (
+    "semester_start_date",
+    "semester_end_date",
+    "working_days",
+    "holiday_ranges",
+    # The last day `record check` dealt with, answered or not.
+    "check_cursor",
+)
+
+
+def empty_attendance_data():
+    """Returns the attendance data of a fresh data directory."""
+    return {
+        "records": [],
+        "holidays": [],
+        "semester_start_date": None,
+        "semester_end_date": None,
+        "working_days": list(workdays.DEFAULT_WORKING_WEEKDAYS),
+        "holiday_ranges": [],
+        "check_cursor": None,
+        "counters": {},
+    }
+
+
+def normalize_attendance_data(data):
+    """Fills in keys missing from attendance data written by older versions."""
+    for key, value in empty_attendance_data().items():
+        if key != "counters":
+            data.setdefault(key, value)
+    if "counters" not in data:
+        data["counters"] = logic.count_by_subject(data["records"])
+    return data
+
+
+def copy_attendance_data(data):
+    """Copies attendance data deep enough for callers to mutate it freely."""
+    copied = dict(data)
+    records = data["records"]
+    if isinstance(records, RecordStore):
+        copied["records"] = records.to_list()
+    else:
+        copied["records"] = [dict(record) for record in records]
+    copied["holidays"] = list(data["holidays"])
+    copied["holiday_ranges"] = [list(pair) for pair in data.get("holiday_ranges", [])]
+    if "counters" in data:
+        copied["counters"] = {
+            subject: dict(subject_counters)
+            for subject, subject_counters in data["counters"].items()
+        }
+    return copied
+
+
+def _working_copy(data):
+    """Copies loaded attendance data deep enough for `apply_op` to change it.
+
+    Unlike `copy_attendance_data` the records stay a `RecordStore`, whose
+    columns are copied without building a dict per record.
+    """
+    copied = dict(data)
+    copied["records"] = data["records"].copy()
+    copied["holidays"] = list(data["holidays"])
+    copied["counters"] = {
+        subject: dict(subject_counters)
+        for subject, subject_counters in data["counters"].items()
+    }
+    return copied
+
+
+def record_keys(records):
+    """Yields the (date, subject, seq) key of each record, in order."""
+    seen = {}
+    for record in records:
+        pair = (record["date"], record["subject"])
+        seq = seen.get(pair, 0)
+        seen[pair] = seq + 1
+        yield pair + (seq,)
+
+
+class RecordIndex:
+    """Sorted views of the records for filtered, paginated lookups.
+
+    Rows are (date, subject, seq, status) tuples sorted by key, kept once for
+    all records and once per subject, so a subject and date range filter is
+    two bisects instead of a scan.
+    """
+
+    def __init__(self, records):
+        if isinstance(records, RecordStore):
+            records = records.to_list()
+        self.rows = sorted(
+            key + (record["status"],)
+            for key, record in zip(record_keys(records), records)
+        )
+        self.by_subject = {}
+        for row in self.rows:
+            self.by_subject.setdefault(row[1], []).append(row)
+
+    def find(
+        self, subject=None, start=None, end=None, status=None, offset=0, limit=None
+    ):
+        """Returns the rows matching the filters; dates are inclusive ISO strings."""
+        rows = self.rows if subject is None else self.by_subject.get(subject, [])
+        lo = 0 if start is None else bisect_left(rows, (start,))
+        hi = len(rows) if end is None else bisect_right(rows, (end, "\uffff"))
+        matches = (rows[i] for i in range(lo, hi))
+        if status is not None:
+            matches = (row for row in matches if row[3] == status)
+        stop = None if limit is None else offset + limit
+        return list(islice(matches, offset, stop))
+
+
+def _find_record(records, date_str, subject, seq):
+    """Returns the index of the record with the given key, or None."""
+    if isinstance(records, RecordStore):
+        return records.index_of(date_str, subject, seq)
+    for i, record in enumerate(records):
+        if record["date"] == date_str and record["subject"] == subject:
+            if seq == 0:
+                return i
+            seq -= 1
+    return None
+
+
+def _count(counters, subject, status, delta):
+    """Adjusts a subject's counters for one record gaining or losing a status."""
+    subject_counters = counters.setdefault(
+        subject, {"present": 0, "absent": 0, "cancelled": 0}
+    )
+    subject_counters[logic.counter_key(status)] += delta
+    if not any(subject_counters.values()):
+        del counters[subject]
+
+
+# The fields each kind of op must carry.
+OP_FIELDS = {
+    "add_record": ("record",),
+    "set_status": ("date", "subject", "seq", "status"),
+    "delete_record": ("date", "subject", "seq"),
+    "cancel": ("date", "subject"),
+    "add_holiday": ("date",),
+    "remove_holiday": ("date",),
+    "add_holiday_range": ("start", "end"),
+    "remove_holiday_range": ("start", "end"),
+    "set": ("key", "value"),
+    "check_day": ("date", "records", "holidays"),
+}
+
+
+def _is_iso_date(value):
+    if not isinstance(value, str):
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_setting_value(key, value):
+    if key == "working_days":
+        return isinstance(value, list) and all(
+            type(weekday) is int and 0 <= weekday < 7 for weekday in value
+        )
+    if key == "holiday_ranges":
+        return isinstance(value, list) and all(
+            isinstance(pair, list) and len(pair) == 2 and all(map(_is_iso_date, pair))
+            for pair in value
+        )
+    # The other settings are dates.
+    return value is None or _is_iso_date(value)
+
+
+# How each op field is checked.
+FIELD_CHECKS = {
+    "date": _is_iso_date,
+    "start": _is_iso_date,
+    "end": _is_iso_date,
+    "subject": lambda value: isinstance(value, str),
+    "status": lambda value: isinstance(value, str),
+    "seq": lambda value: type(value) is int and value >= 0,
+}
+
+
+def validate_op(op):
+    """Raises ValueError unless op is well-formed enough for `apply_op`.
+
+    Fields must have the right types and dates must be valid ISO dates, so
+    an op that passes can be applied and replayed from the journal.
+    Checking a batch up front means a bad op can't leave it half applied.
+    """
+    if not isinstance(op, dict) or op.get("op") not in OP_FIELDS:
+        raise ValueError(f"Unknown op: {op!r}")
+    kind = op["op"]
+    missing = [field for field in OP_FIELDS[kind] if field not in op]
+    if missing:
+        raise ValueError(f"Op {kind} is missing {', '.join(missing)}.")
+    if kind == "add_record":
+        record = op["record"]
+        if not isinstance(record, dict) or not {"date", "subject", "status"} <= set(record):
+            raise ValueError("add_record needs a record with date, subject and status.")
+        fields, names = record, ("date", "subject", "status")
+    elif kind == "set":
+        if op["key"] not in SETTINGS:
+            raise ValueError(f"Unknown setting: {op['key']!r}")
+        if not _is_setting_value(op["key"], op["value"]):
+            raise ValueError(f"Invalid value for {op['key']}: {op['value']!r}")
+        return
+    elif kind == "check_day":
+        if not isinstance(op["records"], list) or not isinstance(op["holidays"], list):
+            raise ValueError("check_day needs lists of records and holidays.")
+        for record in op["records"]:
+            validate_op({"op": "add_record", "record": record})
+        for holiday in op["holidays"]:
+            validate_op({"op": "add_holiday", "date": holiday})
+        fields, names = op, ("date",)
+    else:
+        fields, names = op, OP_FIELDS[kind]
+    for name in names:
+        if not FIELD_CHECKS[name](fields[name]):
+            raise ValueError(f"Op {kind} has an invalid {name}: {fields[name]!r}")
+
+
+def update_holiday_ranges(holiday_ranges, op):
+    """Returns holiday_ranges with the range in an add/remove_holiday_range op applied."""
+    pair = [op["start"], op["end"]]
+    ranges = [list(existing) for existing in holiday_ranges if list(existing) != pair]
+    if op["op"] == "add_holiday_range":
+        ranges.append(pair)
+        ranges.sort()
+    return ranges
+
+
+def check_day_ops(op, check_cursor, has_records_on):
+    """Returns the plain ops a check_day op comes down to.
+
+    Checks started together ask about the same days, so a day that is
+    already done, because it has records or the check cursor is at or past
+    it, keeps what it has and only the cursor moves. has_records_on(date_str)
+    tells whether the data the op is applied to has records on a date.
+    """
+    date_str = op["date"]
+    ops = []
+    if not (check_cursor and date_str <= check_cursor) and not has_records_on(date_str):
+        ops.extend({"op": "add_record", "record": record} for record in op["records"])
+        ops.extend({"op": "add_holiday", "date": holiday} for holiday in op["holidays"])
+    ops.append({"op": "set", "key": "check_cursor", "value": max(check_cursor or "", date_str)})
+    return ops
+
+
+def _has_date(records, date_str):
+    if isinstance(records, RecordStore):
+        return records.has_date(date_str)
+    return any(record["date"] == date_str for record in records)
+
+
+def apply_op(data, op):
+    """Applies a single op to in-memory attendance data.
+
+    The per-subject counters are adjusted by the op's delta rather than
+    recounted.
+    """
+    kind = op["op"]
+    records = data["records"]
+    holidays = data["holidays"]
+    counters = data["counters"]
+
+    if kind == "add_record":
+        records.append(dict(op["record"]))
+        _count(counters, op["record"]["subject"], op["record"]["status"], 1)
+    elif kind == "set_status":
+        i = _find_record(records, op["date"], op["subject"], op["seq"])
+        if i is not None:
+            _count(counters, op["subject"], records[i]["status"], -1)
+            _count(counters, op["subject"], op["status"], 1)
+            records[i]["status"] = op["status"]
+    elif kind == "delete_record":
+        i = _find_record(records, op["date"], op["subject"], op["seq"])
+        if i is not None:
+            _count(counters, op["subject"], records.pop(i)["status"], -1)
+    elif kind == "cancel":
+        i = _find_record(records, op["date"], op["subject"], 0)
+        if i is not None:
+            _count(counters, op["subject"], records[i]["status"], -1)
+            records[i]["status"] = "cancelled"
+        else:
+            records.append(
+                {"date": op["date"], "subject": op["subject"], "status": "cancelled"}
+            )
+        _count(counters, op["subject"], "cancelled", 1)
+    elif kind == "add_holiday":
+        if op["date"] not in holidays:
+            holidays.append(op["date"])
+    elif kind == "remove_holiday":
+        if op["date"] in holidays:
+            holidays.remove(op["date"])
+    elif kind == "add_holiday_range" or kind == "remove_holiday_range":
+        data["holiday_ranges"] = update_holiday_ranges(data["holiday_ranges"], op)
+    elif kind == "set":
+        data[op["key"]] = op["value"]
+    elif kind == "check_day":
+        has_records_on = partial(_has_date, records)
+        for op_part in check_day_ops(op, data.get("check_cursor"), has_records_on):
+            apply_op(data, op_part)
+    else:
+        raise ValueError(f"Unknown op: {kind}")
+
+
+def file_identity(path):
+    """Returns (inode, mtime_ns, size) for path, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def file_stamp(path):
+    """Returns [mtime_ns, size] for path, or None if it doesn't exist."""
+    identity = file_identity(path)
+    if identity is None:
+        return None
+    return list(identity[1:])
+
+
+def write_atomic(path, content, sync=True):
+    """Writes content to path through a temporary file and `os.replace`.
+
+    content may be str or bytes. Readers see either the old or the new
+    contents, never a truncated file. With sync=False the data is not fsynced first, which keeps the file
+    whole but may lose the write in a power cut.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        profiling.wrote(len(content))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+# Seconds to wait for another process to release the data lock.
+LOCK_TIMEOUT = 10.0
+LOCK_POLL_INTERVAL = 0.01
+
+
+class LockTimeout(TimeoutError):
+    """Another process held the data lock for longer than the timeout."""
+
+
+class FileLock:
+    """An advisory, re-entrant `fcntl.flock` lock on a file in the data directory.
+
+    Writers hold it around each read-modify-write of the data so that two
+    processes never interleave their saves; readers don't need it. Without
+    fcntl (Windows) it does nothing.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self):
+        """Takes the lock, raising LockTimeout if it isn't free within the timeout."""
+        if self._depth == 0 and fcntl is not None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        os.close(fd)
+                        raise LockTimeout(
+                            f"Timed out waiting for another process to release {self.path}."
+                        ) from None
+                    time.sleep(LOCK_POLL_INTERVAL)
+            self._fd = fd
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class Repository:
+    """Session-scoped cache of the parsed files in the data directory.
+
+    Each file is parsed once and kept together with its (inode, mtime, size)
+    identity. Later loads only re-read the file if that identity changed,
+    e.g. because another process saved it.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._compiled = {}
+
+    def load(self, path):
+        """Returns the parsed contents of path, re-reading it only if it changed."""
+        identity = file_identity(path)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+        data = codec.load_file(path)
+        # Keyed by the identity seen before reading: if the file was replaced
+        # meanwhile, the next load sees a different identity and reads again.
+        self._cache[path] = (identity, data)
+        profiling.read(identity[2])
+        return data
+
+    def load_compiled(self, path, compile, *args):
+        """Returns compile(contents of path, *args), cached like the contents.
+
+        The result is only compiled again when path changed (or was stored)
+        or when args differ from last time.
+        """
+        data = self.load(path)
+        cached = self._compiled.get(path)
+        if cached is not None and cached[0] is data and cached[1] == args:
+            return cached[2]
+        result = compile(data, *args)
+        self._compiled[path] = (data, args, result)
+        return result
+
+    def store(self, path, data):
+        """Remembers data as the current contents of path after a write."""
+        self._cache[path] = (file_identity(path), data)
+
+    def clear(self):
+        """Forgets every cached file."""
+        self._cache.clear()
+        self._compiled.clear()
+
+
+# Fold the journal into a new snapshot once it grows past this many bytes.
+JOURNAL_COMPACT_BYTES = 64 * 1024
+
+
+class JsonBackend:
+    """Keeps attendance data in a JSON snapshot plus an append-only journal.
+
+    Each op is appended to the journal as one JSON line, so recording a class
+    costs O(1) I/O instead of rewriting the history. Loading replays the
+    journal over the snapshot, and once the journal grows past
+    `compact_bytes` it is folded into a fresh snapshot.
+
+    Journal lines carry an increasing sequence number and the snapshot stores
+    the last one it contains (``journal_seq``), so ops are never applied
+    twice, even after a crash between writing the snapshot and truncating the
+    journal. A torn final line from a crash mid-append is ignored.
+
+    Writers take a `FileLock` and reload before changing anything, so
+    concurrent processes append in turn instead of reusing sequence numbers,
+    and snapshots are replaced atomically. Setting `sync` to False leaves
+    the journal unsynced until `flush` (group commit).
+
+    The snapshot can instead be kept in the binary format of `binsnap`
+    (``attendance.bin``), which is memory-mapped rather than parsed; see
+    `set_snapshot_format`. Whichever snapshot file exists is used, the
+    binary one first.
+    """
+
+    name = "json"
+
+    def __init__(self, path, repository, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.path = path
+        self.binary_path = path.with_suffix(".bin")
+        self.journal_path = path.with_suffix(".journal")
+        self.lock = FileLock(path.with_suffix(".lock"))
+        self.repository = repository
+        self.compact_bytes = compact_bytes
+        self.sync = True
+        self._unsynced = False
+        self._saved_hash = None
+        self._snapshot_identity = None
+        self._journal_identity = None
+        self._journal_offset = 0
+        self._seq = 0
+        self._data = None
+        self._index = None
+
+    def exists(self):
+        return (
+            self.path.exists() or self.binary_path.exists() or self.journal_path.exists()
+        )
+
+    def snapshot_format(self):
+        """Returns the format of the current snapshot (see SNAPSHOT_FORMATS)."""
+        return "binary" if self.binary_path.exists() else "json"
+
+    def _snapshot_path(self, fmt=None):
+        return self.binary_path if (fmt or self.snapshot_format()) == "binary" else self.path
+
+    def _load_snapshot(self):
+        """Returns (data, journal_seq) from the snapshot file."""
+        path = self._snapshot_path()
+        if not path.exists():
+            data = empty_attendance_data()
+            data["records"] = RecordStore()
+            return data, 0
+        if path == self.binary_path:
+            # The records stay mapped until something changes them.
+            data = normalize_attendance_data(binsnap.load_file(path))
+            if profiling.enabled:
+                profiling.read(path.stat().st_size)
+        else:
+            data = normalize_attendance_data(dict(self.repository.load(path)))
+            data["records"] = RecordStore(data["records"])
+        data["holidays"] = list(data["holidays"])
+        data["counters"] = {
+            subject: dict(subject_counters)
+            for subject, subject_counters in data["counters"].items()
+        }
+        return data, data.pop("journal_seq", 0)
+
+    def _replay(self):
+        """Applies complete journal lines past the current offset."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._journal_offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+        profiling.read(len(tail))
+        for line in tail.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            self._journal_offset += len(line)
+            entry = codec.loads(line)
+            if entry["n"] > self._seq:
+                apply_op(self._data, entry["op"])
+                self._seq = entry["n"]
+
+    def load(self):
+        """Returns the cached attendance data; callers must not mutate it."""
+        snapshot_identity = file_identity(self._snapshot_path())
+        journal_identity = file_identity(self.journal_path)
+        if (
+            self._data is not None
+            and snapshot_identity == self._snapshot_identity
+            and journal_identity == self._journal_identity
+        ):
+            return self._data
+
+        appended_only = (
+            self._data is not None
+            and snapshot_identity == self._snapshot_identity
+            and journal_identity is not None
+            and self._journal_identity is not None
+            and journal_identity[0] == self._journal_identity[0]
+            and journal_identity[2] >= self._journal_offset
+        )
+        if not appended_only:
+            self._data, self._seq = self._load_snapshot()
+            self._journal_offset = 0
+        self._replay()
+        self._snapshot_identity = snapshot_identity
+        self._journal_identity = journal_identity
+        return self._data
+
+    def save(self, data):
+        """Writes data as a new snapshot and clears the journal."""
+        with self.lock:
+            self._save(data)
+
+    def set_snapshot_format(self, fmt):
+        """Rewrites the snapshot in fmt, one of SNAPSHOT_FORMATS."""
+        if fmt not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format: {fmt}")
+        with self.lock:
+            self._save(self.load(), fmt)
+
+    def _save(self, data, fmt=None):
+        self.load()
+        fmt = fmt or self.snapshot_format()
+        path = self._snapshot_path(fmt)
+        snapshot = copy_attendance_data(data)
+        snapshot["counters"] = logic.count_by_subject(data["records"])
+        normalize_attendance_data(snapshot)
+        snapshot["journal_seq"] = self._seq
+        content = binsnap.dumps(snapshot) if fmt == "binary" else codec.dumps(snapshot)
+        # The snapshot must be on disk before the journal and any snapshot
+        # in the other format go.
+        write_atomic(path, content)
+        other_path = self.path if path == self.binary_path else self.binary_path
+        for stale_path in (other_path, self.journal_path):
+            if stale_path.exists():
+                stale_path.unlink()
+        self._unsynced = False
+
+        self._saved_hash = (file_identity(path), hashlib.sha256(content).hexdigest())
+        self._data = copy_attendance_data(snapshot)
+        self._data.pop("journal_seq")
+        self._data["records"] = RecordStore(snapshot["records"])
+        if path == self.path:
+            self.repository.store(path, snapshot)
+        self._snapshot_identity = file_identity(path)
+        self._journal_identity = None
+        self._journal_offset = 0
+
+    def apply(self, ops):
+        """Appends ops to the journal, compacting it once it grows too large.
+
+        The batch is applied to a copy of the cached data and swapped in only
+        once it is in the journal, so a bad op leaves neither memory nor disk
+        half changed.
+        """
+        with self.lock:
+            # Reload first: another process may have appended since.
+            data = self.load()
+            for op in ops:
+                validate_op(op)
+            seq = self._seq
+            lines = []
+            for op in ops:
+                seq += 1
+                lines.append(codec.dumps({"n": seq, "op": op}) + b"\n")
+            staged = _working_copy(data)
+            for op in ops:
+                apply_op(staged, op)
+            content = b"".join(lines)
+            with open(self.journal_path, "ab") as f:
+                f.write(content)
+                f.flush()
+                if self.sync:
+                    os.fsync(f.fileno())
+                else:
+                    self._unsynced = True
+            self._data = staged
+            self._seq = seq
+            self._journal_identity = file_identity(self.journal_path)
+            self._journal_offset = self._journal_identity[2]
+
+            if self._journal_offset > self.compact_bytes:
+                self._save(self.load())
+
+    def flush(self):
+        """Fsyncs journal appends made while `sync` was off."""
+        if not self._unsynced:
+            return
+        try:
+            with open(self.journal_path, "a") as f:
+                os.fsync(f.fileno())
+        except FileNotFoundError:
+            pass  # Compacted since; the snapshot was synced.
+        self._unsynced = False
+
+    def compact(self):
+        """Folds the journal into a new snapshot."""
+        with self.lock:
+            self._save(self.load())
+
+    def counters(self):
+        return self.load()["counters"]
+
+    def find_records(
+        self, subject=None, start=None, end=None, status=None, offset=0, limit=None
+    ):
+        """Returns (date, subject, seq, status) rows in key order (see `RecordIndex`)."""
+        data = self.load()
+        index = self._index
+        if index is None or index[0] is not data or index[1] != self._seq:
+            index = self._index = (data, self._seq, RecordIndex(data["records"]))
+        return index[2].find(subject, start, end, status, offset, limit)
+
+    def rebuild_counters(self):
+        """Recounts the counters from the records (saving recounts them)."""
+        self.compact()
+
+    def describe(self):
+        """Returns the last run date and the settings."""
+        data = self.load()
+        last_run_date = data["records"].max_date() or data["semester_start_date"]
+        return {
+            "last_run_date": last_run_date,
+            **{key: data[key] for key in SETTINGS},
+        }
+
+    def holidays(self):
+        return list(self.load()["holidays"])
+
+    def has_records_on(self, date_str):
+        return self.load()["records"].has_date(date_str)
+
+    def stamp(self):
+        """Identifies the on-disk version of the data, for the sidecar state."""
+        return [file_stamp(self._snapshot_path()), file_stamp(self.journal_path)]
+
+    def content_hash(self):
+        """Hashes the snapshot (cached after our own saves) and the journal."""
+        path = self._snapshot_path()
+        identity = file_identity(path)
+        if identity is None:
+            snapshot_hash = ""
+        elif self._saved_hash is not None and self._saved_hash[0] == identity:
+            snapshot_hash = self._saved_hash[1]
+        else:
+            snapshot_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+
+        try:
+            journal = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            journal = b""
+        return f"{snapshot_hash}:{hashlib.sha256(journal).hexdigest()}"
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    UNIQUE (date, subject, seq)
+);
+CREATE INDEX IF NOT EXISTS records_subject_date_status
+    ON records (subject, date, status);
+CREATE TABLE IF NOT EXISTS holidays (date TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS counters (
+    subject TEXT PRIMARY KEY,
+    present INTEGER NOT NULL DEFAULT 0,
+    absent INTEGER NOT NULL DEFAULT 0,
+    cancelled INTEGER NOT NULL DEFAULT 0
+);
+
+-- Keep the per-subject counters in step with every change to records.
+CREATE TRIGGER IF NOT EXISTS records_count_insert AFTER INSERT ON records BEGIN
+    INSERT OR IGNORE INTO counters (subject) VALUES (NEW.subject);
+    UPDATE counters SET
+        present = present + (NEW.status = 'present'),
+        cancelled = cancelled + (NEW.status = 'cancelled'),
+        absent = absent + (NEW.status NOT IN ('present', 'cancelled'))
+    WHERE subject = NEW.subject;
+END;
+CREATE TRIGGER IF NOT EXISTS records_count_delete AFTER DELETE ON records BEGIN
+    UPDATE counters SET
+        present = present - (OLD.status = 'present'),
+        cancelled = cancelled - (OLD.status = 'cancelled'),
+        absent = absent - (OLD.status NOT IN ('present', 'cancelled'))
+    WHERE subject = OLD.subject;
+    DELETE FROM counters
+    WHERE subject = OLD.subject AND present = 0 AND absent = 0 AND cancelled = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS records_count_update AFTER UPDATE OF status ON records
+BEGIN
+    UPDATE counters SET
+        present = present - (OLD.status = 'present') + (NEW.status = 'present'),
+        cancelled = cancelled - (OLD.status = 'cancelled') + (NEW.status = 'cancelled'),
+        absent = absent - (OLD.status NOT IN ('present', 'cancelled'))
+            + (NEW.status NOT IN ('present', 'cancelled'))
+    WHERE subject = NEW.subject;
+END;
+"""
+
+SQLITE_REBUILD_COUNTERS = """
+DELETE FROM counters;
+INSERT INTO counters (subject, present, absent, cancelled)
+SELECT
+    subject,
+    SUM(status = 'present'),
+    SUM(status NOT IN ('present', 'cancelled')),
+    SUM(status = 'cancelled')
+FROM records
+GROUP BY subject;
+"""
+
+
+# The meta key of the SQLite backend's change counter (see `SqliteBackend.stamp`).
+CHANGE_COUNT_KEY = "change_count"
+
+
+class SqliteBackend:
+    """Keeps attendance data in an SQLite database in WAL mode.
+
+    Every op becomes a single-row statement, so recording a class no longer
+    rewrites the whole history. `sqlite3` is imported on first use to keep it
+    off the shell-startup path.
+    """
+
+    name = "sqlite"
+    # SQLite does its own locking, and in WAL mode with synchronous=NORMAL
+    # commits are already grouped into checkpoint fsyncs.
+    sync = True
+
+    def __init__(self, path):
+        self.path = path
+        # Only for read-modify-write sequences spanning several statements.
+        self.lock = FileLock(path.with_suffix(".lock"))
+        # sqlite3 connections can't be shared between threads, and
+        # `attendance serve` reads and writes from worker threads.
+        self._local = threading.local()
+        self._conns = []
+        self._cache = None
+
+    def flush(self):
+        pass
+
+    def _connect(self):
+        """Returns the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            # Only `close` touches a connection from another thread.
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SQLITE_SCHEMA)
+            self._local.conn = conn
+            self._conns.append(conn)
+            has_records = conn.execute("SELECT 1 FROM records LIMIT 1").fetchone()
+            if has_records and not self.counters():
+                # Databases created before counters existed.
+                self.rebuild_counters()
+        return conn
+
+    def close(self):
+        """Closes the connections of every thread."""
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._local = threading.local()
+
+    def exists(self):
+        return self.path.exists()
+
+    def _meta(self, conn):
+        rows = conn.execute(
+            "SELECT key, value FROM meta WHERE key != ?", (CHANGE_COUNT_KEY,)
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def _count_change(self, conn):
+        """Bumps the change counter of `stamp`, in the caller's transaction."""
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, 1)"
+            " ON CONFLICT (key) DO UPDATE SET value = value + 1",
+            (CHANGE_COUNT_KEY,),
+        )
+
+    def load(self):
+        """Returns the cached attendance data; callers must not mutate it."""
+        stamp = self.stamp()
+        if self._cache is not None and self._cache[0] == stamp:
+            return self._cache[1]
+
+        conn = self._connect()
+        data = empty_attendance_data()
+        data.update(self._meta(conn))
+        data["records"] = RecordStore(
+            {"date": date_str, "subject": subject, "status": status}
+            for date_str, subject, status in conn.execute(
+                "SELECT date, subject, status FROM records ORDER BY id"
+            )
+        )
+        data["holidays"] = [
+            date_str
+            for (date_str,) in conn.execute("SELECT date FROM holidays ORDER BY rowid")
+        ]
+        data["counters"] = self.counters()
+        self._cache = (stamp, data)
+        return data
+
+    def save(self, data):
+        """Brings the database in line with data, touching only changed rows."""
+        conn = self._connect()
+        records = data["records"]
+        with conn:
+            wanted = set()
+            rows = []
+            for key, record in zip(record_keys(records), records):
+                wanted.add(key)
+                rows.append(key + (record["status"],))
+            conn.executemany(
+                "INSERT INTO records (date, subject, seq, status) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (date, subject, seq) DO UPDATE SET status = excluded.status"
+                " WHERE status != excluded.status",
+                rows,
+            )
+            stale = [
+                (row_id,)
+                for row_id, date_str, subject, seq in conn.execute(
+                    "SELECT id, date, subject, seq FROM records"
+                )
+                if (date_str, subject, seq) not in wanted
+            ]
+            conn.executemany("DELETE FROM records WHERE id = ?", stale)
+
+            holidays = set(data["holidays"])
+            conn.executemany(
+                "INSERT OR IGNORE INTO holidays (date) VALUES (?)",
+                [(date_str,) for date_str in data["holidays"]],
+            )
+            conn.executemany(
+                "DELETE FROM holidays WHERE date = ?",
+                [
+                    (date_str,)
+                    for (date_str,) in conn.execute("SELECT date FROM holidays")
+                    if date_str not in holidays
+                ],
+            )
+
+            defaults = empty_attendance_data()
+            for key in SETTINGS:
+                self._set_meta(conn, key, data.get(key, defaults[key]))
+            self._count_change(conn)
+        self._cache = None
+
+    def apply(self, ops):
+        for op in ops:
+            validate_op(op)
+        conn = self._connect()
+        with conn:
+            # Take the write lock up front, so check_day ops read what they
+            # write over.
+            conn.execute("BEGIN IMMEDIATE")
+            for op in ops:
+                self._apply_op(conn, op)
+            self._count_change(conn)
+        self._cache = None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value)),
+        )
+
+    def _insert_record(self, conn, date_str, subject, status):
+        (seq,) = conn.execute(
+            "SELECT COUNT(*) FROM records WHERE date = ? AND subject = ?",
+            (date_str, subject),
+        ).fetchone()
+        conn.execute(
+            "INSERT INTO records (date, subject, seq, status) VALUES (?, ?, ?, ?)",
+            (date_str, subject, seq, status),
+        )
+
+    def _apply_op(self, conn, op):
+        kind = op["op"]
+        if kind == "add_record":
+            record = op["record"]
+            self._insert_record(conn, record["date"], record["subject"], record["status"])
+        elif kind == "set_status":
+            conn.execute(
+                "UPDATE records SET status = ? WHERE date = ? AND subject = ? AND seq = ?",
+                (op["status"], op["date"], op["subject"], op["seq"]),
+            )
+        elif kind == "delete_record":
+            key = (op["date"], op["subject"])
+            cursor = conn.execute(
+                "DELETE FROM records WHERE date = ? AND subject = ? AND seq = ?",
+                key + (op["seq"],),
+            )
+            if cursor.rowcount:
+                # Close the gap in two steps so UNIQUE (date, subject, seq)
+                # never sees two rows with the same seq.
+                conn.execute(
+                    "UPDATE records SET seq = -seq WHERE date = ? AND subject = ? AND seq > ?",
+                    key + (op["seq"],),
+                )
+                conn.execute(
+                    "UPDATE records SET seq = -seq - 1 WHERE date = ? AND subject = ? AND seq < 0",
+                    key,
+                )
+        elif kind == "cancel":
+            cursor = conn.execute(
+                "UPDATE records SET status = 'cancelled'"
+                " WHERE date = ? AND subject = ? AND seq = 0",
+                (op["date"], op["subject"]),
+            )
+            if not cursor.rowcount:
+                self._insert_record(conn, op["date"], op["subject"], "cancelled")
+        elif kind == "add_holiday":
+            conn.execute("INSERT OR IGNORE INTO holidays (date) VALUES (?)", (op["date"],))
+        elif kind == "remove_holiday":
+            conn.execute("DELETE FROM holidays WHERE date = ?", (op["date"],))
+        elif kind == "add_holiday_range" or kind == "remove_holiday_range":
+            holiday_ranges = self._meta(conn).get("holiday_ranges", [])
+            self._set_meta(
+                conn, "holiday_ranges", update_holiday_ranges(holiday_ranges, op)
+            )
+        elif kind == "set":
+            self._set_meta(conn, op["key"], op["value"])
+        elif kind == "check_day":
+            check_cursor = self._meta(conn).get("check_cursor")
+            has_records_on = partial(self._has_records_on, conn)
+            for op_part in check_day_ops(op, check_cursor, has_records_on):
+                self._apply_op(conn, op_part)
+        else:
+            raise ValueError(f"Unknown op: {kind}")
+
+    def describe(self):
+        """Returns the last run date and the settings."""
+        conn = self._connect()
+        meta = self._meta(conn)
+        defaults = empty_attendance_data()
+        (last_run_date,) = conn.execute("SELECT MAX(date) FROM records").fetchone()
+        return {
+            "last_run_date": last_run_date or meta.get("semester_start_date"),
+            **{key: meta.get(key, defaults[key]) for key in SETTINGS},
+        }
+
+    def find_records(
+        self, subject=None, start=None, end=None, status=None, offset=0, limit=None
+    ):
+        """Returns (date, subject, seq, status) rows in key order."""
+        where = []
+        params = []
+        for clause, value in (
+            ("subject = ?", subject),
+            ("date >= ?", start),
+            ("date <= ?", end),
+            ("status = ?", status),
+        ):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = "SELECT date, subject, seq, status FROM records"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY date, subject, seq LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return list(self._connect().execute(sql, params))
+
+    def holidays(self):
+        conn = self._connect()
+        return [
+            date_str
+            for (date_str,) in conn.execute("SELECT date FROM holidays ORDER BY rowid")
+        ]
+
+    def has_records_on(self, date_str):
+        return self._has_records_on(self._connect(), date_str)
+
+    def _has_records_on(self, conn, date_str):
+        row = conn.execute(
+            "SELECT 1 FROM records WHERE date = ? LIMIT 1", (date_str,)
+        ).fetchone()
+        return row is not None
+
+    def counters(self):
+        conn = self._connect()
+        return {
+            subject: {"present": present, "absent": absent, "cancelled": cancelled}
+            for subject, present, absent, cancelled in conn.execute(
+                "SELECT subject, present, absent, cancelled FROM counters"
+            )
+        }
+
+    def rebuild_counters(self):
+        """Recounts the counters table from the records."""
+        conn = self._connect()
+        with conn:
+            for statement in SQLITE_REBUILD_COUNTERS.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            self._count_change(conn)
+        self._cache = None
+
+    def stamp(self):
+        """Identifies the version of the data, for the sidecar state.
+
+        This is the database file's inode and a counter every write bumps,
+        not the file stats: closing the last connection checkpoints the WAL
+        and deletes the ``-wal`` file without changing the data.
+        """
+        identity = file_identity(self.path)
+        if identity is None:
+            return None
+        row = self._connect().execute(
+            "SELECT value FROM meta WHERE key = ?", (CHANGE_COUNT_KEY,)
+        ).fetchone()
+        return [identity[0], int(row[0]) if row else 0]
+
+    def content_hash(self):
+        return None
@@ -0,0 +1,166 @@
+"""Serving many students' data directories from one process.
+
+Each data directory is a `data_manager.Tenant`. A `TenantPool` keeps the
+most recently used tenants, with their parsed files and open databases, so
+coming back to a student is a dictionary lookup instead of a fresh parse.
+
+`cohort_report` computes the `view summary` statistics for many data
+directories at once, spreading them over a process pool.
+"""
+import math
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from . import data_manager
+
+DEFAULT_POOL_SIZE = 64
+
+# Files whose presence marks a directory as a data directory.
+TENANT_MARKERS = ("timetable.json", "attendance.json", "attendance.bin", "attendance.db")
+
+# Chunks of data directories queued per worker process, so that workers
+# finishing early pick up the slack.
+COHORT_CHUNKS_PER_WORKER = 4
+
+COHORT_FIELDS = (
+    "student",
+    "subject",
+    "present",
+    "absent",
+    "cancelled",
+    "total",
+    "percentage",
+    "needed",
+    "missable",
+    "error",
+)
+
+
+class TenantPool:
+    """A bounded, least-recently-used cache of tenants keyed by data directory."""
+
+    def __init__(self, capacity=DEFAULT_POOL_SIZE):
+        if capacity < 1:
+            raise ValueError("A tenant pool needs room for at least one tenant.")
+        self.capacity = capacity
+        self._tenants = OrderedDict()
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def __contains__(self, data_dir):
+        return Path(data_dir).resolve() in self._tenants
+
+    def get(self, data_dir):
+        """Returns the tenant for data_dir, opening it (and evicting the oldest) if needed."""
+        key = Path(data_dir).resolve()
+        tenant = self._tenants.get(key)
+        if tenant is not None:
+            self._tenants.move_to_end(key)
+            return tenant
+
+        tenant = self._tenants[key] = data_manager.Tenant(key)
+        while len(self._tenants) > self.capacity:
+            _, evicted = self._tenants.popitem(last=False)
+            evicted.close()
+        return tenant
+
+    def close(self):
+        """Closes every tenant in the pool."""
+        while self._tenants:
+            _, tenant = self._tenants.popitem()
+            tenant.close()
+
+
+def discover(root):
+    """Returns the data directories directly under root, sorted by name."""
+    return [
+        path
+        for path in sorted(Path(root).iterdir())
+        if path.is_dir() and any((path / marker).exists() for marker in TENANT_MARKERS)
+    ]
+
+
+def summarize(tenant):
+    """Returns {subject: stats} for a tenant (see `data_manager.get_subject_stats`)."""
+    with tenant:
+        return data_manager.get_subject_stats()
+
+
+def cohort_rows(data_dir):
+    """Returns one report row per subject of the data directory.
+
+    A directory that can't be read gives a single row carrying the error,
+    so one broken directory doesn't stop the report.
+    """
+    data_dir = Path(data_dir)
+    tenant = data_manager.Tenant(data_dir)
+    try:
+        stats = summarize(tenant)
+    except (OSError, ValueError, KeyError) as e:
+        row = dict.fromkeys(COHORT_FIELDS)
+        row.update(student=data_dir.name, error=str(e))
+        return [row]
+    finally:
+        tenant.close()
+
+    return [
+        {
+            "student": data_dir.name,
+            "subject": subject,
+            "present": subject_stats["present"],
+            "absent": subject_stats["absent"],
+            "cancelled": subject_stats["cancelled"],
+            "total": subject_stats["total"],
+            "percentage": round(subject_stats["percentage"], 2),
+            "needed": subject_stats["needed"],
+            "missable": subject_stats["missable"],
+            "error": None,
+        }
+        for subject, subject_stats in stats.items()
+    ]
+
+
+def _cohort_chunk(data_dirs, backend):
+    """Worker entry point: report rows for a chunk of data directories."""
+    if backend:
+        data_manager.set_backend(backend)
+    return [row for data_dir in data_dirs for row in cohort_rows(data_dir)]
+
+
+def cohort_chunks(data_dirs, workers, chunk_size=None):
+    """Splits data_dirs into the chunks handed to worker processes.
+
+    Without a chunk_size, each of the workers gets about
+    COHORT_CHUNKS_PER_WORKER chunks.
+    """
+    if chunk_size is None:
+        chunk_count = workers * COHORT_CHUNKS_PER_WORKER
+        chunk_size = max(1, math.ceil(len(data_dirs) / chunk_count))
+    return [data_dirs[i:i + chunk_size] for i in range(0, len(data_dirs), chunk_size)]
+
+
+def cohort_report(data_dirs, workers=None, chunk_size=None):
+    """Yields lists of report rows for data_dirs as worker processes finish them.
+
+    workers defaults to the number of CPUs. Directories are sent to the
+    workers in chunks (see `cohort_chunks`); with workers=1 or a single
+    chunk everything runs in this process. Chunks finish in any order, but
+    the rows of one student always arrive together.
+    """
+    data_dirs = [str(data_dir) for data_dir in data_dirs]
+    workers = workers or os.cpu_count() or 1
+    chunks = cohort_chunks(data_dirs, workers, chunk_size)
+    backend = data_manager.get_backend_name()
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield _cohort_chunk(chunk, backend)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        futures = [executor.submit(_cohort_chunk, chunk, backend) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,141 @@
+"""Compiled timetables: which subjects are held on a given date.
+
+`timetable.json` holds a weekly timetable, ``{"Monday": [subjects], ...}``.
+When the timetable changes during a semester, the file instead lists its
+revisions, each in effect from its date until the next one starts (the
+first also covers everything before it):
+
+    {"revisions": [
+        {"from": "2026-01-05", "days": {"Monday": ["Math", "Physics"]}},
+        {"from": "2026-03-02", "days": {"Monday": [
+            "Math", {"subject": "Physics Lab", "weeks": "odd"}
+        ]}}
+    ]}
+
+Besides a subject name, a day may list ``{"subject": name, "weeks": "odd"}``
+(or ``"even"``) for a class held in alternate weeks. Weeks are numbered
+from the week of the semester start, which is week 1; without a start date
+the ISO week number is used.
+
+`compile_timetable` turns either form into a `Timetable`. Looking up a date
+is a bisect over the revision start dates and an index by week parity and
+weekday into precomputed tuples, with no date formatting.
+"""
+from bisect import bisect_right
+from datetime import date
+
+from .workdays import WEEKDAY_NAMES, weekday_of
+
+WEEK_RULES = ("odd", "even")
+
+_WEEKDAYS = {name.lower(): weekday for weekday, name in enumerate(WEEKDAY_NAMES)}
+
+
+def _parse_entry(entry):
+    """Returns (subject, weeks) for a timetable entry; weeks is None for every week."""
+    if isinstance(entry, str):
+        return entry, None
+    if not isinstance(entry, dict) or not isinstance(entry.get("subject"), str):
+        raise ValueError(f"Invalid timetable entry: {entry!r}")
+    weeks = entry.get("weeks")
+    if weeks is not None and weeks not in WEEK_RULES:
+        raise ValueError(f"Invalid weeks for {entry['subject']}: {weeks!r}")
+    return entry["subject"], weeks
+
+
+def _parse_days(days):
+    """Returns (odd week, even week) tuples of seven subject tuples each."""
+    if not isinstance(days, dict):
+        raise ValueError(f"Invalid weekly timetable: {days!r}")
+    odd = [()] * 7
+    even = [()] * 7
+    for name, entries in days.items():
+        weekday = _WEEKDAYS.get(str(name).lower())
+        if weekday is None:
+            raise ValueError(f"Unknown weekday in timetable: {name}")
+        parsed = [_parse_entry(entry) for entry in entries]
+        odd[weekday] = tuple(subject for subject, weeks in parsed if weeks != "even")
+        even[weekday] = tuple(subject for subject, weeks in parsed if weeks != "odd")
+    return tuple(odd), tuple(even)
+
+
+def _monday_of(day):
+    """Returns the ordinal of the Monday of the ISO date day, or None."""
+    if not day:
+        return None
+    ordinal = date.fromisoformat(day).toordinal()
+    return ordinal - weekday_of(ordinal)
+
+
+class Timetable:
+    """A timetable compiled for lookups by date.
+
+    `revisions` are (start, days) pairs: an ISO date (None for the first
+    revision) and a weekly timetable in the `timetable.json` form. Week
+    parity is counted from `week_one`, an ISO date in week 1.
+    """
+
+    __slots__ = ("_starts", "_weeks", "_week_one", "alternating", "subjects")
+
+    def __init__(self, revisions=(), week_one=None):
+        parsed = sorted(
+            (date.fromisoformat(start).toordinal() if start else 0, _parse_days(days))
+            for start, days in revisions
+        ) or [(0, _parse_days({}))]
+        starts = [start for start, _ in parsed]
+        if len(set(starts)) != len(starts):
+            raise ValueError("Two timetable revisions start on the same date.")
+
+        # The first revision is in effect before its start date as well.
+        self._starts = starts[1:]
+        self._weeks = [weeks for _, weeks in parsed]
+        self.alternating = any(odd != even for odd, even in self._weeks)
+        self._week_one = _monday_of(week_one)
+        self.subjects = tuple(sorted({
+            subject
+            for weeks in self._weeks
+            for days in weeks
+            for subjects in days
+            for subject in subjects
+        }))
+
+    def counting_weeks_from(self, week_one):
+        """Returns this timetable with week 1 being the week of the ISO date week_one."""
+        other = object.__new__(Timetable)
+        other._starts = self._starts
+        other._weeks = self._weeks
+        other.alternating = self.alternating
+        other.subjects = self.subjects
+        other._week_one = _monday_of(week_one)
+        return other
+
+    def _is_even_week(self, ordinal):
+        if self._week_one is None:
+            return date.fromordinal(ordinal).isocalendar()[1] % 2 == 0
+        return (ordinal - self._week_one) // 7 % 2 == 1
+
+    def subjects_on(self, day):
+        """Returns the subjects held on the date day, in timetable order."""
+        ordinal = day.toordinal()
+        odd, even = self._weeks[bisect_right(self._starts, ordinal)]
+        if self.alternating and self._is_even_week(ordinal):
+            return even[weekday_of(ordinal)]
+        return odd[weekday_of(ordinal)]
+
+    def has_classes(self, day):
+        """Returns True if any subject is held on the date day."""
+        return bool(self.subjects_on(day))
+
+
+def compile_timetable(timetable, week_one=None):
+    """Compiles the contents of `timetable.json` into a `Timetable`."""
+    if not isinstance(timetable, dict):
+        raise ValueError("The timetable must be a JSON object.")
+    if "revisions" not in timetable:
+        return Timetable([(None, timetable)], week_one)
+    revisions = []
+    for revision in timetable["revisions"]:
+        if not isinstance(revision, dict):
+            raise ValueError(f"Invalid timetable revision: {revision!r}")
+        revisions.append((revision.get("from"), revision.get("days", {})))
+    return Timetable(revisions, week_one)
@@ -0,0 +1,171 @@
+"""Working-day arithmetic for catching up on missed days.
+
+Dates are handled as proleptic ordinals (`date.toordinal`), where day 1 is a
+Monday, so the weekday of an ordinal is simply ``(ordinal - 1) % 7``.
+
+A `WorkCalendar` combines a configurable working week with holidays. Single
+holidays and holiday ranges are merged into sorted, disjoint intervals, so
+"is this a class day?" is one bisect however many holidays there are.
+Counting is closed-form and enumeration steps through each working weekday
+with a stride of seven days instead of testing every date.
+"""
+from bisect import bisect_right
+from datetime import date
+
+# Monday to Friday.
+DEFAULT_WORKING_WEEKDAYS = (0, 1, 2, 3, 4)
+
+WEEKDAY_NAMES = (
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+)
+
+
+def weekday_of(ordinal):
+    """Returns the weekday (Monday is 0) of a date ordinal."""
+    return (ordinal - 1) % 7
+
+
+def parse_weekdays(text):
+    """Parses comma-separated weekday names ("mon,tue,sat") into sorted numbers."""
+    weekdays = set()
+    for name in text.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        matches = [
+            i for i, full_name in enumerate(WEEKDAY_NAMES)
+            if full_name.lower().startswith(name)
+        ]
+        if len(name) < 2 or len(matches) != 1:
+            raise ValueError(f"Unknown weekday: {name}")
+        weekdays.add(matches[0])
+    return sorted(weekdays)
+
+
+def holiday_ordinals(holidays):
+    """Parses ISO holiday strings into a sorted list of distinct ordinals."""
+    return sorted({date.fromisoformat(holiday).toordinal() for holiday in holidays})
+
+
+def _count_weekdays(start_ordinal, end_ordinal, weekdays):
+    """Counts the ordinals in [start_ordinal, end_ordinal) falling on `weekdays`."""
+    days = end_ordinal - start_ordinal
+    if days <= 0:
+        return 0
+    full_weeks, rest = divmod(days, 7)
+    first_weekday = weekday_of(start_ordinal)
+    count = full_weeks * len(weekdays)
+    count += sum(1 for i in range(rest) if (first_weekday + i) % 7 in weekdays)
+    return count
+
+
+class WorkCalendar:
+    """Decides which days are class days.
+
+    `weekdays` are the working weekdays (Monday is 0), `holidays` ISO date
+    strings (or sorted ordinals from `holiday_ordinals`) and `holiday_ranges`
+    inclusive (start, end) pairs of ISO date strings.
+    """
+
+    def __init__(
+        self, weekdays=DEFAULT_WORKING_WEEKDAYS, holidays=(), holiday_ranges=()
+    ):
+        self.weekdays = frozenset(weekdays)
+        intervals = [(ordinal, ordinal) for ordinal in _as_ordinals(holidays)]
+        intervals.extend(
+            (date.fromisoformat(start).toordinal(), date.fromisoformat(end).toordinal())
+            for start, end in holiday_ranges
+        )
+        intervals.sort()
+
+        # Merge overlapping and adjacent intervals.
+        self._starts = []
+        self._ends = []
+        for start, end in intervals:
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def is_holiday(self, day):
+        ordinal = day.toordinal()
+        i = bisect_right(self._starts, ordinal) - 1
+        return i >= 0 and ordinal <= self._ends[i]
+
+    def is_class_day(self, day):
+        return weekday_of(day.toordinal()) in self.weekdays and not self.is_holiday(day)
+
+    def _intervals_between(self, start_ordinal, end_ordinal):
+        """Yields the holiday intervals overlapping [start_ordinal, end_ordinal)."""
+        i = max(bisect_right(self._starts, start_ordinal) - 1, 0)
+        while i < len(self._starts) and self._starts[i] < end_ordinal:
+            if self._ends[i] >= start_ordinal:
+                yield self._starts[i], self._ends[i]
+            i += 1
+
+    def count_class_days(self, start, end):
+        """Counts the class days in [start, end) without walking the range."""
+        start_ordinal, end_ordinal = start.toordinal(), end.toordinal()
+        count = _count_weekdays(start_ordinal, end_ordinal, self.weekdays)
+        for first, last in self._intervals_between(start_ordinal, end_ordinal):
+            count -= _count_weekdays(
+                max(first, start_ordinal), min(last + 1, end_ordinal), self.weekdays
+            )
+        return count
+
+    def class_days(self, start, end):
+        """Lists the class days in [start, end) as dates, in order."""
+        start_ordinal, end_ordinal = start.toordinal(), end.toordinal()
+        if end_ordinal <= start_ordinal:
+            return []
+
+        days = []
+        first_weekday = weekday_of(start_ordinal)
+        for weekday in self.weekdays:
+            first = start_ordinal + (weekday - first_weekday) % 7
+            days.extend(range(first, end_ordinal, 7))
+        days.sort()
+
+        intervals = list(self._intervals_between(start_ordinal, end_ordinal))
+        if intervals:
+            kept = []
+            i = 0
+            for ordinal in days:
+                while i < len(intervals) and intervals[i][1] < ordinal:
+                    i += 1
+                if i == len(intervals) or ordinal < intervals[i][0]:
+                    kept.append(ordinal)
+            days = kept
+        return [date.fromordinal(ordinal) for ordinal in days]
+
+
+def count_working_days(start, end, holidays=(), weekdays=DEFAULT_WORKING_WEEKDAYS):
+    """Counts the working days in [start, end) without walking the range.
+
+    `holidays` is an iterable of ISO date strings, or a sorted list of
+    ordinals from `holiday_ordinals`.
+    """
+    return WorkCalendar(weekdays, holidays).count_class_days(start, end)
+
+
+def working_days(start, end, holidays=(), weekdays=DEFAULT_WORKING_WEEKDAYS):
+    """Lists the working days in [start, end) as dates, in order.
+
+    `holidays` is an iterable of ISO date strings, or a sorted list of
+    ordinals from `holiday_ordinals`.
+    """
+    return WorkCalendar(weekdays, holidays).class_days(start, end)
+
+
+def _as_ordinals(holidays):
+    """Accepts holidays as ISO strings or as ordinals from `holiday_ordinals`."""
+    if isinstance(holidays, list) and (not holidays or isinstance(holidays[0], int)):
+        return holidays
+    return holiday_ordinals(holidays)
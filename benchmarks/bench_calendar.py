@@ -0,0 +1,69 @@
+"""Benchmarks missed-day enumeration over multi-year ranges.
+
+Compares the original day-by-day walk (a `weekday()` call and a linear
+holiday-list lookup per date) with `attendance_tracker.workdays`. Prints one
+JSON object per case.
+
+    python benchmarks/bench_calendar.py
+"""
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from attendance_tracker import workdays
+
+CASES = [
+    # (years, holidays)
+    (1, 20),
+    (4, 1000),
+    (10, 3000),
+    (25, 8000),
+]
+
+
+def day_by_day(start, end, holidays):
+    """The pre-workdays implementation of logic.get_missed_days."""
+    missed_days = []
+    current_date = start
+    while current_date < end:
+        if current_date.weekday() < 5 and current_date.isoformat() not in holidays:
+            missed_days.append(current_date)
+        current_date += timedelta(days=1)
+    return missed_days
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    rng = random.Random(0)
+    for years, holiday_count in CASES:
+        start = date(2000, 1, 1)
+        end = start + timedelta(days=365 * years)
+        span = (end - start).days
+        holidays = [
+            (start + timedelta(days=rng.randrange(span))).isoformat()
+            for _ in range(holiday_count)
+        ]
+
+        result = {"years": years, "holidays": holiday_count}
+        if years * holiday_count <= 40_000:
+            result["day_by_day_s"] = best_of(lambda: day_by_day(start, end, holidays))
+        result["workdays_s"] = best_of(
+            lambda: workdays.working_days(start, end, holidays)
+        )
+        result["count_s"] = best_of(
+            lambda: workdays.count_working_days(start, end, holidays)
+        )
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
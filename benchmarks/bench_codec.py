@@ -0,0 +1,93 @@
+"""Benchmarks saving and loading the attendance snapshot in each encoding.
+
+Compares the original pretty-printed stdlib encoding with the compact
+encoding of `attendance_tracker.codec`, with and without orjson (the orjson
+rows are skipped when it isn't installed), and with the memory-mapped
+binary snapshot of `attendance_tracker.binsnap`. Prints one JSON object per
+case with the best save and load times and the file size.
+
+    python benchmarks/bench_codec.py
+"""
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from attendance_tracker import binsnap, codec, storage
+
+SIZES = [1_000, 10_000, 100_000]
+
+SUBJECTS = ["Math", "Physics", "Chemistry", "Biology", "English", "History"]
+
+
+def make_data(count, rng):
+    data = storage.empty_attendance_data()
+    start = date(2020, 1, 6)
+    data["records"] = [
+        {
+            "date": (start + timedelta(days=i // 6)).isoformat(),
+            "subject": rng.choice(SUBJECTS),
+            "status": rng.choice(["present", "present", "present", "absent", "cancelled"]),
+        }
+        for i in range(count)
+    ]
+    data["semester_start_date"] = start.isoformat()
+    return data
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def indented_save(path, data):
+    """The pre-codec save: pretty-printed stdlib JSON."""
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def indented_load(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def codec_save(path, data):
+    path.write_bytes(codec.dumps(data))
+
+
+def binary_save(path, data):
+    path.write_bytes(binsnap.dumps(data))
+
+
+def encodings():
+    yield "stdlib_indented", indented_save, indented_load
+    with patch.object(codec, "_orjson", False):
+        yield "stdlib_compact", codec_save, codec.load_file
+    if codec._import_orjson() is not None:
+        yield "orjson_compact", codec_save, codec.load_file
+    yield "binary", binary_save, binsnap.load_file
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "attendance.json"
+        for size in SIZES:
+            data = make_data(size, rng)
+            for name, save, load in encodings():
+                result = {"records": size, "encoding": name}
+                result["save_s"] = best_of(lambda: save(path, data))
+                result["load_s"] = best_of(lambda: load(path))
+                result["bytes"] = path.stat().st_size
+                print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Generates synthetic data directories for benchmarks.
+
+Each data directory gets a `timetable.json` and an `attendance.json` like
+a real student's: a weekly timetable, semesters of about 18 weeks separated
+by breaks (stored as holiday ranges), scattered single holidays, and a
+record for every class held, mostly present. The history ends today, so
+`record check` has nothing left to ask.
+
+    python benchmarks/generate.py OUT_DIR [--subjects 6] [--semesters 2]
+        [--holidays 8] [--records N] [--students 1] [--seed 0]
+
+With --records the history is made exactly that long, adding semesters as
+needed. With --students > 1, OUT_DIR gets one data directory per student
+(student-000, student-001, ...), as read by `attendance report cohort`.
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from attendance_tracker import codec, storage, workdays
+
+SUBJECT_NAMES = [
+    "Mathematics",
+    "Physics",
+    "Chemistry",
+    "Biology",
+    "English",
+    "History",
+    "Geography",
+    "Economics",
+    "Computer Science",
+    "Art",
+    "Music",
+    "Philosophy",
+]
+
+SEMESTER_WEEKS = 18
+BREAK_WEEKS = 4
+
+# Chances of each status for a class that was held.
+STATUS_WEIGHTS = {"present": 0.82, "absent": 0.14, "cancelled": 0.04}
+
+
+def subject_names(count):
+    """Returns count distinct subject names."""
+    names = SUBJECT_NAMES[:count]
+    names += [f"Elective {i}" for i in range(1, count - len(names) + 1)]
+    return names
+
+
+def make_timetable(rng, subjects, classes_per_day=4):
+    """Returns a Monday to Friday timetable using every subject at least once."""
+    days = workdays.WEEKDAY_NAMES[:5]
+    timetable = {day: [] for day in days}
+    for i, subject in enumerate(subjects):
+        timetable[days[i % len(days)]].append(subject)
+    for day in days:
+        while len(timetable[day]) < classes_per_day:
+            unused = [subject for subject in subjects if subject not in timetable[day]]
+            timetable[day].append(rng.choice(unused or subjects))
+        rng.shuffle(timetable[day])
+    return timetable
+
+
+def semester_bounds(end, semesters):
+    """Returns (start, end) date pairs of semesters, the last ending on end."""
+    bounds = []
+    for _ in range(semesters):
+        start = end - timedelta(weeks=SEMESTER_WEEKS) + timedelta(days=1)
+        bounds.append((start, end))
+        end = start - timedelta(weeks=BREAK_WEEKS)
+    return bounds[::-1]
+
+
+def make_attendance(rng, timetable, semesters=2, holidays=8, records=None, end=None):
+    """Returns attendance data for timetable in the `attendance.json` layout.
+
+    holidays single holidays fall in each semester; the breaks between
+    semesters are holiday ranges. With records set, as many semesters as
+    needed are generated and the oldest records are trimmed to that count.
+    """
+    end = end or date.today()
+    while True:
+        bounds = semester_bounds(end, semesters)
+        holiday_dates = set()
+        for start, stop in bounds:
+            span = (stop - start).days
+            holiday_dates.update(
+                (start + timedelta(days=rng.randrange(span))).isoformat()
+                for _ in range(holidays)
+            )
+        ranges = [
+            [(stop + timedelta(days=1)).isoformat(), (start - timedelta(days=1)).isoformat()]
+            for (_, stop), (start, _) in zip(bounds, bounds[1:])
+        ]
+        calendar = workdays.WorkCalendar(
+            workdays.DEFAULT_WORKING_WEEKDAYS, holiday_dates, ranges
+        )
+        history = []
+        for start, stop in bounds:
+            for day in calendar.class_days(start, stop + timedelta(days=1)):
+                for subject in timetable.get(day.strftime("%A"), []):
+                    status = rng.choices(
+                        list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values())
+                    )[0]
+                    history.append(
+                        {"date": day.isoformat(), "subject": subject, "status": status}
+                    )
+        if records is None or len(history) >= records:
+            break
+        semesters += 1
+
+    if records is not None:
+        history = history[len(history) - records:]
+    data = storage.empty_attendance_data()
+    data.update(
+        records=history,
+        holidays=sorted(holiday_dates),
+        holiday_ranges=ranges,
+        semester_start_date=bounds[0][0].isoformat(),
+    )
+    del data["counters"]
+    return storage.normalize_attendance_data(data)
+
+
+def generate(directory, subjects=6, semesters=2, holidays=8, records=None, seed=0):
+    """Writes a timetable.json and attendance.json into directory.
+
+    Returns a short description of what was generated.
+    """
+    rng = random.Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    timetable = make_timetable(rng, subject_names(subjects))
+    data = make_attendance(rng, timetable, semesters, holidays, records)
+    (directory / "timetable.json").write_bytes(codec.dumps(timetable, pretty=True))
+    (directory / "attendance.json").write_bytes(codec.dumps(data))
+    return {
+        "directory": str(directory),
+        "subjects": subjects,
+        "records": len(data["records"]),
+        "holidays": len(data["holidays"]),
+        "semester_start_date": data["semester_start_date"],
+    }
+
+
+def generate_cohort(root, students, seed=0, **options):
+    """Writes one data directory per student under root; returns their descriptions."""
+    return [
+        generate(Path(root) / f"student-{i:03}", seed=seed + i, **options)
+        for i in range(students)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--semesters", type=int, default=2)
+    parser.add_argument("--holidays", type=int, default=8, help="Single holidays per semester.")
+    parser.add_argument("--records", type=int, help="Exact number of records.")
+    parser.add_argument("--students", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    options = dict(
+        subjects=args.subjects,
+        semesters=args.semesters,
+        holidays=args.holidays,
+        records=args.records,
+    )
+    if args.students == 1:
+        generated = [generate(args.out_dir, seed=args.seed, **options)]
+    else:
+        generated = generate_cohort(args.out_dir, args.students, seed=args.seed, **options)
+    for description in generated:
+        print(json.dumps(description))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Runs the benchmark suite over generated data of growing size.
+
+For each scale, `generate.py` writes a data directory, and the common
+operations are timed against it: loading and saving the attendance data,
+missed-day enumeration, the per-subject statistics in `logic`, rendering
+`view summary` and a complete `record check --quiet` in a fresh process.
+
+Prints one JSON object per line: first the environment (commit, Python),
+then one result per (scale, case) with the best of --repeat runs. Save the
+output of one commit and pass it as --baseline when running another to get
+the ratio for every case.
+
+    python benchmarks/run.py [--scales semester,degree,archive] [--repeat 5]
+        [--baseline results.jsonl] > results.jsonl
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from attendance_tracker import data_manager, logic
+from attendance_tracker.main import cli
+
+import generate
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+SCALES = {
+    # One student's current semester.
+    "semester": dict(subjects=6, semesters=1),
+    # A four-year degree.
+    "degree": dict(subjects=8, semesters=8),
+    # An archived history much longer than any real one.
+    "archive": dict(subjects=12, records=100_000),
+}
+
+NOOP_CHECK = (
+    "import sys; from attendance_tracker.fastpath import main;"
+    " sys.exit(main(['record', 'check', '--quiet']))"
+)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version()}
+
+
+def cases(data_dir):
+    """Yields (name, function) pairs to time against data_dir."""
+    tenant = data_manager.Tenant(data_dir)
+    with tenant:
+        data = data_manager.get_attendance_data()
+        subjects = data_manager.get_timetable_index().subjects
+        calendar = data_manager.get_calendar()
+    records = data["records"]
+    start = data["semester_start_date"]
+
+    def load_cold():
+        with data_manager.Tenant(data_dir) as cold:
+            data_manager.get_attendance_data()
+        cold.close()
+
+    def load_warm():
+        with tenant:
+            data_manager.get_attendance_data()
+
+    def save():
+        with tenant:
+            data_manager.save_attendance_data(data)
+
+    def per_subject():
+        for subject in subjects:
+            logic.calculate_attendance_percentage(records, subject)
+            logic.calculate_classes_needed(records, subject)
+            logic.calculate_classes_to_miss(records, subject)
+
+    runner = CliRunner()
+
+    def view_summary():
+        result = runner.invoke(cli, ["--data-dir", str(data_dir), "view", "summary"])
+        assert result.exit_code == 0, result.output
+
+    env = dict(os.environ, ATTENDANCE_DATA_DIR=str(data_dir))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env.pop("ATTENDANCE_SOCKET", None)
+
+    def record_check_quiet():
+        subprocess.run([sys.executable, "-c", NOOP_CHECK], env=env, check=True)
+
+    yield "get_attendance_data_cold", load_cold
+    yield "get_attendance_data_warm", load_warm
+    yield "save_attendance_data", save
+    yield "get_missed_days", lambda: logic.get_missed_days(start, [], start, calendar=calendar)
+    yield "count_by_subject", lambda: logic.count_by_subject(records)
+    yield "aggregate_attendance", lambda: logic.aggregate_attendance(records, subjects)
+    yield "per_subject_logic", per_subject
+    yield "view_summary", view_summary
+    yield "record_check_quiet", record_check_quiet
+    tenant.close()
+
+
+def load_baseline(path):
+    baseline = {}
+    with open(path) as f:
+        for line in f:
+            result = json.loads(line)
+            if "case" in result:
+                baseline[(result["scale"], result["case"])] = result["seconds"]
+    return baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        default=",".join(SCALES),
+        help=f"Comma-separated scales to run (default: {','.join(SCALES)}).",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="Earlier output to compare against.")
+    args = parser.parse_args(argv)
+
+    scales = args.scales.split(",")
+    unknown = set(scales) - set(SCALES)
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(sorted(unknown))}")
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+
+    print(json.dumps(environment()), flush=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            data_dir = Path(tmp) / scale
+            described = generate.generate(data_dir, **SCALES[scale])
+            for case, func in cases(data_dir):
+                func()  # Warm up: imports, state file, page cache.
+                result = {
+                    "scale": scale,
+                    "records": described["records"],
+                    "case": case,
+                    "seconds": best_of(func, args.repeat),
+                }
+                previous = baseline.get((scale, case))
+                if previous:
+                    result["baseline_seconds"] = previous
+                    result["ratio"] = round(result["seconds"] / previous, 3)
+                print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'attendance = attendance_tracker.main:cli',
+            'attendance = attendance_tracker.fastpath:main',
         ],
     },
 )
@@ -0,0 +1,125 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from attendance_tracker import binsnap, data_manager, logic, storage
+
+from test_data_manager import DataDirTestCase
+from test_records import random_records
+from test_storage import EXPECTED_RECORDS, OPS
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.records = random_records(random.Random(5), 300)
+        self.data = storage.empty_attendance_data()
+        self.data.update(
+            records=self.records,
+            holidays=["2026-01-26"],
+            counters=logic.count_by_subject(self.records),
+            journal_seq=7,
+        )
+
+    def test_round_trip(self):
+        data = binsnap.loads(binsnap.dumps(self.data))
+        self.assertEqual(data["records"], self.records)
+        self.assertEqual(
+            {key: value for key, value in data.items() if key != "records"},
+            {key: value for key, value in self.data.items() if key != "records"},
+        )
+        empty = binsnap.loads(binsnap.dumps(storage.empty_attendance_data()))
+        self.assertEqual(len(empty["records"]), 0)
+
+    def test_records_read_the_buffer_until_changed(self):
+        buffer = bytearray(binsnap.dumps(self.data))
+        store = binsnap.loads(buffer)["records"]
+        self.assertIsInstance(store.dates, memoryview)
+        self.assertEqual(store.count_by_subject(), logic.count_by_subject(self.records))
+        self.assertEqual(store.max_date(), max(r["date"] for r in self.records))
+        self.assertTrue(store.has_date(self.records[0]["date"]))
+
+        snapshot = bytes(buffer)
+        store[0]["status"] = "cancelled"
+        store.append({"date": "2026-06-01", "subject": "Music", "status": "absent"})
+        self.assertNotIsInstance(store.dates, memoryview)
+        self.assertEqual(bytes(buffer), snapshot)
+        self.assertEqual(store[0]["status"], "cancelled")
+        self.assertEqual(len(store), len(self.records) + 1)
+
+    def test_rejects_other_files(self):
+        content = binsnap.dumps(self.data)
+        with self.assertRaises(ValueError):
+            binsnap.loads(b'{"records": []}')
+        with self.assertRaises(ValueError):
+            binsnap.loads(content[:-10])
+
+
+class TestBinaryBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "attendance.json"
+
+    def make_backend(self, compact_bytes=storage.JOURNAL_COMPACT_BYTES):
+        return storage.JsonBackend(self.path, storage.Repository(), compact_bytes)
+
+    def test_switching_formats(self):
+        backend = self.make_backend()
+        backend.apply(OPS)
+        backend.set_snapshot_format("binary")
+        self.assertEqual(
+            sorted(path.name for path in self.path.parent.iterdir()),
+            ["attendance.bin", "attendance.lock"],
+        )
+        fresh = self.make_backend()
+        data = fresh.load()
+        self.assertEqual(fresh.snapshot_format(), "binary")
+        self.assertIsInstance(data["records"].dates, memoryview)
+        self.assertEqual(data["records"], EXPECTED_RECORDS)
+        self.assertEqual(data["holiday_ranges"], [["2026-12-20", "2027-01-05"]])
+
+        fresh.set_snapshot_format("json")
+        self.assertFalse(fresh.binary_path.exists())
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_journal_and_compaction_keep_the_format(self):
+        backend = self.make_backend(compact_bytes=500)
+        backend.set_snapshot_format("binary")
+        backend.apply(OPS)
+        self.assertFalse(self.path.exists())
+        self.assertEqual(backend.snapshot_format(), "binary")
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_sees_other_writers(self):
+        reader = self.make_backend()
+        reader.set_snapshot_format("binary")
+        reader.apply(OPS[:3])
+        self.make_backend().apply(OPS[3:])
+        self.assertEqual(reader.load()["records"], EXPECTED_RECORDS)
+
+
+class TestSnapshotFormatSetting(DataDirTestCase):
+    def test_data_manager(self):
+        data_manager.save_timetable({"Monday": ["Math", "Physics"]})
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.record_attendance(EXPECTED_RECORDS)
+        stats = data_manager.get_subject_stats()
+        data = data_manager.get_attendance_data()
+
+        data_manager.set_snapshot_format("binary")
+        data_manager._backends.clear()
+        self.assertEqual(data_manager.get_subject_stats(), stats)
+        self.assertEqual(data_manager.get_attendance_data(), data)
+        self.assertEqual(data_manager.get_last_run_date(), "2026-01-07")
+
+    def test_only_for_json(self):
+        with patch.object(data_manager, "BACKEND", "sqlite"):
+            with self.assertRaises(ValueError):
+                data_manager.set_snapshot_format("binary")
+            data_manager.get_backend().close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from attendance_tracker import data_manager, fastpath, main, workdays
+from attendance_tracker.main import cli
+
+from test_data_manager import DataDirTestCase
+
+TODAY = date.today()
+# The check starts after the semester start date, so four days are
+# pending: three missed days and today.
+START = TODAY - timedelta(days=4)
+
+
+def day(offset):
+    return (START + timedelta(days=1 + offset)).isoformat()
+
+
+class TestCheckpointedCheck(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        data_manager.save_timetable(
+            {name: ["Math", "Physics"] for name in workdays.WEEKDAY_NAMES}
+        )
+        data_manager.set_working_days(range(7))
+        data_manager.set_semester_start_date(START.isoformat())
+        self.runner = CliRunner()
+
+    def check(self, answers, *options):
+        return self.runner.invoke(
+            cli, ["record", "check", "--quiet", *options], input="".join(answers)
+        )
+
+    def dates(self):
+        records = data_manager.get_attendance_data()["records"]
+        return sorted({record["date"] for record in records})
+
+    def test_interrupted_check_keeps_answered_days(self):
+        result = self.check(["p\n", "a\n"])
+        self.assertEqual(result.exit_code, 1)  # Aborted at the third day.
+        self.assertEqual(self.dates(), [day(0), day(1)])
+
+        result = self.check(["p\n", "p\n"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.count("Select option"), 2)
+        self.assertEqual(self.dates(), [day(0), day(1), day(2), day(3)])
+
+    def test_cursor_skips_days_without_records(self):
+        # Both classes of the first day were cancelled, so nothing is recorded.
+        result = self.check(["r\n", "c\n", "c\n", "s\n"])
+        self.assertIn("Attendance checking postponed.", result.output)
+        self.assertEqual(self.dates(), [])
+        self.assertEqual(data_manager.get_resume_date(), day(0))
+
+        result = self.check(["s\n"])
+        self.assertIn(f"Attendance for {(START + timedelta(days=2)).strftime('%A')}", result.output)
+
+    def test_today_without_records_is_not_asked_again(self):
+        result = self.check(["p\n", "p\n", "p\n", "r\n", "c\n", "c\n"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self.dates(), [day(0), day(1), day(2)])
+        # A later write drops the sidecar's record of today's check.
+        data_manager.add_holiday((TODAY + timedelta(days=7)).isoformat())
+
+        self.assertFalse(fastpath.check_has_work())
+        result = self.check([])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertNotIn("Select option", result.output)
+
+    def test_future_records_do_not_drop_answers(self):
+        next_week = (TODAY + timedelta(days=7)).isoformat()
+        self.runner.invoke(cli, ["record", "cancel-class", "--subject", "Math", "--date", next_week])
+        result = self.check(["p\n"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn(TODAY.isoformat(), self.dates())
+
+    def test_each_day_is_one_write(self):
+        with patch.object(data_manager, "apply_ops", wraps=data_manager.apply_ops) as apply:
+            self.check(["p\n", "h\n", "a\n", "s\n"])
+        self.assertEqual(apply.call_count, 3)
+        self.assertEqual(data_manager.get_holidays(), [day(1)])
+
+    def test_compact(self):
+        with patch.object(data_manager, "apply_ops", wraps=data_manager.apply_ops) as apply:
+            result = self.check(["x\n", "p h ac\n"], "--compact")
+        self.assertEqual(apply.call_count, 1)
+        self.assertIn("Error: Day 1", result.output)
+        self.assertIn("Attendance checking postponed.", result.output)
+        self.assertEqual(
+            data_manager.get_attendance_data()["records"],
+            [
+                {"date": day(0), "subject": "Math", "status": "present"},
+                {"date": day(0), "subject": "Physics", "status": "present"},
+                {"date": day(2), "subject": "Math", "status": "absent"},
+            ],
+        )
+        self.assertEqual(data_manager.get_holidays(), [day(1)])
+
+        result = self.check(["pa\n"], "--compact")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn(f"1. {TODAY.strftime('%a %Y-%m-%d')}: Math, Physics", result.output)
+        self.assertNotIn("postponed", result.output)
+        self.assertEqual(self.dates()[-1], day(3))
+
+
+class TestCompactAnswers(unittest.TestCase):
+    PENDING = [(date(2026, 1, 5), ("Math", "Physics")), (date(2026, 1, 6), ("Art",))]
+
+    def test_parse(self):
+        math = {"date": "2026-01-05", "subject": "Math", "status": "present"}
+        self.assertEqual(
+            main.parse_compact_answers("PC c", self.PENDING),
+            [("2026-01-05", [math], []), ("2026-01-06", [], [])],
+        )
+        self.assertEqual(
+            main.parse_compact_answers(" h ", self.PENDING),
+            [("2026-01-05", [], ["2026-01-05"])],
+        )
+        self.assertEqual(main.parse_compact_answers("", self.PENDING), [])
+
+    def test_invalid(self):
+        for line in ["p p p", "pac", "x", "p pa"]:
+            with self.subTest(line=line), self.assertRaises(ValueError):
+                main.parse_compact_answers(line, self.PENDING)
+
+
+class TestQuietCheckArgs(unittest.TestCase):
+    def test_is_quiet_check(self):
+        self.assertTrue(fastpath.is_quiet_check(["record", "check", "--quiet"]))
+        self.assertTrue(fastpath.is_quiet_check(["record", "check", "--compact", "--quiet"]))
+        self.assertFalse(fastpath.is_quiet_check(["record", "check"]))
+        self.assertFalse(fastpath.is_quiet_check(["record", "check", "--compact"]))
+        self.assertFalse(fastpath.is_quiet_check(["record", "check", "--quiet", "--quiet"]))
+        self.assertFalse(fastpath.is_quiet_check(["record", "check", "--quiet", "--help"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from attendance_tracker import codec, data_manager
+from attendance_tracker.records import RecordStore
+
+from test_data_manager import DataDirTestCase
+
+DATA = {
+    "records": [{"date": "2026-01-05", "subject": "Mathématiques", "status": "present"}],
+    "holidays": ["2026-01-26"],
+    "semester_start_date": "2026-01-05",
+    "working_days": [0, 1, 2, 3, 4],
+}
+
+
+class CodecTests:
+    def test_round_trip(self):
+        self.assertEqual(codec.loads(codec.dumps(DATA)), DATA)
+        self.assertEqual(codec.loads(codec.dumps(DATA).decode()), DATA)
+        self.assertEqual(json.loads(codec.dumps(DATA, pretty=True)), DATA)
+
+    def test_compact_unless_pretty(self):
+        self.assertNotIn(b"\n", codec.dumps(DATA))
+        self.assertNotIn(b", ", codec.dumps(DATA))
+        self.assertIn(b'\n  "holidays": [\n    "2026-01-26"', codec.dumps(DATA, pretty=True))
+
+    def test_encodes_record_stores(self):
+        data = dict(DATA, records=RecordStore(DATA["records"]))
+        self.assertEqual(codec.loads(codec.dumps(data)), DATA)
+        with self.assertRaises(TypeError):
+            codec.dumps({"when": object()})
+
+
+class TestStdlibCodec(CodecTests, unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(codec, "_orjson", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@unittest.skipIf(codec._import_orjson() is None, "orjson is not installed")
+class TestOrjsonCodec(CodecTests, unittest.TestCase):
+    def test_matches_stdlib(self):
+        with patch.object(codec, "_orjson", False):
+            expected = codec.dumps(DATA)
+        self.assertEqual(codec.dumps(DATA), expected)
+
+
+class TestExport(DataDirTestCase):
+    def test_export(self):
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.add_record(DATA["records"][0])
+        exported = codec.loads(data_manager.export_attendance_data())
+        self.assertEqual(exported["records"], DATA["records"])
+        self.assertNotIn("counters", exported)
+        self.assertIn(b"\n", data_manager.export_attendance_data(pretty=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from attendance_tracker import client, daemon, data_manager
+
+from test_data_manager import DataDirTestCase
+
+
+def absent(subject):
+    return {"date": "2026-01-12", "subject": subject, "status": "absent"}
+
+
+class TestQueryServer(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        data_manager.save_timetable({"Monday": ["Math", "Art"]})
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.add_record({"date": "2026-01-05", "subject": "Math", "status": "present"})
+
+        self.path = str(self.data_dir / daemon.SOCKET_NAME)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        ready = threading.Event()
+        self.server = daemon.QueryServer(self.path, watch_interval=0.05)
+        self.task = self.loop.create_task(self.server.run(ready))
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.start()
+        self.addCleanup(self.stop)
+        self.assertTrue(ready.wait(5))
+
+    def serve(self):
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(5)
+
+    def test_answers_match_direct_mode(self):
+        for query in (
+            {"query": "summary"},
+            {"query": "subject", "subject": "Art"},
+            {"query": "today"},
+        ):
+            self.assertEqual(client.request(query, self.path), daemon.answer(query))
+        self.assertEqual(client.ask({"query": "ping"}, self.path), "pong")
+
+    def math_row(self):
+        return client.request({"query": "subject", "subject": "Math"}, self.path)
+
+    def test_sees_changes_to_the_data(self):
+        self.assertEqual(self.math_row()["total"], 1)
+        data_manager.add_record({"date": "2026-01-12", "subject": "Math", "status": "absent"})
+        deadline = time.monotonic() + 5
+        while self.math_row()["total"] == 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        row = self.math_row()
+        self.assertEqual((row["total"], row["percentage"]), (2, 50.0))
+
+    def test_writes_go_through_the_server(self):
+        ops = [{"op": "add_record", "record": absent("Math")}]
+        self.assertTrue(client.apply_ops(ops, self.path))
+        # Acknowledged writes are saved and already in the snapshot.
+        self.assertEqual(self.math_row()["total"], 2)
+        self.assertEqual(data_manager.get_counters()["Math"]["absent"], 1)
+
+    def test_data_manager_hands_writes_to_the_server(self):
+        data_manager.set_remote_writer(lambda ops: client.apply_ops(ops, self.path))
+        self.addCleanup(data_manager.set_remote_writer, None)
+        commits = self.server.commits
+        data_manager.cancel_class("2026-01-12", "Art")
+        self.assertEqual(self.server.commits, commits + 1)
+        self.assertEqual(data_manager.get_counters()["Art"]["cancelled"], 1)
+
+    def test_checked_days_go_through_the_server(self):
+        data_manager.set_remote_writer(lambda ops: client.apply_ops(ops, self.path))
+        self.addCleanup(data_manager.set_remote_writer, None)
+        commits = self.server.commits
+        for _ in range(2):
+            data_manager.record_checked_days([("2026-01-12", [absent("Math")], [])])
+        self.assertEqual(self.server.commits, commits + 2)
+        self.assertEqual(self.math_row()["total"], 2)
+
+    def test_concurrent_writes_are_batched(self):
+        async def write_all():
+            return await asyncio.gather(*(
+                self.server.submit([{"op": "add_holiday", "date": f"2026-02-{day:02}"}])
+                for day in range(1, 21)
+            ))
+
+        commits = self.server.commits
+        results = asyncio.run_coroutine_threadsafe(write_all(), self.loop).result(5)
+        self.assertEqual(results, [{"applied": 1}] * 20)
+        self.assertEqual(self.server.commits, commits + 1)
+        self.assertEqual(len(data_manager.get_holidays()), 20)
+
+    def test_readers_see_whole_batches(self):
+        ops = [
+            {"op": "add_record", "record": absent("Math")},
+            {"op": "add_record", "record": absent("Art")},
+        ]
+        done = threading.Event()
+        seen = set()
+
+        def read():
+            while not done.is_set():
+                rows = client.request({"query": "summary"}, self.path)
+                seen.add(tuple(row["total"] for row in rows))
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        client.apply_ops(ops, self.path)
+        done.set()
+        reader.join(5)
+        # (Art, Math) totals: before the batch, or after all of it.
+        self.assertLessEqual(seen, {(0, 1), (1, 2)})
+
+    def test_bad_writes_are_rejected_whole(self):
+        ops = [
+            {"op": "add_holiday", "date": "2026-02-02"},
+            {"op": "add_record", "record": {"date": "2026-02-03"}},
+        ]
+        with self.assertRaises(client.QueryError):
+            client.apply_ops(ops, self.path)
+        self.assertEqual(data_manager.get_holidays(), [])
+
+    def test_malformed_ops_do_not_stop_the_writer(self):
+        bad = {"op": "add_record", "record": dict(absent("Math"), date=20261012)}
+        with self.assertRaises(client.QueryError):
+            client.apply_ops([bad], self.path)
+
+        async def write_all():
+            return await asyncio.gather(
+                self.server.submit([{"op": "add_holiday", "date": "2026-02-02"}]),
+                # Past `parse_ops`, as if validation had missed it.
+                self.server.submit([bad]),
+                self.server.submit([{"op": "add_record", "record": absent("Art")}]),
+                return_exceptions=True,
+            )
+
+        first, second, third = asyncio.run_coroutine_threadsafe(
+            write_all(), self.loop
+        ).result(5)
+        self.assertEqual((first, third), ({"applied": 1}, {"applied": 1}))
+        self.assertIsInstance(second, ValueError)
+        self.assertEqual(data_manager.get_holidays(), ["2026-02-02"])
+
+        self.assertTrue(client.apply_ops([{"op": "add_record", "record": absent("Math")}], self.path))
+        self.assertEqual(self.math_row()["total"], 2)
+
+    def test_errors(self):
+        with self.assertRaises(client.QueryError):
+            client.request({"query": "subject", "subject": "Music"}, self.path)
+        with self.assertRaises(ValueError):
+            client.request({"query": "dance"}, self.path)
+
+    def test_socket_is_claimed_and_cleaned_up(self):
+        with self.assertRaises(RuntimeError):
+            daemon.claim_socket(self.path)
+        self.stop()
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestSqliteQueryServer(TestQueryServer):
+    """The same, with the data in SQLite, used from the server's threads."""
+
+    def setUp(self):
+        patcher = patch.object(data_manager, "BACKEND", "sqlite")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def stop(self):
+        super().stop()
+        data_manager.get_backend().close()
+
+
+class TestDirectMode(DataDirTestCase):
+    def test_falls_back_without_a_server(self):
+        data_manager.save_timetable({"Monday": ["Math"]})
+        path = str(self.data_dir / daemon.SOCKET_NAME)
+        self.assertEqual(
+            client.ask({"query": "subject", "subject": "Math"}, path)["percentage"], 100.0
+        )
+        with self.assertRaises(ValueError):
+            client.ask({"query": "subject", "subject": "Art"}, path)
+
+    def test_writes_locally_without_a_server(self):
+        path = str(self.data_dir / daemon.SOCKET_NAME)
+        self.assertFalse(client.apply_ops([{"op": "add_holiday", "date": "2026-02-02"}], path))
+
+    def test_stale_socket_is_removed(self):
+        import socket
+
+        path = str(self.data_dir / daemon.SOCKET_NAME)
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(path)
+        daemon.claim_socket(path)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,258 @@
+import json
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from attendance_tracker import codec, data_manager, storage
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Points data_manager at a fresh temporary data directory."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp.name)
+        patches = {
+            "DATA_DIR": self.data_dir,
+            "TIMETABLE_FILE": self.data_dir / "timetable.json",
+            "ATTENDANCE_FILE": self.data_dir / "attendance.json",
+            "DATABASE_FILE": self.data_dir / "attendance.db",
+            "STATE_FILE": self.data_dir / "state.json",
+            "PROJECT_ROOT": self.data_dir / "missing",
+        }
+        for name, value in patches.items():
+            patcher = patch.object(data_manager, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(data_manager._repository.clear)
+        self.addCleanup(data_manager._backends.clear)
+
+
+class TestState(DataDirTestCase):
+    def save(self, records=()):
+        data = data_manager.get_attendance_data()
+        data["semester_start_date"] = "2026-01-05"
+        data["records"].extend(records)
+        data_manager.save_attendance_data(data)
+
+    def test_state_written_on_save(self):
+        self.save([{"date": "2026-01-06", "subject": "Math", "status": "present"}])
+        state = data_manager.get_state()
+        self.assertEqual(state["last_run_date"], "2026-01-06")
+        self.assertEqual(state["semester_start_date"], "2026-01-05")
+        self.assertIsNone(state["last_checked"])
+
+    def test_getters_skip_parsing_with_valid_state(self):
+        self.save([{"date": "2026-01-06", "subject": "Math", "status": "present"}])
+        with patch.object(data_manager, "get_attendance_data") as load:
+            self.assertEqual(data_manager.get_last_run_date(), "2026-01-06")
+            self.assertEqual(data_manager.get_semester_start_date(), "2026-01-05")
+        load.assert_not_called()
+
+    def test_state_invalidated_by_external_edit(self):
+        self.save()
+        data = json.loads(data_manager.ATTENDANCE_FILE.read_text())
+        data["records"].append({"date": "2026-01-09", "subject": "Math", "status": "absent"})
+        data_manager.ATTENDANCE_FILE.write_text(json.dumps(data))
+        self.assertIsNone(data_manager.get_state())
+        self.assertEqual(data_manager.get_last_run_date(), "2026-01-09")
+
+    def test_mark_checked_survives_until_next_save(self):
+        self.save()
+        data_manager.mark_checked("2026-01-07")
+        self.assertEqual(data_manager.get_state()["last_checked"], "2026-01-07")
+        self.save()
+        self.assertIsNone(data_manager.get_state()["last_checked"])
+
+
+class TestCalendar(DataDirTestCase):
+    def test_calendar_settings(self):
+        data_manager.set_working_days([5, 0, 1, 2, 3, 4])
+        data_manager.add_holiday("2026-01-07")
+        data_manager.add_holiday_range("2026-12-20", "2027-01-05")
+        self.assertEqual(data_manager.get_working_days(), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(data_manager.get_holiday_ranges(), [["2026-12-20", "2027-01-05"]])
+
+        calendar = data_manager.get_calendar()
+        self.assertTrue(calendar.is_class_day(date(2026, 1, 10)))
+        self.assertFalse(calendar.is_class_day(date(2026, 1, 7)))
+        self.assertFalse(calendar.is_class_day(date(2026, 12, 31)))
+
+        data_manager.remove_holiday_range("2026-12-20", "2027-01-05")
+        self.assertEqual(data_manager.get_holiday_ranges(), [])
+
+    def test_settings_served_from_state(self):
+        data_manager.add_holiday_range("2026-12-20", "2027-01-05")
+        with patch.object(data_manager, "_load") as load:
+            self.assertEqual(data_manager.get_working_days(), [0, 1, 2, 3, 4])
+            self.assertEqual(
+                data_manager.get_holiday_ranges(), [["2026-12-20", "2027-01-05"]]
+            )
+        load.assert_not_called()
+
+
+class TestRepositoryCache(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        data_manager.save_attendance_data(
+            {
+                "records": [{"date": "2026-01-06", "subject": "Math", "status": "present"}],
+                "holidays": [],
+                "semester_start_date": "2026-01-05",
+                "semester_end_date": None,
+            }
+        )
+        data_manager._repository.clear()
+        data_manager._backends.clear()
+
+    def test_file_parsed_once(self):
+        with patch.object(codec, "load_file", wraps=codec.load_file) as load:
+            for _ in range(3):
+                data_manager.get_attendance_data()
+            data_manager.add_holiday("2026-01-07")
+            data_manager.get_attendance_data()
+        self.assertEqual(load.call_count, 1)
+
+    def test_returned_data_is_a_copy(self):
+        data = data_manager.get_attendance_data()
+        data["records"][0]["status"] = "absent"
+        data["holidays"].append("2026-01-07")
+        fresh = data_manager.get_attendance_data()
+        self.assertEqual(fresh["records"][0]["status"], "present")
+        self.assertEqual(fresh["holidays"], [])
+
+    def test_reloaded_after_external_write(self):
+        data_manager.get_attendance_data()
+        data = json.loads(data_manager.ATTENDANCE_FILE.read_text())
+        data["holidays"].append("2026-01-07")
+        data_manager.ATTENDANCE_FILE.write_text(json.dumps(data))
+        self.assertEqual(data_manager.get_attendance_data()["holidays"], ["2026-01-07"])
+
+    def test_replaced_while_reading(self):
+        path = self.data_dir / "other.json"
+        path.write_text('{"version": 1}')
+        repository = storage.Repository()
+
+        def read_then_replace(read_path):
+            data = codec.loads(read_path.read_bytes())
+            storage.write_atomic(read_path, '{"version": 2}')
+            return data
+
+        with patch.object(codec, "load_file", side_effect=read_then_replace):
+            self.assertEqual(repository.load(path), {"version": 1})
+        self.assertEqual(repository.load(path), {"version": 2})
+
+        def read_then_delete(read_path):
+            data = codec.loads(read_path.read_bytes())
+            read_path.unlink()
+            return data
+
+        path.write_text('{"version": 3}')
+        with patch.object(codec, "load_file", side_effect=read_then_delete):
+            self.assertEqual(repository.load(path), {"version": 3})
+
+    def test_verify_counters_reports_and_repairs_drift(self):
+        self.assertEqual(data_manager.verify_counters(), [])
+        data = json.loads(data_manager.ATTENDANCE_FILE.read_text())
+        data["records"][0]["status"] = "absent"
+        data_manager.ATTENDANCE_FILE.write_text(json.dumps(data))
+
+        drift = data_manager.verify_counters(repair=True)
+        self.assertEqual(
+            drift,
+            [
+                (
+                    "Math",
+                    {"present": 1, "absent": 0, "cancelled": 0},
+                    {"present": 0, "absent": 1, "cancelled": 0},
+                )
+            ],
+        )
+        self.assertEqual(data_manager.verify_counters(), [])
+
+
+class TestSqliteBackend(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(data_manager, "BACKEND", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: data_manager.get_backend("sqlite").close())
+
+    def test_migrate_then_use_sqlite(self):
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.record_attendance(
+            [
+                {"date": "2026-01-05", "subject": "Math", "status": "present"},
+                {"date": "2026-01-06", "subject": "Math", "status": "absent"},
+            ],
+            ["2026-01-07"],
+        )
+        self.assertEqual(data_manager.migrate_json_to_sqlite(), 2)
+        with self.assertRaises(ValueError):
+            data_manager.migrate_json_to_sqlite()
+
+        data_manager.set_backend("sqlite")
+        self.assertIsNone(data_manager.get_state())
+        self.assertEqual(data_manager.get_last_run_date(), "2026-01-06")
+        self.assertEqual(data_manager.get_holidays(), ["2026-01-07"])
+        self.assertTrue(data_manager.has_records_on("2026-01-05"))
+
+        data_manager.cancel_class("2026-01-06", "Math")
+        data_manager.add_record({"date": "2026-01-08", "subject": "Math", "status": "present"})
+        self.assertEqual(data_manager.get_state()["last_run_date"], "2026-01-08")
+        self.assertEqual(
+            [r["status"] for r in data_manager.get_attendance_data()["records"]],
+            ["present", "cancelled", "present"],
+        )
+        # The JSON file is left untouched by the SQLite backend.
+        self.assertEqual(
+            len(data_manager.get_backend("json").load()["records"]), 2
+        )
+
+    def test_queries_do_not_load_every_record(self):
+        data_manager.set_backend("sqlite")
+        data_manager.record_attendance(
+            [{"date": "2026-01-05", "subject": "Math", "status": "present"}],
+            ["2026-01-07"],
+        )
+        with patch.object(storage.SqliteBackend, "load") as load:
+            self.assertEqual(data_manager.get_holidays(), ["2026-01-07"])
+            self.assertTrue(data_manager.has_records_on("2026-01-05"))
+            self.assertEqual(
+                data_manager.find_records(subject="Math"),
+                [("2026-01-05", "Math", 0, "present")],
+            )
+            self.assertEqual(data_manager.get_counters()["Math"]["present"], 1)
+            data_manager.add_holiday("2026-01-08")
+        load.assert_not_called()
+
+    def test_checked_days_are_recorded_once(self):
+        data_manager.set_backend("sqlite")
+        math = {"date": "2026-01-05", "subject": "Math", "status": "present"}
+        art = dict(math, subject="Art", date="2026-01-06")
+        data_manager.record_checked_days([("2026-01-05", [math], [])])
+        data_manager.record_checked_days(
+            [("2026-01-05", [math], []), ("2026-01-06", [art], [])]
+        )
+        self.assertEqual(
+            data_manager.find_records(),
+            [("2026-01-05", "Math", 0, "present"), ("2026-01-06", "Art", 0, "present")],
+        )
+        # A day at or before the cursor is done even without records.
+        data_manager.record_checked_days([("2026-01-07", [], [])])
+        data_manager.record_checked_days([("2026-01-07", [], ["2026-01-07"])])
+        self.assertEqual(data_manager.get_holidays(), [])
+        self.assertEqual(data_manager.get_check_cursor(), "2026-01-07")
+
+    def test_backend_from_environment(self):
+        with patch.dict("os.environ", {"ATTENDANCE_BACKEND": "sqlite"}):
+            self.assertEqual(data_manager.get_backend().name, "sqlite")
+        self.assertEqual(data_manager.get_backend().name, "json")
+
+
+if __name__ == "__main__":
+    unittest.main()
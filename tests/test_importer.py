@@ -0,0 +1,96 @@
+import io
+import json
+import time
+import unittest
+from datetime import date, timedelta
+
+from attendance_tracker import data_manager, importer
+
+from test_data_manager import DataDirTestCase
+
+TIMETABLE = {
+    "Monday": ["Math", "Physics"],
+    "Tuesday": ["Chemistry"],
+    "Wednesday": ["Math"],
+    "Thursday": ["Physics", "Chemistry"],
+    "Friday": ["Math", "Chemistry"],
+}
+
+
+class TestImport(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        data_manager.save_timetable(TIMETABLE)
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.set_semester_end_date("2026-05-29")
+
+    def import_text(self, text, fmt, **kwargs):
+        return importer.import_rows(importer.read_rows(io.StringIO(text), fmt), **kwargs)
+
+    def test_csv(self):
+        result = self.import_text(
+            "date,subject,status\n"
+            "2026-01-05,Math,p\n"
+            "2026-01-05,Physics,absent\n"
+            "2026-01-06,Chemistry,c\n",
+            "csv",
+        )
+        self.assertEqual((result.imported, result.duplicates, result.errors), (3, 0, []))
+        self.assertEqual(
+            data_manager.get_attendance_data()["records"],
+            [
+                {"date": "2026-01-05", "subject": "Math", "status": "present"},
+                {"date": "2026-01-05", "subject": "Physics", "status": "absent"},
+                {"date": "2026-01-06", "subject": "Chemistry", "status": "cancelled"},
+            ],
+        )
+        self.assertEqual(data_manager.get_last_run_date(), "2026-01-06")
+
+    def test_invalid_rows_are_reported(self):
+        rows = [
+            {"date": "2026-01-05", "subject": "Math", "status": "present"},
+            {"date": "2026-01-05", "subject": "Chemistry", "status": "present"},
+            {"date": "2026-01-04", "subject": "Math", "status": "present"},
+            {"date": "2026-06-01", "subject": "Math", "status": "present"},
+            {"date": "2026-01-07", "subject": "Math", "status": "late"},
+            {"date": "yesterday", "subject": "Math", "status": "present"},
+        ]
+        text = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+        result = self.import_text(text, "jsonl")
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([line_num for line_num, _ in result.errors], [2, 3, 4, 5, 6, 7])
+
+    def test_duplicates_are_skipped(self):
+        data_manager.add_record({"date": "2026-01-05", "subject": "Math", "status": "absent"})
+        result = self.import_text(
+            "date,subject,status\n"
+            "2026-01-05,Math,present\n"
+            "2026-01-07,Math,present\n"
+            "2026-01-07,Math,absent\n",
+            "csv",
+        )
+        self.assertEqual((result.imported, result.duplicates), (1, 2))
+        self.assertEqual(
+            data_manager.get_counters()["Math"],
+            {"present": 1, "absent": 1, "cancelled": 0},
+        )
+
+    def test_full_semester_in_batches(self):
+        lines = ["date,subject,status"]
+        day = date(2026, 1, 5)
+        while day <= date(2026, 5, 29):
+            for subject in TIMETABLE.get(day.strftime("%A"), []):
+                lines.append(f"{day.isoformat()},{subject},present")
+            day += timedelta(days=1)
+
+        started = time.perf_counter()
+        result = self.import_text("\n".join(lines), "csv", batch_size=100)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result.imported, len(lines) - 1)
+        self.assertEqual(len(data_manager.get_attendance_data()["records"]), len(lines) - 1)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -62,5 +62,46 @@ class TestLogic(unittest.TestCase):
         ]
         self.assertEqual(logic.calculate_classes_needed(records_good_attendance, "Physics"), 0)
 
+    def test_calculate_classes_to_miss(self):
+        records = [{"subject": "Math", "status": "present"}] * 8 + [
+            {"subject": "Math", "status": "absent"}
+        ]
+        self.assertEqual(logic.calculate_classes_to_miss(records, "Math"), 1)
+        self.assertEqual(logic.calculate_classes_to_miss(records[-2:], "Math"), 0)
+
+    def test_aggregate_attendance(self):
+        records = [
+            {"subject": "Math", "status": "present"},
+            {"subject": "Math", "status": "absent"},
+            {"subject": "Math", "status": "cancelled"},
+            {"subject": "Physics", "status": "present"},
+        ]
+        stats = logic.aggregate_attendance(records, ["Chemistry"])
+        self.assertEqual(set(stats), {"Math", "Physics", "Chemistry"})
+        self.assertEqual(
+            stats["Math"],
+            {
+                "present": 1,
+                "absent": 1,
+                "cancelled": 1,
+                "total": 2,
+                "percentage": 50.0,
+                "needed": 2,
+                "missable": 0,
+            },
+        )
+        self.assertEqual(stats["Physics"]["missable"], 0)
+        self.assertEqual(stats["Chemistry"]["total"], 0)
+        self.assertEqual(stats["Chemistry"]["percentage"], 100.0)
+
+        for subject in stats:
+            self.assertEqual(
+                stats[subject]["percentage"],
+                logic.calculate_attendance_percentage(records, subject),
+            )
+            self.assertEqual(
+                stats[subject]["needed"], logic.calculate_classes_needed(records, subject)
+            )
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import io
+import json
+import unittest
+
+from attendance_tracker import output
+
+ROWS = [
+    {"subject": "Math", "percentage": 66.67, "note": "x"},
+    {"subject": "Art, History", "percentage": 100.0, "note": "y"},
+]
+
+
+class TestRowWriter(unittest.TestCase):
+    def write(self, fmt):
+        stream = io.StringIO()
+        output.RowWriter(stream, fmt, ["subject", "percentage"]).write_all(ROWS)
+        return stream.getvalue()
+
+    def test_csv(self):
+        self.assertEqual(
+            self.write("csv"),
+            'subject,percentage\nMath,66.67\n"Art, History",100.0\n',
+        )
+
+    def test_jsonl(self):
+        lines = self.write("jsonl").splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{"subject": "Math", "percentage": 66.67}, {"subject": "Art, History", "percentage": 100.0}],
+        )
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            output.RowWriter(io.StringIO(), "xml", ["subject"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from attendance_tracker import data_manager, fastpath, profiling
+from attendance_tracker.main import cli
+
+from test_data_manager import DataDirTestCase
+
+
+class ProfilingTestCase(unittest.TestCase):
+    """Starts each test with profiling off and no recorded phases."""
+
+    def setUp(self):
+        for name, value in [
+            ("enabled", False),
+            ("_profiler", None),
+            ("_dump_path", None),
+            ("_phases", {}),
+            ("_stack", []),
+        ]:
+            patcher = patch.object(profiling, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch("atexit.register")
+        self.atexit_register = patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestProfiling(ProfilingTestCase):
+    def test_disabled_records_nothing(self):
+        @profiling.timed("double")
+        def double(x):
+            return 2 * x
+
+        self.assertEqual(double(2), 4)
+        self.assertIs(profiling.phase("outer"), profiling.phase("other"))
+        with profiling.phase("outer"):
+            profiling.read(100)
+            profiling.wrote(100)
+        self.assertEqual(profiling._phases, {})
+        self.atexit_register.assert_not_called()
+
+    def test_enabled_records_phases_and_bytes(self):
+        profiling.enable()
+        self.atexit_register.assert_called_once_with(profiling.report)
+
+        @profiling.timed("save")
+        def save():
+            profiling.wrote(2048)
+
+        with profiling.phase("load"):
+            profiling.read(10)
+            profiling.read(20)
+        save()
+        save()
+        self.assertEqual(list(profiling._phases), ["load", "save"])
+        calls, seconds, nread, nwritten = profiling._phases["load"]
+        self.assertEqual((calls, nread, nwritten), (1, 30, 0))
+        self.assertGreaterEqual(seconds, 0)
+        self.assertEqual(profiling._phases["save"][0], 2)
+        self.assertEqual(profiling._phases["save"][3], 4096)
+        self.assertEqual(profiling._stack, [])
+
+    def test_format_report(self):
+        profiling._phases.update(
+            {"load": [1, 0.0025, 300, 0], "save": [3, 0.01, 0, 4096]}
+        )
+        self.assertEqual(
+            profiling.format_report(total=0.5),
+            "attendance profile: 500.0 ms total (phases include nested ones)\n"
+            "  load      2.50 ms  read 300 B\n"
+            "  save     10.00 ms  x3  wrote 4.0 KiB\n",
+        )
+
+    def test_enable_from_env(self):
+        with patch.object(profiling, "enable") as enable:
+            for value in ["", "0"]:
+                with patch.dict(os.environ, {"ATTENDANCE_PROFILE": value}):
+                    profiling.enable_from_env()
+            enable.assert_not_called()
+            for value in ["1", "yes", "stderr"]:
+                with patch.dict(os.environ, {"ATTENDANCE_PROFILE": value}):
+                    profiling.enable_from_env()
+                enable.assert_called_with()
+            with patch.dict(os.environ, {"ATTENDANCE_PROFILE": "/tmp/check.prof"}):
+                profiling.enable_from_env()
+            enable.assert_called_with("/tmp/check.prof")
+
+
+class TestProfileOption(ProfilingTestCase, DataDirTestCase):
+    def setUp(self):
+        DataDirTestCase.setUp(self)
+        ProfilingTestCase.setUp(self)
+
+    def test_view_summary(self):
+        data_manager.save_timetable({"Monday": ["Math"]})
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.record_attendance(
+            [{"date": "2026-01-05", "subject": "Math", "status": "present"}]
+        )
+        result = CliRunner().invoke(cli, ["--profile", "view", "summary"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue(profiling.enabled)
+        self.assertIn("data_manager.get_subject_stats", profiling._phases)
+        self.assertIn("render.summary_table", profiling._phases)
+        self.assertIn("import", profiling._phases)
+        self.assertIn("import.rich", profiling._phases)
+
+    def test_fastpath_times_the_imports(self):
+        data_manager.save_timetable({"Monday": ["Math"]})
+        with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit) as exit:
+            fastpath.main(["--profile", "view", "summary"])
+        self.assertEqual(exit.exception.code, 0)
+        self.assertEqual(list(profiling._phases)[:2], ["import", "import.cli"])
+        self.assertIn("import.rich", profiling._phases)
+
+    def test_profile_options(self):
+        self.assertEqual(fastpath.profile_options(["view", "summary"]), (False, None))
+        self.assertEqual(
+            fastpath.profile_options(["--data-dir", "--profile", "view"]), (False, None)
+        )
+        self.assertEqual(
+            fastpath.profile_options(["--backend", "json", "--profile", "view"]),
+            (True, None),
+        )
+        self.assertEqual(
+            fastpath.profile_options(["--profile-output", "out.prof", "view"]),
+            (True, "out.prof"),
+        )
+        self.assertEqual(
+            fastpath.profile_options(["--profile-output=out.prof", "view"]),
+            (True, "out.prof"),
+        )
+        self.assertEqual(
+            fastpath.profile_options(["record", "import", "--profile"]), (False, None)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import random
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from attendance_tracker import logic, records
+from attendance_tracker.records import RecordStore
+
+
+def random_records(rng, count):
+    return [
+        {
+            "date": (date(2026, 1, 5) + timedelta(days=rng.randrange(120))).isoformat(),
+            "subject": rng.choice(["Math", "Physics", "Chemistry", "Art"]),
+            "status": rng.choice(["present", "present", "absent", "cancelled", "late"]),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestRecordStore(unittest.TestCase):
+    def setUp(self):
+        self.records = random_records(random.Random(3), 500)
+        self.store = RecordStore(self.records)
+
+    def test_behaves_like_a_list_of_dicts(self):
+        self.assertEqual(self.store, self.records)
+        self.assertEqual(len(self.store), len(self.records))
+        self.assertEqual(dict(self.store[-1]), self.records[-1])
+        self.assertEqual(self.store[10]["subject"], self.records[10]["subject"])
+        self.assertEqual(self.store[5:8], self.records[5:8])
+
+        self.store[3]["status"] = "cancelled"
+        self.records[3]["status"] = "cancelled"
+        self.assertEqual(self.store.pop(0), self.records.pop(0))
+        record = {"date": "2026-06-01", "subject": "Music", "status": "present"}
+        self.store.append(record)
+        self.records.append(record)
+        self.assertEqual(self.store.to_list(), self.records)
+
+    def test_queries(self):
+        self.assertEqual(self.store.max_date(), max(r["date"] for r in self.records))
+        self.assertTrue(self.store.has_date(self.records[0]["date"]))
+        self.assertFalse(self.store.has_date("2025-01-01"))
+        self.assertIsNone(RecordStore().max_date())
+
+    def test_index_of(self):
+        expected = {}
+        for i, record in enumerate(self.records):
+            key = (record["date"], record["subject"])
+            seq = expected.setdefault(key, [])
+            seq.append(i)
+        for (date_str, subject), indexes in expected.items():
+            for seq, i in enumerate(indexes):
+                self.assertEqual(self.store.index_of(date_str, subject, seq), i)
+            self.assertIsNone(self.store.index_of(date_str, subject, len(indexes)))
+        self.assertIsNone(self.store.index_of("2026-01-05", "Music", 0))
+
+    def test_count_by_subject_matches_logic(self):
+        self.store[0]["status"] = "cancelled"
+        self.store.append({"date": "2026-06-01", "subject": "Music", "status": "absent"})
+        del self.store[-1]
+        expected = logic.count_by_subject(self.store.to_list())
+        self.assertEqual(logic.count_by_subject(self.store), expected)
+        self.assertEqual(
+            logic.aggregate_attendance(self.store, ["Music"]),
+            logic.aggregate_attendance(self.store.to_list(), ["Music"]),
+        )
+
+    def test_count_by_subject_without_numpy(self):
+        expected = logic.count_by_subject(self.records)
+        with patch.object(records, "_numpy", False):
+            self.assertEqual(self.store.count_by_subject(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from attendance_tracker import data_manager, semesters, storage
+from attendance_tracker.main import cli
+
+from test_data_manager import DataDirTestCase
+
+RECORDS = [
+    {"date": "2026-01-05", "subject": "Math", "status": "present"},
+    {"date": "2026-01-05", "subject": "Physics", "status": "absent"},
+    {"date": "2026-01-12", "subject": "Math", "status": "absent"},
+    {"date": "2026-08-03", "subject": "Math", "status": "present"},
+    {"date": "2026-08-03", "subject": "Art", "status": "present"},
+]
+
+
+class TestSplitSemester(unittest.TestCase):
+    def test_split(self):
+        data = storage.empty_attendance_data()
+        data.update(
+            records=RECORDS,
+            holidays=["2026-01-26", "2026-08-15"],
+            holiday_ranges=[["2026-06-01", "2026-08-02"], ["2026-07-20", "2026-08-10"]],
+            semester_start_date="2026-01-05",
+            working_days=[0, 1, 2, 3, 4, 5],
+        )
+        closed, remaining = semesters.split_semester(data, "2026-08-03")
+        self.assertEqual(closed["records"], RECORDS[:3])
+        self.assertEqual(remaining["records"], RECORDS[3:])
+        self.assertEqual(closed["holidays"], ["2026-01-26"])
+        self.assertEqual(remaining["holidays"], ["2026-08-15"])
+        self.assertEqual(len(closed["holiday_ranges"]), 2)
+        self.assertEqual(remaining["holiday_ranges"], [["2026-07-20", "2026-08-10"]])
+        self.assertEqual(closed["semester_start_date"], "2026-01-05")
+        self.assertEqual(closed["semester_end_date"], "2026-08-02")
+        self.assertEqual(remaining["working_days"], [0, 1, 2, 3, 4, 5])
+        self.assertNotIn("counters", closed)
+
+    def test_bounds_cover_the_records(self):
+        data = storage.empty_attendance_data()
+        data.update(
+            records=RECORDS,
+            semester_start_date="2026-01-10",
+            semester_end_date="2026-06-30",
+        )
+        closed, _ = semesters.split_semester(data, "2026-08-03")
+        self.assertEqual(closed["semester_start_date"], "2026-01-05")
+        self.assertEqual(closed["semester_end_date"], "2026-06-30")
+
+
+class TestCloseSemester(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        data_manager.save_timetable({"Monday": ["Math", "Physics"]})
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.record_attendance(RECORDS, ["2026-01-26"])
+
+    def test_close(self):
+        everything = data_manager.get_subject_stats()
+        entry = data_manager.close_semester("2026-08-03", "2026-12-18")
+        self.assertEqual(entry["file"], "2026-01-05_2026-08-02.json.gz")
+        self.assertEqual(entry["records"], 3)
+
+        data = data_manager.get_attendance_data()
+        self.assertEqual(data["records"], RECORDS[3:])
+        self.assertEqual(data["holidays"], [])
+        self.assertEqual(data_manager.get_semester_start_date(), "2026-08-03")
+        self.assertEqual(data_manager.get_semester_end_date(), "2026-12-18")
+
+        archived = json.loads(
+            gzip.decompress((self.data_dir / "semesters" / entry["file"]).read_bytes())
+        )
+        self.assertEqual(archived["records"], RECORDS[:3])
+        self.assertEqual(archived["holidays"], ["2026-01-26"])
+        self.assertEqual(archived["subjects"], ["Math", "Physics"])
+
+        self.assertEqual(
+            [(e["start"], e["end"]) for e in data_manager.list_semesters()],
+            [("2026-01-05", "2026-08-02"), ("2026-08-03", "2026-12-18")],
+        )
+        self.assertEqual(data_manager.get_subject_stats()["Math"]["total"], 1)
+        closed = data_manager.get_subject_stats("2026-01-05")
+        self.assertEqual(list(closed), ["Math", "Physics"])
+        self.assertEqual(closed["Math"]["total"], 2)
+        self.assertEqual(data_manager.get_subject_stats("all"), everything)
+        with self.assertRaises(ValueError):
+            data_manager.get_subject_stats("2025-01-01")
+
+    def test_summaries_do_not_load_archives(self):
+        data_manager.close_semester("2026-08-03")
+        with patch.object(semesters.SemesterArchive, "load") as load:
+            data_manager.get_subject_stats("2026-01-05")
+            data_manager.get_subject_stats("all")
+        load.assert_not_called()
+
+    def test_export_and_uncompressed(self):
+        entry = data_manager.close_semester("2026-08-03", compress=False)
+        self.assertEqual(entry["file"], "2026-01-05_2026-08-02.json")
+        exported = json.loads(data_manager.export_attendance_data(semester="2026-01-05"))
+        self.assertEqual(exported["records"], RECORDS[:3])
+        self.assertNotIn("subjects", exported)
+
+    def test_closing_again_replaces_the_archive(self):
+        data_manager.close_semester("2026-08-03")
+        with self.assertRaises(ValueError):
+            data_manager.close_semester("2026-08-03")
+        # As after a crash between writing the archive and the active data.
+        data_manager.set_semester_start_date("2026-01-05")
+        data_manager.record_attendance(RECORDS[:3])
+        data_manager.close_semester("2026-08-03", compress=False)
+        self.assertEqual(
+            sorted(path.name for path in (self.data_dir / "semesters").iterdir()),
+            ["2026-01-05_2026-08-02.json", "index.json"],
+        )
+        self.assertEqual(len(data_manager.get_archive().entries()), 1)
+
+    def test_rejects_empty_and_earlier_semesters(self):
+        with self.assertRaises(ValueError):
+            data_manager.close_semester("2026-01-05")
+        data_manager.set_semester_start_date("2025-08-01")
+        with self.assertRaises(ValueError):
+            data_manager.close_semester("2026-01-05")
+
+    def test_sqlite(self):
+        data_manager.migrate_json_to_sqlite()
+        with patch.object(data_manager, "BACKEND", "sqlite"):
+            data_manager.close_semester("2026-08-03")
+            self.assertEqual(data_manager.get_attendance_data()["records"], RECORDS[3:])
+            self.assertEqual(data_manager.get_subject_stats("2026-01-05")["Math"]["total"], 2)
+            data_manager.get_backend().close()
+
+    def test_cli(self):
+        runner = CliRunner()
+        result = runner.invoke(cli, ["config", "new-semester", "2026-08-03"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Archived 3 records from 2026-01-05 to 2026-08-02", result.output)
+
+        result = runner.invoke(cli, ["view", "semesters"])
+        self.assertEqual(
+            result.output.splitlines(),
+            [
+                "2026-01-05 .. 2026-08-02  3 records  2026-01-05_2026-08-02.json.gz",
+                "2026-08-03 ..             current",
+            ],
+        )
+        result = runner.invoke(
+            cli, ["view", "summary", "--semester", "2026-01-05", "--format", "csv"]
+        )
+        self.assertEqual(
+            result.output.splitlines()[1:],
+            [
+                "Math,2,1,50.0,< 75%,0,2,Attend next 2 classes to reach 75%",
+                "Physics,1,0,0.0,< 75%,0,3,Attend next 3 classes to reach 75%",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from attendance_tracker import fastpath
+from attendance_tracker.timetable import compile_timetable
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Upper bound for the total import time of the no-op `record check --quiet`
+# path, interpreter startup included, in microseconds.
+IMPORT_BUDGET_US = 150_000
+
+FASTPATH_MAIN = (
+    "import sys; from attendance_tracker.fastpath import main; sys.exit(main({args!r}))"
+)
+NOOP_CHECK = FASTPATH_MAIN.format(args=["record", "check", "--quiet"])
+
+
+def parse_importtime(stderr):
+    """Returns {module: self_us} from `python -X importtime` output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        timings[module.strip()] = int(self_us)
+    return timings
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        data_dir = Path(self.home.name) / ".attendance-tracker"
+        data_dir.mkdir()
+        today = date.today()
+        (data_dir / "timetable.json").write_text(
+            json.dumps({today.strftime("%A"): ["Math"]})
+        )
+        (data_dir / "attendance.json").write_text(
+            json.dumps(
+                {
+                    "records": [
+                        {"date": today.isoformat(), "subject": "Math", "status": "present"}
+                    ],
+                    "holidays": [],
+                    "semester_start_date": today.isoformat(),
+                    "semester_end_date": None,
+                }
+            )
+        )
+
+    def tearDown(self):
+        self.home.cleanup()
+
+    def run_noop_check(self, code=NOOP_CHECK, **environ):
+        env = dict(os.environ, HOME=self.home.name, **environ)
+        env.pop("ATTENDANCE_DATA_DIR", None)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")])
+        )
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=self.home.name,
+        )
+
+    def test_noop_check_skips_heavy_imports(self):
+        result = self.run_noop_check()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, "")
+
+        timings = parse_importtime(result.stderr)
+        self.assertIn("attendance_tracker.fastpath", timings)
+        for module in ("click", "rich", "attendance_tracker.main"):
+            self.assertNotIn(module, timings)
+
+    def test_noop_check_import_budget(self):
+        result = self.run_noop_check()
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        timings = parse_importtime(result.stderr)
+        self.assertLess(sum(timings.values()), IMPORT_BUDGET_US)
+
+    def test_data_summary_skips_heavy_imports(self):
+        code = FASTPATH_MAIN.format(args=["view", "summary", "--format", "json"])
+        result = self.run_noop_check(code)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(
+            json.loads(result.stdout),
+            [
+                {
+                    "subject": "Math",
+                    "total": 1,
+                    "present": 1,
+                    "percentage": 100.0,
+                    "status": ">= 75%",
+                    "bunkable": 0,
+                    "needed": 0,
+                    "notes": "",
+                }
+            ],
+        )
+
+        timings = parse_importtime(result.stderr)
+        for module in ("click", "rich", "attendance_tracker.main"):
+            self.assertNotIn(module, timings)
+
+    def test_second_noop_check_writes_nothing(self):
+        state_file = Path(self.home.name) / ".attendance-tracker" / "state.json"
+        result = self.run_noop_check()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        written = state_file.stat().st_mtime_ns
+        result = self.run_noop_check()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(state_file.stat().st_mtime_ns, written)
+
+    def test_sqlite_noop_check_is_served_from_state(self):
+        migrate = (
+            "from attendance_tracker import data_manager; "
+            "data_manager.migrate_json_to_sqlite()"
+        )
+        # Loading the records would fail, so only the sidecar state may answer.
+        noop_without_loading = (
+            "from attendance_tracker import storage; storage.SqliteBackend.load = None; "
+            + NOOP_CHECK
+        )
+        for code in (migrate, NOOP_CHECK, noop_without_loading):
+            result = self.run_noop_check(code, ATTENDANCE_BACKEND="sqlite")
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_summary_format(self):
+        self.assertEqual(fastpath.summary_format(["view", "summary", "--format", "csv"]), "csv")
+        self.assertEqual(fastpath.summary_format(["view", "summary", "--format=tsv"]), "tsv")
+        for args in (
+            ["view", "summary"],
+            ["view", "summary", "--format", "table"],
+            ["view", "summary", "--format", "json", "--help"],
+            ["--backend", "sqlite", "view", "summary", "--format", "json"],
+        ):
+            self.assertIsNone(fastpath.summary_format(args))
+
+
+class TestCheckHasWork(unittest.TestCase):
+    def check(
+        self,
+        records,
+        holidays=(),
+        today=date(2026, 1, 7),
+        working_days=(0, 1, 2, 3, 4),
+        holiday_ranges=(),
+    ):
+        timetable = {
+            "Monday": ["Math"],
+            "Tuesday": ["Math"],
+            "Wednesday": ["Math"],
+            "Saturday": ["Math"],
+        }
+        recorded_dates = {record["date"] for record in records}
+        with patch.multiple(
+            fastpath.data_manager,
+            get_state=MagicMock(return_value=None),
+            get_semester_start_date=MagicMock(return_value="2026-01-05"),
+            get_semester_end_date=MagicMock(return_value=None),
+            get_timetable_index=MagicMock(return_value=compile_timetable(timetable)),
+            get_holidays=MagicMock(return_value=list(holidays)),
+            get_working_days=MagicMock(return_value=list(working_days)),
+            get_holiday_ranges=MagicMock(return_value=list(holiday_ranges)),
+            get_resume_date=MagicMock(return_value=max(recorded_dates)),
+            has_records_on=MagicMock(side_effect=recorded_dates.__contains__),
+        ), patch("attendance_tracker.logic.date") as mock_date:
+            mock_date.today.return_value = today
+            mock_date.fromisoformat.side_effect = date.fromisoformat
+            return fastpath.check_has_work(today)
+
+    def test_today_recorded(self):
+        records = [
+            {"date": "2026-01-06", "subject": "Math", "status": "present"},
+            {"date": "2026-01-07", "subject": "Math", "status": "present"},
+        ]
+        self.assertFalse(self.check(records))
+
+    def test_today_pending(self):
+        records = [{"date": "2026-01-06", "subject": "Math", "status": "present"}]
+        self.assertTrue(self.check(records))
+
+    def test_today_holiday(self):
+        records = [{"date": "2026-01-06", "subject": "Math", "status": "present"}]
+        self.assertFalse(self.check(records, holidays=["2026-01-07"]))
+
+    def test_missed_day_pending(self):
+        records = [{"date": "2026-01-05", "subject": "Math", "status": "present"}]
+        self.assertTrue(self.check(records, holidays=["2026-01-07"]))
+
+    def test_working_week(self):
+        records = [{"date": "2026-01-07", "subject": "Math", "status": "present"}]
+        saturday = date(2026, 1, 10)
+        self.assertFalse(self.check(records, today=saturday))
+        self.assertTrue(
+            self.check(records, today=saturday, working_days=(0, 1, 2, 3, 4, 5))
+        )
+
+    def test_today_in_holiday_range(self):
+        records = [{"date": "2026-01-05", "subject": "Math", "status": "present"}]
+        self.assertFalse(
+            self.check(records, holiday_ranges=[["2026-01-06", "2026-01-09"]])
+        )
+
+    def test_checked_state_skips_loading(self):
+        state = {
+            "last_checked": "2026-01-07",
+            "semester_start_date": "2026-01-05",
+            "semester_end_date": None,
+        }
+        with patch.object(
+            fastpath.data_manager, "get_state", return_value=state
+        ), patch.object(fastpath.data_manager, "get_holidays") as get_holidays:
+            self.assertFalse(fastpath.check_has_work(date(2026, 1, 7)))
+        get_holidays.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
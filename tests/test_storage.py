@@ -0,0 +1,363 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from attendance_tracker import codec, logic, storage, workdays
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+OPS = [
+    {"op": "set", "key": "semester_start_date", "value": "2026-01-05"},
+    {"op": "add_record", "record": {"date": "2026-01-05", "subject": "Math", "status": "present"}},
+    {"op": "add_record", "record": {"date": "2026-01-05", "subject": "Math", "status": "absent"}},
+    {"op": "add_record", "record": {"date": "2026-01-05", "subject": "Math", "status": "present"}},
+    {"op": "add_record", "record": {"date": "2026-01-06", "subject": "Physics", "status": "present"}},
+    {"op": "set_status", "date": "2026-01-05", "subject": "Math", "seq": 2, "status": "absent"},
+    {"op": "delete_record", "date": "2026-01-05", "subject": "Math", "seq": 0},
+    {"op": "cancel", "date": "2026-01-06", "subject": "Physics"},
+    {"op": "cancel", "date": "2026-01-07", "subject": "Math"},
+    {"op": "add_holiday", "date": "2026-01-08"},
+    {"op": "add_holiday", "date": "2026-01-09"},
+    {"op": "add_holiday", "date": "2026-01-08"},
+    {"op": "remove_holiday", "date": "2026-01-09"},
+    {"op": "add_holiday_range", "start": "2026-12-20", "end": "2027-01-05"},
+    {"op": "add_holiday_range", "start": "2026-03-01", "end": "2026-03-07"},
+    {"op": "remove_holiday_range", "start": "2026-03-01", "end": "2026-03-07"},
+    {"op": "set", "key": "working_days", "value": [0, 1, 2, 3, 4, 5]},
+]
+
+EXPECTED_RECORDS = [
+    {"date": "2026-01-05", "subject": "Math", "status": "absent"},
+    {"date": "2026-01-05", "subject": "Math", "status": "absent"},
+    {"date": "2026-01-06", "subject": "Physics", "status": "cancelled"},
+    {"date": "2026-01-07", "subject": "Math", "status": "cancelled"},
+]
+
+
+class BackendTests:
+    """Shared behaviour every storage backend must provide."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.backend = self.make_backend(Path(self.tmp.name))
+
+    def test_apply_ops(self):
+        self.backend.apply(OPS)
+        data = self.backend.load()
+        self.assertEqual(data["records"], EXPECTED_RECORDS)
+        self.assertEqual(data["holidays"], ["2026-01-08"])
+        self.assertEqual(data["semester_start_date"], "2026-01-05")
+        self.assertEqual(
+            self.backend.describe(),
+            {
+                "last_run_date": "2026-01-07",
+                "semester_start_date": "2026-01-05",
+                "semester_end_date": None,
+                "working_days": [0, 1, 2, 3, 4, 5],
+                "holiday_ranges": [["2026-12-20", "2027-01-05"]],
+                "check_cursor": None,
+            },
+        )
+
+    def test_save_roundtrip(self):
+        self.backend.apply(OPS)
+        data = storage.copy_attendance_data(self.backend.load())
+        data["records"][1]["status"] = "present"
+        del data["records"][0]
+        data["holidays"] = ["2026-01-10"]
+        self.backend.save(data)
+        loaded = self.backend.load()
+        self.assertEqual(loaded["records"], data["records"])
+        self.assertEqual(loaded["holidays"], ["2026-01-10"])
+        self.assertEqual(loaded["holiday_ranges"], [["2026-12-20", "2027-01-05"]])
+        self.assertEqual(loaded["working_days"], [0, 1, 2, 3, 4, 5])
+
+    def test_counters_follow_changes(self):
+        self.backend.apply(OPS)
+        self.assertEqual(
+            self.backend.counters(),
+            {
+                "Math": {"present": 0, "absent": 2, "cancelled": 1},
+                "Physics": {"present": 0, "absent": 0, "cancelled": 1},
+            },
+        )
+        data = storage.copy_attendance_data(self.backend.load())
+        del data["records"][2]
+        data["records"].append({"date": "2026-01-08", "subject": "Art", "status": "present"})
+        self.backend.save(data)
+        self.assertEqual(self.backend.counters(), logic.count_by_subject(data["records"]))
+        self.assertEqual(self.backend.load()["counters"], self.backend.counters())
+
+    def test_queries(self):
+        self.backend.apply(OPS)
+        self.assertTrue(self.backend.has_records_on("2026-01-06"))
+        self.assertFalse(self.backend.has_records_on("2026-01-08"))
+        self.assertEqual(self.backend.holidays(), ["2026-01-08"])
+
+    def test_find_records(self):
+        self.backend.apply(OPS)
+        self.assertEqual(
+            self.backend.find_records(),
+            [
+                ("2026-01-05", "Math", 0, "absent"),
+                ("2026-01-05", "Math", 1, "absent"),
+                ("2026-01-06", "Physics", 0, "cancelled"),
+                ("2026-01-07", "Math", 0, "cancelled"),
+            ],
+        )
+        self.assertEqual(
+            self.backend.find_records(subject="Math", start="2026-01-06"),
+            [("2026-01-07", "Math", 0, "cancelled")],
+        )
+        self.assertEqual(
+            self.backend.find_records(status="cancelled", end="2026-01-06"),
+            [("2026-01-06", "Physics", 0, "cancelled")],
+        )
+        self.assertEqual(
+            self.backend.find_records(subject="Math", offset=1, limit=1),
+            [("2026-01-05", "Math", 1, "absent")],
+        )
+        self.backend.apply([{"op": "delete_record", "date": "2026-01-05", "subject": "Math", "seq": 0}])
+        self.assertEqual(
+            self.backend.find_records(subject="Math", end="2026-01-05"),
+            [("2026-01-05", "Math", 0, "absent")],
+        )
+
+
+class TestJsonBackend(BackendTests, unittest.TestCase):
+    def make_backend(self, data_dir):
+        return storage.JsonBackend(data_dir / "attendance.json", storage.Repository())
+
+
+class TestSqliteBackend(BackendTests, unittest.TestCase):
+    def make_backend(self, data_dir):
+        backend = storage.SqliteBackend(data_dir / "attendance.db")
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_wal_mode(self):
+        self.backend.apply(OPS[:2])
+        (mode,) = self.backend._connect().execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+
+class TestJsonJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "attendance.json"
+
+    def make_backend(self, compact_bytes=storage.JOURNAL_COMPACT_BYTES):
+        return storage.JsonBackend(self.path, storage.Repository(), compact_bytes)
+
+    def test_ops_are_appended_not_rewritten(self):
+        backend = self.make_backend()
+        backend.save(storage.empty_attendance_data())
+        snapshot = self.path.read_text()
+        backend.apply(OPS)
+        self.assertEqual(self.path.read_text(), snapshot)
+        self.assertEqual(len(backend.journal_path.read_text().splitlines()), len(OPS))
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_compaction(self):
+        backend = self.make_backend(compact_bytes=500)
+        backend.apply(OPS)
+        self.assertFalse(backend.journal_path.exists())
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_crash_during_compaction_does_not_replay_twice(self):
+        backend = self.make_backend()
+        backend.apply(OPS)
+        journal = backend.journal_path.read_bytes()
+        backend.compact()
+        backend.journal_path.write_bytes(journal)
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_torn_last_line_is_ignored(self):
+        backend = self.make_backend()
+        backend.apply(OPS)
+        with open(backend.journal_path, "a") as f:
+            f.write('{"n": 99, "op": {"op": "add_hol')
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_rejected_batch_changes_nothing(self):
+        backend = self.make_backend()
+        backend.apply(OPS[:2])
+        bad = {"op": "add_record", "record": {"date": "2026-13-45", "subject": "Math", "status": "present"}}
+        with self.assertRaises(ValueError):
+            backend.apply([OPS[2], bad])
+        self.assertEqual(len(backend.load()["records"]), 1)
+        self.assertEqual(len(backend.journal_path.read_text().splitlines()), 2)
+        backend.apply(OPS[2:])
+        self.assertEqual(backend.load()["records"], EXPECTED_RECORDS)
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    def test_sees_appends_from_other_writers(self):
+        reader = self.make_backend()
+        reader.apply(OPS[:2])
+        self.make_backend().apply(OPS[2:])
+        self.assertEqual(reader.load()["records"], EXPECTED_RECORDS)
+
+    def test_saves_are_atomic(self):
+        backend = self.make_backend()
+        backend.apply(OPS)
+        with patch.object(codec, "dumps", side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                backend.compact()
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                backend.compact()
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+        self.assertEqual(
+            sorted(path.name for path in self.path.parent.iterdir()),
+            ["attendance.journal", "attendance.lock"],
+        )
+
+    def test_group_commit_syncs_once(self):
+        backend = self.make_backend()
+        backend.sync = False
+        with patch("os.fsync") as fsync:
+            for op in OPS:
+                backend.apply([op])
+            self.assertEqual(fsync.call_count, 0)
+            backend.flush()
+            backend.flush()
+            self.assertEqual(fsync.call_count, 1)
+        self.assertEqual(self.make_backend().load()["records"], EXPECTED_RECORDS)
+
+    @unittest.skipIf(storage.fcntl is None, "needs fcntl")
+    def test_lock_times_out(self):
+        backend = self.make_backend()
+        other = storage.FileLock(backend.lock.path, timeout=0.05)
+        with backend.lock, backend.lock:
+            with self.assertRaises(storage.LockTimeout):
+                other.acquire()
+        with other:
+            pass
+
+
+@unittest.skipIf(storage.fcntl is None, "needs fcntl")
+class TestConcurrentChecks(unittest.TestCase):
+    """Several `record check` processes started at once must record each class once."""
+
+    PROCESSES = 12
+    DAYS = 60
+    SUBJECTS = ["Math", "Physics", "Chemistry"]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = Path(self.tmp.name)
+        # Weeks of missed days, so the journal grows past its compaction size
+        # while the processes race.
+        start = date.today() - timedelta(days=self.DAYS)
+        (self.data_dir / "timetable.json").write_text(
+            json.dumps({day: self.SUBJECTS for day in workdays.WEEKDAY_NAMES})
+        )
+        data = storage.empty_attendance_data()
+        data.update(semester_start_date=start.isoformat(), working_days=list(range(7)))
+        (self.data_dir / "attendance.json").write_text(json.dumps(data))
+
+    def wait_for_prompt(self, process):
+        """Reads a process's output up to its first prompt."""
+        output = b""
+        while b"Select option" not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                break
+            output += chunk
+        return output
+
+    def test_each_class_is_recorded_once(self):
+        env = dict(os.environ, HOME=self.tmp.name, PYTHONPATH=str(PROJECT_ROOT))
+        env.pop("ATTENDANCE_DATA_DIR", None)
+        env.pop("ATTENDANCE_SOCKET", None)
+        command = [
+            sys.executable, "-m", "attendance_tracker.main",
+            "--data-dir", str(self.data_dir), "record", "check",
+        ]
+        processes = [
+            subprocess.Popen(command, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            for _ in range(self.PROCESSES)
+        ]
+        # Hold every process at its first prompt, then answer them all at
+        # once so that their saves collide.
+        outputs = [self.wait_for_prompt(process) for process in processes]
+        answers = b"p\n" * (self.DAYS + 1)
+        for process in processes:
+            process.stdin.write(answers)
+            process.stdin.flush()
+        for i, process in enumerate(processes):
+            outputs[i] += process.communicate(timeout=60)[0]
+        self.assertEqual([process.returncode for process in processes], [0] * self.PROCESSES)
+        # Every process was asked about every day.
+        for output in outputs:
+            self.assertEqual(output.count(b"Select option"), self.DAYS)
+
+        backend = storage.JsonBackend(self.data_dir / "attendance.json", storage.Repository())
+        records = backend.load()["records"]
+        keys = [(record["date"], record["subject"]) for record in records]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len(records), self.DAYS * len(self.SUBJECTS))
+        self.assertEqual(backend.counters(), logic.count_by_subject(records))
+        self.assertEqual(
+            backend.counters(),
+            {
+                subject: {"present": self.DAYS, "absent": 0, "cancelled": 0}
+                for subject in self.SUBJECTS
+            },
+        )
+
+
+class TestValidateOp(unittest.TestCase):
+    def test_valid(self):
+        for op in OPS:
+            storage.validate_op(op)
+
+    def test_invalid(self):
+        record = OPS[1]["record"]
+        for op in [
+            {"op": "dance"},
+            {"op": "add_record", "record": {"date": "2026-01-05"}},
+            {"op": "add_record", "record": dict(record, date=20261012)},
+            {"op": "add_record", "record": dict(record, date="2026-13-45")},
+            {"op": "add_record", "record": dict(record, subject=None)},
+            {"op": "set_status", "date": "2026-01-05", "subject": "Math", "seq": "0", "status": "absent"},
+            {"op": "delete_record", "date": "2026-01-05", "subject": "Math", "seq": -1},
+            {"op": "add_holiday", "date": ["2026-01-05"]},
+            {"op": "add_holiday_range", "start": "2026-01-05", "end": 5},
+            {"op": "set", "key": "semester_start_date", "value": 2026},
+            {"op": "set", "key": "working_days", "value": [0, 7]},
+            {"op": "set", "key": "holiday_ranges", "value": [["2026-01-05"]]},
+            {"op": "set", "key": "colour", "value": "red"},
+        ]:
+            with self.subTest(op=op), self.assertRaises(ValueError):
+                storage.validate_op(op)
+
+
+class TestRecordKeys(unittest.TestCase):
+    def test_seq_counts_repeats(self):
+        records = [
+            {"date": "2026-01-05", "subject": "Math"},
+            {"date": "2026-01-05", "subject": "Physics"},
+            {"date": "2026-01-05", "subject": "Math"},
+        ]
+        self.assertEqual(
+            list(storage.record_keys(records)),
+            [
+                ("2026-01-05", "Math", 0),
+                ("2026-01-05", "Physics", 0),
+                ("2026-01-05", "Math", 1),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
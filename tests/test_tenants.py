@@ -0,0 +1,121 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from attendance_tracker import codec, data_manager, tenants
+
+from test_data_manager import DataDirTestCase
+
+
+def make_data_dir(path, records):
+    path.mkdir()
+    (path / "timetable.json").write_text(json.dumps({"Monday": ["Math"]}))
+    (path / "attendance.json").write_text(
+        json.dumps(
+            {
+                "records": records,
+                "holidays": [],
+                "semester_start_date": "2026-01-05",
+                "semester_end_date": None,
+            }
+        )
+    )
+
+
+class TestTenants(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = Path(tempfile.mkdtemp(dir=self.tmp.name))
+        make_data_dir(
+            self.root / "alice",
+            [{"date": "2026-01-05", "subject": "Math", "status": "present"}],
+        )
+        make_data_dir(
+            self.root / "bob",
+            [{"date": "2026-01-05", "subject": "Math", "status": "absent"}],
+        )
+        (self.root / "notes").mkdir()
+        self.pool = tenants.TenantPool(capacity=2)
+        self.addCleanup(self.pool.close)
+
+    def test_discover(self):
+        self.assertEqual(
+            [path.name for path in tenants.discover(self.root)], ["alice", "bob"]
+        )
+
+    def test_tenants_are_isolated(self):
+        alice = tenants.summarize(self.pool.get(self.root / "alice"))
+        bob = tenants.summarize(self.pool.get(self.root / "bob"))
+        self.assertEqual(alice["Math"]["percentage"], 100.0)
+        self.assertEqual(bob["Math"]["percentage"], 0.0)
+
+        with self.pool.get(self.root / "bob"):
+            data_manager.add_record(
+                {"date": "2026-01-12", "subject": "Math", "status": "present"}
+            )
+        self.assertEqual(
+            json.loads((self.root / "alice" / "attendance.json").read_text())["records"],
+            [{"date": "2026-01-05", "subject": "Math", "status": "present"}],
+        )
+        # Outside a tenant the module-level data directory is untouched.
+        self.assertEqual(data_manager.get_attendance_data()["records"], [])
+
+    def test_cached_tenant_is_not_reparsed(self):
+        tenant = self.pool.get(self.root / "alice")
+        tenants.summarize(tenant)
+        with patch.object(codec, "load_file", wraps=codec.load_file) as load:
+            for _ in range(3):
+                tenants.summarize(self.pool.get(self.root / "alice"))
+        self.assertEqual(load.call_count, 0)
+
+    def test_least_recently_used_is_evicted(self):
+        make_data_dir(self.root / "carol", [])
+        alice = self.pool.get(self.root / "alice")
+        tenants.summarize(alice)
+        self.pool.get(self.root / "bob")
+        self.pool.get(self.root / "alice")
+        self.pool.get(self.root / "carol")
+        self.assertEqual(len(self.pool), 2)
+        self.assertIn(self.root / "alice", self.pool)
+        self.assertNotIn(self.root / "bob", self.pool)
+
+        self.assertIs(self.pool.get(self.root / "alice"), alice)
+        self.pool.get(self.root / "bob")
+        self.assertNotIn(self.root / "carol", self.pool)
+        self.assertIn(self.root / "alice", self.pool)
+
+
+    def test_cohort_report(self):
+        broken = self.root / "broken"
+        broken.mkdir()
+        (broken / "attendance.json").write_text("{")
+
+        data_dirs = tenants.discover(self.root)
+        chunks = list(tenants.cohort_report(data_dirs, workers=2, chunk_size=1))
+        self.assertEqual(len(chunks), 3)
+        rows = sorted(
+            (row for chunk in chunks for row in chunk), key=lambda row: row["student"]
+        )
+        self.assertEqual(
+            [(row["student"], row["subject"], row["percentage"], row["needed"]) for row in rows],
+            [("alice", "Math", 100.0, 0), ("bob", "Math", 0.0, 3), ("broken", None, None, None)],
+        )
+        self.assertIsNotNone(rows[2]["error"])
+        serial = tenants.cohort_report(data_dirs, workers=1)
+        self.assertEqual([row for chunk in serial for row in chunk], rows)
+
+    def test_cohort_chunks_follow_workers(self):
+        data_dirs = [f"student{i}" for i in range(30)]
+        for workers, expected in [(1, 4), (2, 8), (8, 30)]:
+            chunks = tenants.cohort_chunks(data_dirs, workers)
+            self.assertEqual(len(chunks), expected)
+            self.assertEqual([d for chunk in chunks for d in chunk], data_dirs)
+        # Few directories still go to more than one worker.
+        self.assertEqual(len(tenants.cohort_chunks(data_dirs[:16], 8)), 16)
+        self.assertEqual(len(tenants.cohort_chunks(data_dirs, 8, chunk_size=16)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
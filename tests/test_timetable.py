@@ -0,0 +1,120 @@
+import unittest
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from attendance_tracker import data_manager, importer, timetable
+from attendance_tracker.timetable import compile_timetable
+
+from test_data_manager import DataDirTestCase
+
+REVISIONS = {
+    "revisions": [
+        {"from": "2026-03-02", "days": {
+            "Monday": ["Math", {"subject": "Physics Lab", "weeks": "odd"}],
+            "Wednesday": [{"subject": "Chemistry Lab", "weeks": "even"}],
+        }},
+        {"from": "2026-01-05", "days": {
+            "Monday": ["Math", "Physics"],
+            "Wednesday": ["Chemistry"],
+        }},
+    ]
+}
+
+
+class TestCompileTimetable(unittest.TestCase):
+    def test_weekly(self):
+        index = compile_timetable({"Monday": ["Math", "Physics"], "friday": ["Art"]})
+        self.assertEqual(index.subjects, ("Art", "Math", "Physics"))
+        self.assertFalse(index.alternating)
+        self.assertEqual(index.subjects_on(date(2026, 1, 5)), ("Math", "Physics"))
+        self.assertEqual(index.subjects_on(date(2026, 1, 9)), ("Art",))
+        self.assertFalse(index.has_classes(date(2026, 1, 6)))
+
+    def test_revisions(self):
+        index = compile_timetable(REVISIONS, week_one="2026-01-07")
+        self.assertEqual(
+            index.subjects,
+            ("Chemistry", "Chemistry Lab", "Math", "Physics", "Physics Lab"),
+        )
+        # The first revision also covers the days before it.
+        self.assertEqual(index.subjects_on(date(2025, 12, 29)), ("Math", "Physics"))
+        self.assertEqual(index.subjects_on(date(2026, 2, 23)), ("Math", "Physics"))
+        # 2026-03-02 is in week 9 counted from the week of 2026-01-07.
+        self.assertEqual(index.subjects_on(date(2026, 3, 2)), ("Math", "Physics Lab"))
+        self.assertEqual(index.subjects_on(date(2026, 3, 4)), ())
+        self.assertEqual(index.subjects_on(date(2026, 3, 9)), ("Math",))
+        self.assertEqual(index.subjects_on(date(2026, 3, 11)), ("Chemistry Lab",))
+
+    def test_weeks_without_start_date(self):
+        index = compile_timetable(REVISIONS)
+        # ISO week 10 is even.
+        self.assertEqual(index.subjects_on(date(2026, 3, 2)), ("Math",))
+        counted = index.counting_weeks_from("2026-01-05")
+        self.assertEqual(counted.subjects_on(date(2026, 3, 2)), ("Math", "Physics Lab"))
+        self.assertEqual(counted.subjects, index.subjects)
+
+    def test_matches_weekday_names(self):
+        weekly = {"Monday": ["Math"], "Tuesday": ["Art"], "Thursday": ["Math", "Art"]}
+        index = compile_timetable(weekly)
+        day = date(2026, 1, 1)
+        for _ in range(14):
+            self.assertEqual(
+                list(index.subjects_on(day)), weekly.get(day.strftime("%A"), [])
+            )
+            day += timedelta(days=1)
+
+    def test_invalid(self):
+        for raw in [
+            ["Math"],
+            {"Someday": ["Math"]},
+            {"Monday": [{"subject": "Lab", "weeks": "third"}]},
+            {"Monday": [{"weeks": "odd"}]},
+            {"revisions": [{"from": "2026-01-05"}, {"from": "2026-01-05"}]},
+            {"revisions": [{"from": "not a date"}]},
+        ]:
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                compile_timetable(raw)
+
+
+class TestTimetableIndex(DataDirTestCase):
+    def setUp(self):
+        super().setUp()
+        data_manager.save_timetable(REVISIONS)
+        data_manager.set_semester_start_date("2026-01-05")
+
+    def test_compiled_once(self):
+        with patch.object(
+            timetable, "compile_timetable", wraps=timetable.compile_timetable
+        ) as compile:
+            index = data_manager.get_timetable_index()
+            self.assertEqual(index.subjects_on(date(2026, 3, 2)), ("Math", "Physics Lab"))
+            data_manager.get_timetable_index()
+            self.assertEqual(compile.call_count, 1)
+            data_manager.save_timetable({"Monday": ["Math"]})
+            self.assertEqual(data_manager.get_timetable_index().subjects, ("Math",))
+            self.assertEqual(compile.call_count, 2)
+
+    def test_summary_and_import_use_every_revision(self):
+        self.assertEqual(
+            list(data_manager.get_subject_stats()),
+            ["Chemistry", "Chemistry Lab", "Math", "Physics", "Physics Lab"],
+        )
+        rows = [
+            {"date": "2026-01-05", "subject": "Physics", "status": "p"},
+            {"date": "2026-03-02", "subject": "Physics Lab", "status": "p"},
+            {"date": "2026-03-02", "subject": "Physics", "status": "p"},
+            {"date": "2026-03-09", "subject": "Physics Lab", "status": "p"},
+        ]
+        result = importer.import_rows(enumerate(rows, 1))
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(
+            result.errors,
+            [
+                (3, "Physics is not scheduled on 2026-03-02."),
+                (4, "Physics Lab is not scheduled on 2026-03-09."),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import random
+import unittest
+from datetime import date, timedelta
+
+from attendance_tracker import workdays
+
+
+def naive_working_days(start, end, holidays, weekdays=workdays.DEFAULT_WORKING_WEEKDAYS):
+    days = []
+    current = start
+    while current < end:
+        if current.weekday() in weekdays and current.isoformat() not in holidays:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+class TestWorkdays(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(42)
+
+    def random_case(self, max_days=60):
+        start = date(2026, 1, 1) + timedelta(days=self.random.randrange(365))
+        end = start + timedelta(days=self.random.randrange(-3, max_days))
+        holidays = [
+            (start + timedelta(days=self.random.randrange(-10, max_days + 10))).isoformat()
+            for _ in range(self.random.randrange(10))
+        ]
+        weekdays = tuple(sorted(self.random.sample(range(7), self.random.randrange(8))))
+        return start, end, holidays, weekdays
+
+    def test_matches_day_by_day_walk(self):
+        for _ in range(500):
+            start, end, holidays, weekdays = self.random_case()
+            expected = naive_working_days(start, end, holidays, weekdays)
+            self.assertEqual(
+                workdays.working_days(start, end, holidays, weekdays), expected
+            )
+            self.assertEqual(
+                workdays.count_working_days(start, end, holidays, weekdays), len(expected)
+            )
+
+    def test_accepts_precomputed_ordinals(self):
+        holidays = ["2026-01-06", "2026-01-06", "2026-01-10"]
+        ordinals = workdays.holiday_ordinals(holidays)
+        self.assertEqual(len(ordinals), 2)
+        start, end = date(2026, 1, 5), date(2026, 1, 12)
+        self.assertEqual(
+            workdays.working_days(start, end, ordinals),
+            workdays.working_days(start, end, holidays),
+        )
+        self.assertEqual(workdays.count_working_days(start, end, ordinals), 4)
+
+    def test_long_range(self):
+        start, end = date(2020, 1, 1), date(2030, 1, 1)
+        holidays = [
+            (start + timedelta(days=self.random.randrange(3653))).isoformat()
+            for _ in range(2000)
+        ]
+        expected = naive_working_days(start, end, holidays)
+        self.assertEqual(workdays.working_days(start, end, holidays), expected)
+        self.assertEqual(workdays.count_working_days(start, end, holidays), len(expected))
+
+
+def naive_class_days(start, end, holidays, holiday_ranges, weekdays):
+    ranges = [
+        (date.fromisoformat(first), date.fromisoformat(last))
+        for first, last in holiday_ranges
+    ]
+    return [
+        day
+        for day in naive_working_days(start, end, holidays, weekdays)
+        if not any(first <= day <= last for first, last in ranges)
+    ]
+
+
+class TestWorkCalendar(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(7)
+
+    def random_ranges(self, start):
+        ranges = []
+        for _ in range(self.random.randrange(6)):
+            first = start + timedelta(days=self.random.randrange(-20, 80))
+            last = first + timedelta(days=self.random.randrange(20))
+            ranges.append((first.isoformat(), last.isoformat()))
+        return ranges
+
+    def test_matches_day_by_day_walk(self):
+        for _ in range(500):
+            start = date(2026, 1, 1) + timedelta(days=self.random.randrange(365))
+            end = start + timedelta(days=self.random.randrange(-3, 60))
+            holidays = [
+                (start + timedelta(days=self.random.randrange(-5, 65))).isoformat()
+                for _ in range(self.random.randrange(6))
+            ]
+            ranges = self.random_ranges(start)
+            weekdays = self.random.sample(range(7), self.random.randrange(8))
+            calendar = workdays.WorkCalendar(weekdays, holidays, ranges)
+
+            expected = naive_class_days(start, end, holidays, ranges, weekdays)
+            self.assertEqual(calendar.class_days(start, end), expected)
+            self.assertEqual(calendar.count_class_days(start, end), len(expected))
+            day = start
+            while day < end:
+                self.assertEqual(calendar.is_class_day(day), day in expected)
+                day += timedelta(days=1)
+
+    def test_overlapping_and_adjacent_ranges_merge(self):
+        calendar = workdays.WorkCalendar(
+            holidays=["2026-12-19"],
+            holiday_ranges=[("2026-12-20", "2027-01-05"), ("2026-12-24", "2026-12-26")],
+        )
+        self.assertEqual(calendar._starts, [date(2026, 12, 19).toordinal()])
+        self.assertEqual(calendar._ends, [date(2027, 1, 5).toordinal()])
+        self.assertTrue(calendar.is_holiday(date(2027, 1, 5)))
+        self.assertFalse(calendar.is_holiday(date(2027, 1, 6)))
+
+    def test_parse_weekdays(self):
+        self.assertEqual(workdays.parse_weekdays("sat, mon,Tuesday"), [0, 1, 5])
+        self.assertEqual(workdays.parse_weekdays("th,tu"), [1, 3])
+        with self.assertRaises(ValueError):
+            workdays.parse_weekdays("t")
+        with self.assertRaises(ValueError):
+            workdays.parse_weekdays("mon,funday")
+
+
+if __name__ == "__main__":
+    unittest.main()